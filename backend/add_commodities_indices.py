@@ -1,19 +1,12 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 # Comprehensive commodities and indices expansion
 additional_commodities_and_indices = [
@@ -552,30 +545,31 @@ async def add_comprehensive_commodities_and_indices():
     """Add comprehensive commodities and indices coverage"""
     try:
         # Get current count
-        current_count = await db.investment_recommendations.count_documents({})
+        current_count = await recommendation_repository.count()
         print(f"Current recommendations in database: {current_count}")
         
         # Insert additional commodities and indices
-        result = await db.investment_recommendations.insert_many(additional_commodities_and_indices)
-        print(f"Added {len(result.inserted_ids)} additional commodities and indices")
+        inserted = await recommendation_repository.insert_many(additional_commodities_and_indices)
+        print(f"Added {inserted} additional commodities and indices")
+        await recommendation_repository.mark_changed()
         
         # Verify new total
-        new_count = await db.investment_recommendations.count_documents({})
+        new_count = await recommendation_repository.count()
         print(f"Total recommendations now: {new_count}")
         
         # Show comprehensive breakdown
-        asset_types = await db.investment_recommendations.distinct("asset_type")
-        sectors = await db.investment_recommendations.distinct("sector")
+        asset_types = await recommendation_repository.collection.distinct("asset_type")
+        sectors = await recommendation_repository.collection.distinct("sector")
         
         print(f"\nAsset types: {', '.join(asset_types)}")
         print(f"Sectors covered: {', '.join(filter(None, sectors))}")
         
         for asset_type in asset_types:
-            count = await db.investment_recommendations.count_documents({"asset_type": asset_type})
+            count = await recommendation_repository.count({"asset_type": asset_type})
             print(f"- {asset_type}: {count} recommendations")
             
         # Show commodities breakdown
-        commodities = await db.investment_recommendations.find({"asset_type": "commodity"}).to_list(1000)
+        commodities = await recommendation_repository.collection.find({"asset_type": "commodity"}).to_list(1000)
         commodity_sectors = {}
         for commodity in commodities:
             sector = commodity.get("sector", "Unknown")
@@ -586,7 +580,7 @@ async def add_comprehensive_commodities_and_indices():
             print(f"- {sector}: {count} commodities")
             
         # Show indices breakdown
-        indices = await db.investment_recommendations.find({"asset_type": "index"}).to_list(1000)
+        indices = await recommendation_repository.collection.find({"asset_type": "index"}).to_list(1000)
         index_sectors = {}
         for index in indices:
             sector = index.get("sector", "Unknown")
@@ -607,15 +601,15 @@ async def add_comprehensive_commodities_and_indices():
         print(", ".join(index_symbols))
         
         # Recommendation distribution
-        buy_count = await db.investment_recommendations.count_documents({"recommendation": "BUY"})
-        hold_count = await db.investment_recommendations.count_documents({"recommendation": "HOLD"})
-        sell_count = await db.investment_recommendations.count_documents({"recommendation": "SELL"})
+        buy_count = await recommendation_repository.count({"recommendation": "BUY"})
+        hold_count = await recommendation_repository.count({"recommendation": "HOLD"})
+        sell_count = await recommendation_repository.count({"recommendation": "SELL"})
         print(f"\nOverall recommendations: {buy_count} BUY, {hold_count} HOLD, {sell_count} SELL")
         
     except Exception as e:
         print(f"Error adding commodities and indices: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(add_comprehensive_commodities_and_indices())
\ No newline at end of file
@@ -1,20 +1,13 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 import random
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import NewsRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+news_repository = NewsRepository(db)
 
 # Regular news updates with fresh content
 fresh_news_articles = [
@@ -308,19 +301,20 @@ async def add_fresh_news_content():
     """Add fresh news content to simulate regular updates"""
     try:
         # Get current news count
-        current_count = await db.news_articles.count_documents({})
+        current_count = await news_repository.count()
         print(f"Current news articles in database: {current_count}")
         
         # Add fresh news articles
-        result = await db.news_articles.insert_many(fresh_news_articles)
-        print(f"Added {len(result.inserted_ids)} fresh news articles")
+        inserted = await news_repository.insert_tagged(fresh_news_articles)
+        print(f"Added {inserted} fresh news articles")
+        await news_repository.mark_changed()
         
         # Verify new total
-        new_count = await db.news_articles.count_documents({})
+        new_count = await news_repository.count()
         print(f"Total news articles now: {new_count}")
         
         # Show latest articles
-        latest_articles = await db.news_articles.find().sort("publish_date", -1).limit(10).to_list(10)
+        latest_articles = await news_repository.collection.find().sort("publish_date", -1).limit(10).to_list(10)
         print(f"\nLatest 10 articles:")
         for i, article in enumerate(latest_articles, 1):
             time_ago = datetime.utcnow() - article["publish_date"]
@@ -331,17 +325,17 @@ async def add_fresh_news_content():
             print(f"{i}. {article['title'][:60]}... ({time_str})")
         
         # Show category breakdown
-        categories = await db.news_articles.distinct("category")
+        categories = await news_repository.collection.distinct("category")
         print(f"\nNews categories: {', '.join(categories)}")
         
         for category in categories:
-            count = await db.news_articles.count_documents({"category": category})
+            count = await news_repository.count({"category": category})
             print(f"- {category}: {count} articles")
             
     except Exception as e:
         print(f"Error adding fresh news: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(add_fresh_news_content())
\ No newline at end of file
@@ -1,19 +1,12 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 # Additional popular stocks to create comprehensive coverage
 additional_popular_stocks = [
@@ -548,31 +541,32 @@ async def add_popular_stocks():
     """Add more popular stocks to create comprehensive coverage"""
     try:
         # Get current count
-        current_count = await db.investment_recommendations.count_documents({})
+        current_count = await recommendation_repository.count()
         print(f"Current recommendations in database: {current_count}")
         
         # Insert additional popular stocks
-        result = await db.investment_recommendations.insert_many(additional_popular_stocks)
-        print(f"Added {len(result.inserted_ids)} additional popular stocks")
+        inserted = await recommendation_repository.insert_many(additional_popular_stocks)
+        print(f"Added {inserted} additional popular stocks")
+        await recommendation_repository.mark_changed()
         
         # Verify new total
-        new_count = await db.investment_recommendations.count_documents({})
+        new_count = await recommendation_repository.count()
         print(f"Total recommendations now: {new_count}")
         
         # Show comprehensive breakdown
-        asset_types = await db.investment_recommendations.distinct("asset_type")
-        sectors = await db.investment_recommendations.distinct("sector")
+        asset_types = await recommendation_repository.collection.distinct("asset_type")
+        sectors = await recommendation_repository.collection.distinct("sector")
         
         print(f"\nAsset types: {', '.join(asset_types)}")
         print(f"Sectors covered: {', '.join(filter(None, sectors))}")
         
         for asset_type in asset_types:
-            count = await db.investment_recommendations.count_documents({"asset_type": asset_type})
+            count = await recommendation_repository.count({"asset_type": asset_type})
             print(f"- {asset_type}: {count} recommendations")
             
         # Show sector breakdown for stocks
         stock_sectors = {}
-        stocks = await db.investment_recommendations.find({"asset_type": "stock"}).to_list(1000)
+        stocks = await recommendation_repository.collection.find({"asset_type": "stock"}).to_list(1000)
         for stock in stocks:
             sector = stock.get("sector", "Unknown")
             stock_sectors[sector] = stock_sectors.get(sector, 0) + 1
@@ -582,13 +576,13 @@ async def add_popular_stocks():
             print(f"- {sector}: {count} stocks")
             
         # Recommendation distribution
-        buy_count = await db.investment_recommendations.count_documents({"recommendation": "BUY"})
-        hold_count = await db.investment_recommendations.count_documents({"recommendation": "HOLD"})
-        sell_count = await db.investment_recommendations.count_documents({"recommendation": "SELL"})
+        buy_count = await recommendation_repository.count({"recommendation": "BUY"})
+        hold_count = await recommendation_repository.count({"recommendation": "HOLD"})
+        sell_count = await recommendation_repository.count({"recommendation": "SELL"})
         print(f"\nRecommendations: {buy_count} BUY, {hold_count} HOLD, {sell_count} SELL")
         
         # Sample of all symbols now included
-        all_stocks = await db.investment_recommendations.find({"asset_type": "stock"}).to_list(1000)
+        all_stocks = await recommendation_repository.collection.find({"asset_type": "stock"}).to_list(1000)
         symbols = sorted([stock["symbol"] for stock in all_stocks])
         print(f"\nAll stock symbols now included ({len(symbols)} total):")
         print(", ".join(symbols))
@@ -596,7 +590,7 @@ async def add_popular_stocks():
     except Exception as e:
         print(f"Error adding stocks: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(add_popular_stocks())
\ No newline at end of file
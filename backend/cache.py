@@ -0,0 +1,139 @@
+"""In-process response caching for read-heavy API routes.
+
+Each cached route gets its own namespace with a TTL and a size bound.
+Entries are evicted least-recently-used once a namespace is full and are
+dropped wholesale when the underlying collection changes (see
+data_versions.py for how writer scripts signal that).
+"""
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class CacheBackend:
+    """Interface a cache namespace must implement"""
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    """Size-bounded LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+class CacheRegistry:
+    """Named cache namespaces, one per route, with per-namespace TTLs"""
+
+    def __init__(self, backend_factory: Callable[..., CacheBackend] = TTLCache):
+        self._backend_factory = backend_factory
+        self._namespaces: Dict[str, CacheBackend] = {}
+
+    def register(self, namespace: str, ttl: float, maxsize: int = 256) -> CacheBackend:
+        if namespace not in self._namespaces:
+            self._namespaces[namespace] = self._backend_factory(maxsize=maxsize, ttl=ttl)
+        return self._namespaces[namespace]
+
+    def namespace(self, namespace: str) -> CacheBackend:
+        return self._namespaces[namespace]
+
+    def invalidate(self, namespaces: Optional[Iterable[str]] = None) -> None:
+        """Drop every entry in the given namespaces (all of them by default)"""
+        targets = self._namespaces.keys() if namespaces is None else namespaces
+        for name in targets:
+            if name in self._namespaces:
+                self._namespaces[name].clear()
+
+    def stats(self) -> dict:
+        return {name: backend.stats() for name, backend in self._namespaces.items()}
+
+    def cached(self, namespace: str, ttl: float, maxsize: int = 256):
+        """Cache an async route handler's result keyed on its keyword arguments.
+
+        FastAPI always calls endpoints with keyword arguments, and
+        functools.wraps keeps the original signature visible to it.
+        """
+        backend = self.register(namespace, ttl=ttl, maxsize=maxsize)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                hit, value = backend.get(key)
+                if hit:
+                    return value
+                value = await func(*args, **kwargs)
+                backend.set(key, value)
+                return value
+            return wrapper
+        return decorator
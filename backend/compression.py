@@ -0,0 +1,254 @@
+"""Response compression with Accept-Encoding negotiation (brotli, gzip).
+
+CompressionMiddleware compresses bodies of allow-listed content types
+(JSON, NDJSON, text) once they reach MIN_COMPRESS_SIZE; smaller bodies
+gain less than the header overhead. Brotli is preferred when the client
+accepts it and the ``brotli`` package is installed, gzip otherwise. SSE
+(text/event-stream) is never compressed, since compressors hold data back.
+
+Versioned read routes (see conditional_get.py) carry a strong ETag that
+pins their body to a data version, so the compressed variant of such a
+response is computed once per (ETag, encoding), at a higher level than
+on-the-fly compression can afford, and reused until the version moves.
+A compressed variant gets its own ETag (``"tag-br"``, ``"tag-gzip"``),
+as a strong validator must; the suffix is stripped from If-None-Match on
+the way in so the conditional check still sees the base tag.
+"""
+import gzip
+import zlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from cache import CacheBackend
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "image/svg+xml",
+    "text/plain", "text/html", "text/css", "text/csv"
+)
+
+# On-the-fly levels: cheap enough to run on every response
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+# Cached variants are compressed once per data version; brotli 9+ costs
+# several times the CPU for about 1% fewer bytes on our pages
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 8
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Supported content codings, most preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Best supported coding the client accepts (by q-value, then our preference), or None"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.split(";")[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Whole-body compression; deterministic, so equal bodies give equal bytes"""
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compression for streamed (multi-message) bodies"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk)
+        return self._compressor.compress(chunk)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def variant_tag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding`` variant: "tag" -> "tag-gzip" """
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_variant_tags(if_none_match: str, encoding: str) -> Tuple[str, bool]:
+    """If-None-Match with this encoding's suffix removed, and whether any tag had it"""
+    suffix = f'-{encoding}"'
+    tags, stripped = [], False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.endswith(suffix):
+            tag, stripped = tag[:-len(suffix)] + '"', True
+        tags.append(tag)
+    return ", ".join(tags), stripped
+
+
+def add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """Compresses allow-listed responses; reuses compressed variants of ETag'd bodies"""
+
+    def __init__(self, app, minimum_size: int = MIN_COMPRESS_SIZE, cache: Optional[CacheBackend] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        await CompressionResponder(self, encoding)(scope, receive, send)
+
+
+class CompressionResponder:
+    """Per-request state: holds the response start until the first body message decides the coding"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str]):
+        self.app = middleware.app
+        self.minimum_size = middleware.minimum_size
+        self.cache = middleware.cache
+        self.encoding = encoding
+        self.send = None
+        self.start = None
+        self.stream: Optional[StreamCompressor] = None
+        self.passthrough = False
+        # The client revalidated the compressed variant, so a 304 must name it too
+        self.revalidating_variant = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        if self.encoding:
+            scope = self.strip_if_none_match(scope)
+        await self.app(scope, receive, self.send_compressed)
+
+    def strip_if_none_match(self, scope):
+        headers: List[Tuple[bytes, bytes]] = []
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                stripped, self.revalidating_variant = strip_variant_tags(value.decode("latin-1"), self.encoding)
+                value = stripped.encode("latin-1")
+            headers.append((name, value))
+        return {**scope, "headers": headers}
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+        if self.stream is not None:
+            await self.send_stream_chunk(message)
+            return
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=list(start.get("headers", [])))
+        start = {**start, "headers": headers.raw}
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        etag = headers.get("etag")
+
+        # A 304 has no body or content type; it names the variant the client holds
+        if start["status"] == 304:
+            if etag:
+                add_vary(headers)
+                if self.revalidating_variant:
+                    headers["etag"] = variant_tag(etag, self.encoding)
+            await self.send(start)
+            await self.send(message)
+            return
+
+        if "content-encoding" in headers or not is_compressible(headers.get("content-type", "")):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+        add_vary(headers)
+
+        if not self.encoding or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers["content-encoding"] = self.encoding
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = variant_tag(etag, self.encoding)
+
+        if more_body:
+            del headers["content-length"]
+            self.stream = StreamCompressor(self.encoding)
+            await self.send(start)
+            await self.send_stream_chunk(message)
+            return
+
+        body = self.compressed_body(body, etag if start["status"] == 200 else None)
+        headers["content-length"] = str(len(body))
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+    def compressed_body(self, body: bytes, etag: Optional[str]) -> bytes:
+        """Cached variant for strong-ETag'd bodies, on-the-fly compression otherwise"""
+        if self.cache is None or not etag or etag.startswith("W/"):
+            return compress(body, self.encoding)
+        key = (etag, self.encoding)
+        hit, compressed = self.cache.get(key)
+        if not hit:
+            compressed = compress(body, self.encoding, cached=True)
+            self.cache.set(key, compressed)
+        return compressed
+
+    async def send_stream_chunk(self, message):
+        chunk = self.stream.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            chunk += self.stream.finish()
+        elif not chunk:
+            return
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,149 @@
+"""Conditional GET for read routes, validated by collection data versions.
+
+Every writer bumps its collections' counters in ``data_versions`` and the
+API already polls them (data_versions.DataVersionWatcher), so a worker
+always knows, in memory, which version of the data a response reflects.
+Read routes mark the collections they depend on:
+
+    @api_router.get("/news")
+    @versioned("news_articles")
+    async def get_news_articles(...):
+
+and ConditionalGetMiddleware, in front of the router, gives their 200
+responses a strong ETag (a hash of the URL and those versions) plus a
+``Last-Modified`` from the latest bump. A request whose ``If-None-Match``
+(or, without one, ``If-Modified-Since``) still matches is answered 304
+before the route runs, so it never reaches Mongo or the response caches.
+
+Validators are computed when the request arrives: data read afterwards is
+at least that version, so a tag can only ever be older than its body,
+never newer. Until the first poll, or for a collection no writer has
+bumped yet, responses go out without validators.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from starlette.responses import Response
+from starlette.routing import Match
+
+from data_versions import DataVersionWatcher
+
+# Stored, but revalidated on every use: the data can change at any poll
+CACHE_CONTROL = "no-cache"
+
+
+def versioned(*collections: str) -> Callable:
+    """Mark a read route whose response depends only on these collections"""
+    def mark(endpoint: Callable) -> Callable:
+        endpoint.data_collections = collections
+        return endpoint
+    return mark
+
+
+def http_date(value: datetime) -> str:
+    """RFC 7231 date of a naive UTC timestamp"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def entity_tag(path: str, query: bytes, versions: Sequence[Tuple[str, int, Optional[datetime]]]) -> str:
+    """Strong ETag for one URL at the given (collection, version, bumped at) versions"""
+    digest = blake2b(digest_size=12)
+    digest.update(path.encode())
+    digest.update(b"?" + query)
+    for collection, version, updated_at in versions:
+        # The bump time tells apart counters restarted by dropping data_versions
+        digest.update(f"|{collection}:{version}:{updated_at.isoformat() if updated_at else ''}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/"x" matches "x" """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ConditionalGetMiddleware:
+    """ETag/Last-Modified on versioned GET routes, and 304s that skip the route entirely"""
+
+    def __init__(self, app, router, watcher: DataVersionWatcher):
+        self.app = app
+        self.router = router
+        self.watcher = watcher
+
+    def route_collections(self, scope) -> Optional[Tuple[str, ...]]:
+        """Collections the matched route is marked with, resolved the way the router will"""
+        for route in self.router.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(child_scope.get("endpoint"), "data_collections", None)
+        return None
+
+    def validators(self, scope, collections: Tuple[str, ...]) -> Optional[List[Tuple[bytes, bytes]]]:
+        versions = []
+        for collection in collections:
+            version = self.watcher.versions.get(collection)
+            if version is None:
+                return None
+            versions.append((collection, version, self.watcher.updated_at.get(collection)))
+
+        headers = [
+            (b"etag", entity_tag(scope["path"], scope.get("query_string", b""), versions).encode()),
+            (b"cache-control", CACHE_CONTROL.encode())
+        ]
+        bumped = [updated_at for _, _, updated_at in versions]
+        if all(bumped):
+            headers.append((b"last-modified", http_date(max(bumped)).encode()))
+        return headers
+
+    def not_modified(self, scope, validators: List[Tuple[bytes, bytes]]) -> bool:
+        request_headers = dict(scope["headers"])
+        response_headers = dict(validators)
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match.decode("latin-1"), response_headers[b"etag"].decode())
+
+        if_modified_since = request_headers.get(b"if-modified-since")
+        last_modified = response_headers.get(b"last-modified")
+        if if_modified_since is None or last_modified is None:
+            return False
+        since = parse_http_date(if_modified_since.decode("latin-1"))
+        return since is not None and parse_http_date(last_modified.decode()) <= since
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        collections = self.route_collections(scope)
+        validators = self.validators(scope, collections) if collections else None
+        if validators is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.not_modified(scope, validators):
+            headers = {name.decode(): value.decode() for name, value in validators}
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message["headers"] = list(message.get("headers", [])) + validators
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
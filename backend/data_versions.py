@@ -0,0 +1,91 @@
+"""Per-collection data version counters shared by the API and writer scripts.
+
+Writers (update_data.py, comprehensive_update.py, ...) run as separate
+processes, so they cannot reach the API's in-process caches directly.
+Instead they bump a counter in the ``data_versions`` collection and every
+API worker polls those counters, invalidating whatever depends on a
+collection whose version moved. The same counters (and the time of the
+last bump) back the ETag and Last-Modified validators of the read routes.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSIONS_COLLECTION = "data_versions"
+
+
+async def bump_data_version(db, *collections: str) -> None:
+    """Increment the data version of each named collection"""
+    if not collections:
+        return
+    now = datetime.utcnow()
+    await db[DATA_VERSIONS_COLLECTION].bulk_write([
+        UpdateOne(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+            upsert=True
+        )
+        for name in collections
+    ], ordered=False)
+
+
+async def get_data_versions(db) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """Return the current version and last bump time of every tracked collection"""
+    docs = await db[DATA_VERSIONS_COLLECTION].find({}, {"version": 1, "updated_at": 1}).to_list(None)
+    return {doc["_id"]: (doc.get("version", 0), doc.get("updated_at")) for doc in docs}
+
+
+class DataVersionWatcher:
+    """Polls data_versions and notifies listeners when a collection changes"""
+
+    def __init__(self, db, interval: float = 5.0):
+        self.db = db
+        self.interval = interval
+        self.versions: Dict[str, int] = {}
+        self.updated_at: Dict[str, Optional[datetime]] = {}
+        self._listeners: List[Callable[[str, int], Optional[Awaitable[None]]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, listener: Callable[[str, int], Optional[Awaitable[None]]]) -> None:
+        self._listeners.append(listener)
+
+    async def _notify(self, collection: str, version: int) -> None:
+        for listener in self._listeners:
+            result = listener(collection, version)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def check(self) -> None:
+        """Fetch versions once and notify listeners about any that moved"""
+        latest = await get_data_versions(self.db)
+        for collection, (version, updated_at) in latest.items():
+            if self.versions.get(collection) != version:
+                self.updated_at[collection] = updated_at
+                self.versions[collection] = version
+                await self._notify(collection, version)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning(f"Data version poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
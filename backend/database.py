@@ -0,0 +1,199 @@
+"""Shared MongoDB access: one pooled Motor client per process, plus repositories.
+
+The API and every script get their client from get_client() instead of
+building their own, so pool size, timeouts and wire compression are tuned
+here, from the environment (``.env`` next to this file):
+
+    MONGO_MAX_POOL_SIZE                connections per process (default 100)
+    MONGO_MIN_POOL_SIZE                kept open while idle, and opened by warm_up() (default 5)
+    MONGO_MAX_IDLE_TIME_MS             idle connections above the minimum are closed after this
+    MONGO_SERVER_SELECTION_TIMEOUT_MS  fail fast when no server is reachable (default 5000)
+    MONGO_CONNECT_TIMEOUT_MS           TCP + TLS handshake limit (default 10000)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS        how long a request may wait for a free connection
+    MONGO_COMPRESSORS                  wire compression, preferred first (default zstd,snappy,zlib;
+                                       codecs whose library isn't installed are skipped)
+    MONGO_ZLIB_LEVEL                   zlib level when zlib is negotiated (default 1: cheap)
+
+The client is created on first use and lives until close_client(), so a
+gunicorn worker keeps one pool for its lifetime and scripts reuse theirs
+across every step. The repositories wrap the collections the writers and
+routes share, so the same documents are read and written the same way
+everywhere.
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from data_versions import bump_data_version
+
+load_dotenv(Path(__file__).parent / '.env')
+
+DEFAULT_MAX_POOL_SIZE = 100
+DEFAULT_MIN_POOL_SIZE = 5
+DEFAULT_SERVER_SELECTION_TIMEOUT_MS = 5000
+DEFAULT_CONNECT_TIMEOUT_MS = 10000
+DEFAULT_COMPRESSORS = "zstd,snappy,zlib"
+DEFAULT_ZLIB_LEVEL = 1
+
+# Wire compressor -> module pymongo needs for it (zlib ships with Python)
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def available_compressors(requested: str) -> List[str]:
+    """The requested wire compressors whose libraries are importable, in order"""
+    names = [name.strip().lower() for name in requested.split(",") if name.strip()]
+    return [
+        name for name in names
+        if name in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[name]) is not None
+    ]
+
+
+def client_options() -> Dict[str, Any]:
+    """Pool, timeout and compression settings for the shared client"""
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", DEFAULT_MAX_POOL_SIZE),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", DEFAULT_MIN_POOL_SIZE),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", DEFAULT_SERVER_SELECTION_TIMEOUT_MS),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", DEFAULT_CONNECT_TIMEOUT_MS),
+        # Shows up in the server's logs and currentOp, per process
+        "appname": Path(sys.argv[0]).stem or "investing"
+    }
+    for option, env in (("maxIdleTimeMS", "MONGO_MAX_IDLE_TIME_MS"), ("waitQueueTimeoutMS", "MONGO_WAIT_QUEUE_TIMEOUT_MS")):
+        value = _env_int(env)
+        if value is not None:
+            options[option] = value
+
+    compressors = available_compressors(os.environ.get("MONGO_COMPRESSORS", DEFAULT_COMPRESSORS))
+    if compressors:
+        options["compressors"] = compressors
+        if "zlib" in compressors:
+            options["zlibCompressionLevel"] = _env_int("MONGO_ZLIB_LEVEL", DEFAULT_ZLIB_LEVEL)
+    return options
+
+
+def get_client() -> AsyncIOMotorClient:
+    """The process-wide client, created on first use"""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(os.environ['MONGO_URL'], **client_options())
+    return _client
+
+
+def get_database(name: Optional[str] = None) -> AsyncIOMotorDatabase:
+    return get_client()[name or os.environ['DB_NAME']]
+
+
+async def warm_up(connections: Optional[int] = None) -> int:
+    """Select a server and open ``connections`` pooled connections up front.
+
+    Concurrent pings each need their own connection, so the first requests
+    after startup find the handshakes already done. Returns how many
+    succeeded; raises only if none did.
+    """
+    client = get_client()
+    count = max(1, connections if connections is not None else client_options()["minPoolSize"])
+    results = await asyncio.gather(*(client.admin.command("ping") for _ in range(count)), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, Exception)]
+    if len(failures) == count:
+        raise failures[0]
+    return count - len(failures)
+
+
+def close_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+class Repository:
+    """One shared collection; documents are addressed by their ``id`` field"""
+
+    collection_name = ""
+
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None):
+        self.db = db if db is not None else get_database()
+        self.collection = self.db[self.collection_name]
+
+    async def get(self, doc_id: str, projection: Optional[dict] = None) -> Optional[dict]:
+        return await self.collection.find_one({"id": doc_id}, projection)
+
+    async def count(self, query: Optional[dict] = None) -> int:
+        return await self.collection.count_documents(query or {})
+
+    async def count_by(self, field: str, limit: int = 100) -> List[dict]:
+        """``{"_id": value, "count": n}`` per distinct value, most common first"""
+        pipeline = [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ]
+        return await self.collection.aggregate(pipeline).to_list(limit)
+
+    async def insert(self, doc: dict) -> None:
+        await self.collection.insert_one(doc)
+
+    async def insert_many(self, docs: List[dict]) -> int:
+        result = await self.collection.insert_many(docs)
+        return len(result.inserted_ids)
+
+    async def replace_all(self, docs: List[dict]) -> int:
+        """Drop every document and insert ``docs`` in their place"""
+        await self.collection.delete_many({})
+        return await self.insert_many(docs) if docs else 0
+
+    async def mark_changed(self) -> None:
+        """Bump the collection's data version so API caches and ETags move on"""
+        await bump_data_version(self.db, self.collection_name)
+
+
+class RecommendationRepository(Repository):
+    collection_name = "investment_recommendations"
+
+    async def list_by_recommendation(self, recommendation: str, limit: int = 1000) -> List[dict]:
+        return await self.collection.find({"recommendation": recommendation}).to_list(limit)
+
+    async def update_fields(self, doc_id: str, fields: dict) -> bool:
+        result = await self.collection.update_one({"id": doc_id}, {"$set": fields})
+        return result.modified_count > 0
+
+    async def symbol_for(self, doc_id: str) -> Optional[str]:
+        doc = await self.get(doc_id, {"_id": 0, "symbol": 1})
+        return doc["symbol"] if doc else None
+
+
+class NewsRepository(Repository):
+    collection_name = "news_articles"
+
+    async def insert_tagged(self, articles: List[dict]) -> int:
+        """Insert articles with their ``symbols`` filled in (see news_entities.py)"""
+        from news_entities import tag_articles
+
+        return await self.insert_many(await tag_articles(self.db, articles))
+
+    async def replace_all_tagged(self, articles: List[dict]) -> int:
+        await self.collection.delete_many({})
+        return await self.insert_tagged(articles) if articles else 0
+
+
+class StatusCheckRepository(Repository):
+    collection_name = "status_checks"
+
+    async def create(self, status_check: dict) -> dict:
+        await self.collection.insert_one(dict(status_check))
+        return status_check
+
+    async def list(self, limit: int = 1000) -> List[dict]:
+        return await self.collection.find().to_list(limit)
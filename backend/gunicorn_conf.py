@@ -0,0 +1,34 @@
+"""Gunicorn settings for running the API with several uvicorn workers.
+
+    gunicorn -c gunicorn_conf.py server:app
+
+Workers are forked before the app is imported (no preload), so every
+worker builds its own Motor client, caches and matcher indexes lazily on
+its own event loop and nothing is shared across the fork. What workers
+must agree on lives in MongoDB: data versions (cache invalidation) and
+admin job records and leases (jobs.py).
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8001")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Async workers: one per core is enough to keep every core busy with the
+# CPU-bound Q&A work; override with WEB_CONCURRENCY.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+preload_app = False
+
+# On SIGTERM workers stop accepting, finish in-flight requests and exit;
+# anything still open after graceful_timeout is cut off.
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 60))
+keepalive = int(os.environ.get("KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.environ.get("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", 1000))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
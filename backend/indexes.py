@@ -0,0 +1,206 @@
+"""Index declarations for every hot query, plus a COLLSCAN diagnostic.
+
+The API calls ensure_indexes() in the background at startup; the same
+module doubles as a command for operators:
+
+    python indexes.py            # create any missing indexes
+    python indexes.py --check    # explain() each route query, exit 1 on COLLSCAN
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from indicator_state import INDICATOR_STATE_COLLECTION
+from jobs import JOB_RETENTION_SECONDS, JOBS_COLLECTION
+from news_search import TEXT_INDEX
+from price_history import BUCKET_SIZE, PRICE_HISTORY_COLLECTION
+from synthetic_profiles import PROFILE_RETENTION_SECONDS, SYNTHETIC_PROFILES_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+# background=True is ignored by MongoDB 4.2+, where builds no longer block,
+# but keeps older servers from locking the collection during the build
+INDEXES: Dict[str, List[IndexModel]] = {
+    "investment_recommendations": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        IndexModel([("last_updated", DESCENDING), ("id", DESCENDING)], name="last_updated_id", background=True),
+        IndexModel(
+            [("asset_type", ASCENDING), ("last_updated", DESCENDING), ("id", DESCENDING)],
+            name="asset_type_last_updated_id", background=True
+        ),
+        IndexModel([("recommendation", ASCENDING)], name="recommendation", background=True),
+        IndexModel([("symbol", ASCENDING)], name="symbol", background=True),
+    ],
+    "news_articles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        IndexModel([("publish_date", DESCENDING), ("id", DESCENDING)], name="publish_date_id", background=True),
+        IndexModel(
+            [("category", ASCENDING), ("publish_date", DESCENDING), ("id", DESCENDING)],
+            name="category_publish_date_id", background=True
+        ),
+        # Related news per investment (symbols is multikey)
+        IndexModel(
+            [("symbols", ASCENDING), ("publish_date", DESCENDING), ("id", DESCENDING)],
+            name="symbols_publish_date_id", background=True
+        ),
+        # /news/browse filters (tags is multikey)
+        IndexModel(
+            [("author", ASCENDING), ("publish_date", DESCENDING), ("id", DESCENDING)],
+            name="author_publish_date_id", background=True
+        ),
+        IndexModel(
+            [("tags", ASCENDING), ("publish_date", DESCENDING), ("id", DESCENDING)],
+            name="tags_publish_date_id", background=True
+        ),
+        TEXT_INDEX,
+    ],
+    PRICE_HISTORY_COLLECTION: [
+        IndexModel(
+            [("symbol", ASCENDING), ("start", ASCENDING), ("end", ASCENDING)],
+            name="symbol_start_end", background=True
+        ),
+        # Only open buckets are indexed, so finding where to append stays
+        # cheap however many full buckets a symbol accumulates
+        IndexModel(
+            [("symbol", ASCENDING)], name="symbol_open_bucket", background=True,
+            partialFilterExpression={"count": {"$lt": BUCKET_SIZE}}
+        ),
+    ],
+    INDICATOR_STATE_COLLECTION: [
+        IndexModel([("symbol", ASCENDING)], name="symbol_unique", unique=True, background=True),
+    ],
+    SYNTHETIC_PROFILES_COLLECTION: [
+        IndexModel(
+            [("symbol", ASCENDING), ("trading_day", ASCENDING)],
+            name="symbol_trading_day_unique", unique=True, background=True
+        ),
+        # TTL index: MongoDB deletes profiles once their trading day is long gone
+        IndexModel(
+            [("created_at", ASCENDING)], name="created_at_ttl", background=True,
+            expireAfterSeconds=PROFILE_RETENTION_SECONDS
+        ),
+    ],
+    "status_checks": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+    ],
+    JOBS_COLLECTION: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+        # At most one queued job per name, even when two workers submit at once
+        IndexModel(
+            [("name", ASCENDING)], name="name_queued_unique", unique=True, background=True,
+            partialFilterExpression={"status": "queued"}
+        ),
+        # TTL index: finished jobs are forgotten after a week (unfinished ones have no finished_at)
+        IndexModel(
+            [("finished_at", ASCENDING)], name="finished_at_ttl", background=True,
+            expireAfterSeconds=JOB_RETENTION_SECONDS
+        ),
+    ],
+}
+
+# One representative query per route: (name, collection, filter, sort)
+ROUTE_QUERIES = [
+    ("GET /investments", "investment_recommendations", {}, [("last_updated", -1), ("id", -1)]),
+    ("GET /investments?asset_type", "investment_recommendations", {"asset_type": "stock"},
+     [("last_updated", -1), ("id", -1)]),
+    ("GET /investments/{id}", "investment_recommendations", {"id": "explain-probe"}, None),
+    ("balance_recommendations", "investment_recommendations", {"recommendation": "HOLD"}, None),
+    ("symbol lookup", "investment_recommendations", {"symbol": "AAPL"}, None),
+    ("GET /news", "news_articles", {}, [("publish_date", -1), ("id", -1)]),
+    ("GET /news?category", "news_articles", {"category": "Technology"}, [("publish_date", -1), ("id", -1)]),
+    ("GET /news/{id}", "news_articles", {"id": "explain-probe"}, None),
+    ("GET /investments/{id}/news", "news_articles", {"symbols": "AAPL"}, [("publish_date", -1), ("id", -1)]),
+    ("GET /news/browse?author", "news_articles", {"author": "Market Data Team"}, [("publish_date", -1), ("id", -1)]),
+    ("GET /news/browse?tags", "news_articles", {"tags": {"$all": ["Rates"]}}, [("publish_date", -1), ("id", -1)]),
+    ("GET /news/browse?month", "news_articles",
+     {"publish_date": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)}}, [("publish_date", -1), ("id", -1)]),
+    ("GET /news/search", "news_articles", {"$text": {"$search": "rates"}}, None),
+    ("GET /investments/{symbol}/history", PRICE_HISTORY_COLLECTION,
+     {"symbol": "AAPL", "start": {"$lte": datetime(2024, 1, 2)}, "end": {"$gte": datetime(2024, 1, 1)}},
+     [("start", 1)]),
+    ("price history append", PRICE_HISTORY_COLLECTION, {"symbol": "AAPL", "count": {"$lt": BUCKET_SIZE}}, None),
+    ("synthetic profiles", SYNTHETIC_PROFILES_COLLECTION,
+     {"symbol": {"$in": ["QXZ"]}, "trading_day": "2024-01-02"}, None),
+]
+
+
+async def ensure_indexes(db) -> None:
+    """Create every declared index; already-existing indexes are a no-op.
+
+    Indexes are created one at a time so a single failure (e.g. duplicate
+    ids blocking a unique index) doesn't stop the others from building.
+    """
+    for collection, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                logger.error(f"Could not build index {model.document['name']} on {collection}: {e}")
+        logger.info(f"Indexes ensured on {collection}")
+
+
+def _plan_stages(plan) -> List[str]:
+    """Every stage name anywhere in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def explain_route_queries(db) -> List[dict]:
+    """Winning-plan stages for each route query"""
+    results = []
+    for name, collection, query, sort in ROUTE_QUERIES:
+        cursor = db[collection].find(query).limit(100)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        stages = _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+        results.append({
+            "route": name,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages
+        })
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Ensure MongoDB indexes and verify query plans")
+    parser.add_argument("--check", action="store_true", help="explain() every route query and fail on COLLSCAN")
+    args = parser.parse_args()
+
+    from database import close_client, get_database
+
+    db = get_database()
+
+    try:
+        await ensure_indexes(db)
+        if not args.check:
+            print("✅ Indexes ensured")
+            return 0
+
+        failures = 0
+        for result in await explain_route_queries(db):
+            icon = "❌" if result["collscan"] else "✅"
+            print(f"{icon} {result['route']:<32} {' <- '.join(result['stages'])}")
+            failures += result["collscan"]
+        return 1 if failures else 0
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
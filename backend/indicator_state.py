@@ -0,0 +1,292 @@
+"""Rolling indicator state, advanced in constant time per price tick.
+
+indicators.py recomputes everything from a window of history; this module
+keeps just enough per symbol to move every indicator forward by one tick:
+
+* a ring buffer of the last 200 prices, with running sums for the SMAs,
+* the current EMAs,
+* Wilder-smoothed average gain and loss for the RSI,
+* a ring of the last 20 log returns with a sliding Welford mean/M2 for
+  the realized volatility.
+
+State lives in the indicator_state collection, one document per symbol,
+so a restarted updater carries on where the last one stopped. A tick
+reads only the scalars plus the ring slots it is about to evict, and
+writes back only those scalars and slots. Symbols with no state yet (new
+listings, or a fresh database) are rebuilt by replaying their price
+history, which is also the way to reset any drift in the running sums:
+
+    python indicator_state.py --rebuild
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import ReplaceOne, UpdateMany, UpdateOne
+
+from indicators import (
+    EMA_PERIODS, RSI_PERIOD, SMA_PERIODS, TRADING_DAYS, VOLATILITY_PERIOD,
+    load_price_matrix, rounded, rsi_from_averages
+)
+
+INDICATOR_STATE_COLLECTION = "indicator_state"
+
+# Ring buffer length: the longest simple moving average
+WINDOW = max(SMA_PERIODS)
+
+STATE_FIELDS = (
+    ("count", "last_price", "avg_gain", "avg_loss", "return_mean", "return_m2")
+    + tuple(f"sum_{period}" for period in SMA_PERIODS)
+    + tuple(f"ema_{period}" for period in EMA_PERIODS)
+)
+
+
+def _floats(values) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+class RollingState:
+    """Indicator state for a set of symbols, one array per field"""
+
+    def __init__(self, symbols: List[str], fields: Dict[str, np.ndarray]):
+        self.symbols = symbols
+        self.fields = fields
+
+    @classmethod
+    def empty(cls, symbols: List[str]) -> "RollingState":
+        fields = {name: np.zeros(len(symbols)) for name in STATE_FIELDS}
+        fields["last_price"][:] = np.nan
+        return cls(symbols, fields)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def step(self, prices: np.ndarray, leaving: Dict[int, np.ndarray],
+             leaving_return: np.ndarray) -> np.ndarray:
+        """Advance every row with a (non-NaN) price by one tick; returns the tick's log returns.
+
+        ``leaving[period]`` is the price ``period`` ticks back and
+        ``leaving_return`` the return VOLATILITY_PERIOD ticks back, i.e.
+        the values dropping out of each window.
+        """
+        f = self.fields
+        ticked = ~np.isnan(prices)
+        count = f["count"]
+        seen = count + 1
+
+        for period in SMA_PERIODS:
+            evicted = np.where(count >= period, leaving[period], 0.0)
+            f[f"sum_{period}"] = np.where(ticked, f[f"sum_{period}"] + prices - evicted, f[f"sum_{period}"])
+
+        # EMAs and Wilder averages start as plain means (weight 1/n), as in indicators._smoothed
+        for period in EMA_PERIODS:
+            current = f[f"ema_{period}"]
+            weight = np.where(seen <= period, 1 / seen, 2 / (period + 1))
+            updated = np.where(seen == 1, prices, current + weight * (prices - current))
+            f[f"ema_{period}"] = np.where(ticked, updated, current)
+
+        moved = ticked & (count >= 1)
+        changes = count  # price changes seen once this tick is counted
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = prices - f["last_price"]
+            log_return = np.log(prices / f["last_price"])
+        weight = np.where(changes <= RSI_PERIOD, 1 / np.maximum(changes, 1), 1 / RSI_PERIOD)
+        for name, value in (("avg_gain", np.maximum(change, 0)), ("avg_loss", np.maximum(-change, 0))):
+            updated = np.where(changes == 1, value, f[name] + weight * (value - f[name]))
+            f[name] = np.where(moved, updated, f[name])
+
+        # Sliding-window Welford: replace the evicted return once the window is full
+        mean, m2 = f["return_mean"], f["return_m2"]
+        full = (count - 1) >= VOLATILITY_PERIOD
+        delta = log_return - leaving_return
+        replaced_mean = mean + delta / VOLATILITY_PERIOD
+        replaced_m2 = m2 + delta * (log_return - replaced_mean + leaving_return - mean)
+        size = np.minimum(np.maximum(count - 1, 0), VOLATILITY_PERIOD) + 1
+        added_mean = mean + (log_return - mean) / size
+        added_m2 = m2 + (log_return - mean) * (log_return - added_mean)
+        f["return_mean"] = np.where(moved, np.where(full, replaced_mean, added_mean), mean)
+        f["return_m2"] = np.where(moved, np.where(full, replaced_m2, added_m2), m2)
+
+        f["last_price"] = np.where(ticked, prices, f["last_price"])
+        f["count"] = np.where(ticked, seen, count)
+        return log_return
+
+    def indicators(self) -> Dict[str, np.ndarray]:
+        """Current indicator values, NaN while a symbol's history is too short"""
+        f = self.fields
+        count = f["count"]
+        values = {
+            "rsi": np.where(count > RSI_PERIOD, rsi_from_averages(f["avg_gain"], f["avg_loss"]), np.nan)
+        }
+        for period in SMA_PERIODS:
+            values[f"moving_avg_{period}"] = np.where(count >= period, f[f"sum_{period}"] / period, np.nan)
+        for period in EMA_PERIODS:
+            values[f"ema_{period}"] = np.where(count >= period, f[f"ema_{period}"], np.nan)
+        variance = np.maximum(f["return_m2"], 0) / (VOLATILITY_PERIOD - 1)
+        values["volatility"] = np.where(count - 1 >= VOLATILITY_PERIOD, np.sqrt(variance * TRADING_DAYS), np.nan)
+        return rounded(values)
+
+
+def _slot_projection() -> dict:
+    """Aggregation fields fetching just the ring slots the next tick evicts"""
+    def element(array: str, back: int, size: int) -> dict:
+        index = {"$toInt": {"$mod": [{"$subtract": ["$count", back]}, size]}}
+        return {"$arrayElemAt": [f"${array}", index]}
+
+    projection = {f"leaving_{period}": element("prices", period, WINDOW) for period in SMA_PERIODS}
+    projection["leaving_return"] = element("returns", VOLATILITY_PERIOD + 1, VOLATILITY_PERIOD)
+    return projection
+
+
+async def load_state(db, symbols: Sequence[str]) -> Tuple[RollingState, Dict[int, np.ndarray], np.ndarray]:
+    """Stored state for whichever of ``symbols`` have it, plus their evicted ring values"""
+    pipeline = [
+        {"$match": {"symbol": {"$in": list(symbols)}}},
+        {"$project": {"_id": 0, "symbol": 1, **{name: 1 for name in STATE_FIELDS}, **_slot_projection()}}
+    ]
+    docs = await db[INDICATOR_STATE_COLLECTION].aggregate(pipeline).to_list(None)
+
+    state = RollingState([doc["symbol"] for doc in docs], {
+        name: _floats(doc.get(name) for doc in docs) for name in STATE_FIELDS
+    })
+    leaving = {period: _floats(doc.get(f"leaving_{period}") for doc in docs) for period in SMA_PERIODS}
+    return state, leaving, _floats(doc.get("leaving_return") for doc in docs)
+
+
+def _state_doc(state: RollingState, row: int) -> dict:
+    doc = {name: state.fields[name][row].item() for name in STATE_FIELDS}
+    doc["count"] = int(doc["count"])  # used as an array index by _slot_projection
+    return doc
+
+
+def _clean(values: np.ndarray) -> list:
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+async def rebuild_state(db, symbols: Optional[Sequence[str]] = None) -> RollingState:
+    """Replay recent price history into fresh state and store it (all symbols by default)"""
+    names, matrix = await load_price_matrix(db, symbols)
+    state = RollingState.empty(names)
+    prices_ring = np.full((len(names), WINDOW), np.nan)
+    returns_ring = np.full((len(names), VOLATILITY_PERIOD), np.nan)
+    rows = np.arange(len(names))
+
+    for column in matrix.T:
+        count = state.fields["count"].astype(int)
+        leaving = {period: prices_ring[rows, (count - period) % WINDOW] for period in SMA_PERIODS}
+        leaving_return = returns_ring[rows, (count - VOLATILITY_PERIOD - 1) % VOLATILITY_PERIOD]
+        log_return = state.step(column, leaving, leaving_return)
+
+        ticked = ~np.isnan(column)
+        prices_ring[rows[ticked], count[ticked] % WINDOW] = column[ticked]
+        moved = ticked & (count >= 1)
+        returns_ring[rows[moved], (count[moved] - 1) % VOLATILITY_PERIOD] = log_return[moved]
+
+    now = datetime.utcnow()
+    ops = [
+        ReplaceOne({"symbol": symbol}, {
+            "symbol": symbol,
+            **_state_doc(state, row),
+            "prices": _clean(prices_ring[row]),
+            "returns": _clean(returns_ring[row]),
+            "updated_at": now
+        }, upsert=True)
+        for row, symbol in enumerate(names)
+    ]
+    if ops:
+        await db[INDICATOR_STATE_COLLECTION].bulk_write(ops, ordered=False)
+    return state
+
+
+async def write_indicators(db, state: RollingState) -> int:
+    """``$set`` the state's current indicators on every recommendation for each symbol"""
+    indicators = state.indicators()
+    finite = {name: np.isfinite(values) for name, values in indicators.items()}
+    columns = {name: values.tolist() for name, values in indicators.items()}
+
+    ops = []
+    for row, symbol in enumerate(state.symbols):
+        update = {f"technical_indicators.{name}": columns[name][row] for name in columns if finite[name][row]}
+        if update:
+            ops.append(UpdateMany({"symbol": symbol}, {"$set": update}))
+    if ops:
+        await db.investment_recommendations.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def update_indicators(db, symbols: Sequence[str], prices: Sequence[float]) -> int:
+    """Advance each symbol's state by one tick and refresh its technical_indicators.
+
+    Call after the tick has been appended to price history: symbols with
+    no stored state are rebuilt from that history instead of stepped.
+    """
+    if isinstance(symbols, np.ndarray):
+        symbols = symbols.tolist()
+    tick_prices = dict(zip(symbols, np.asarray(prices, dtype=float).tolist()))
+
+    state, leaving, leaving_return = await load_state(db, list(tick_prices))
+    count = state.fields["count"].astype(int)
+    log_return = state.step(_floats(tick_prices[symbol] for symbol in state.symbols), leaving, leaving_return)
+
+    now = datetime.utcnow()
+    ops = []
+    for row, symbol in enumerate(state.symbols):
+        update = {
+            **_state_doc(state, row),
+            f"prices.{count[row] % WINDOW}": tick_prices[symbol],
+            "updated_at": now
+        }
+        if count[row] >= 1:
+            update[f"returns.{(count[row] - 1) % VOLATILITY_PERIOD}"] = log_return[row].item()
+        ops.append(UpdateOne({"symbol": symbol}, {"$set": update}))
+    if ops:
+        await db[INDICATOR_STATE_COLLECTION].bulk_write(ops, ordered=False)
+
+    updated = await write_indicators(db, state)
+    stored = set(state.symbols)
+    missing = [symbol for symbol in tick_prices if symbol not in stored]
+    if missing:
+        updated += await write_indicators(db, await rebuild_state(db, missing))
+    return updated
+
+
+# Seconds --rebuild waits for a market data refresh in progress
+REBUILD_LEASE_TIMEOUT = 300
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Maintain rolling technical-indicator state")
+    parser.add_argument("--rebuild", action="store_true", help="replay price history into fresh state for every symbol")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return 0
+
+    from data_versions import bump_data_version
+    from database import close_client, get_database
+    from jobs import LeaseTimeout, hold_lease
+    from market_updates import MARKET_DATA_LEASE
+
+    db = get_database()
+
+    try:
+        # A refresh advancing state while we replay would be overwritten
+        async with hold_lease(db, MARKET_DATA_LEASE, timeout=REBUILD_LEASE_TIMEOUT):
+            state = await rebuild_state(db)
+            updated = await write_indicators(db, state)
+            if updated:
+                await bump_data_version(db, "investment_recommendations")
+        print(f"✅ Rebuilt indicator state for {len(state)} symbols, updated {updated}")
+        return 0
+    except LeaseTimeout:
+        print("❌ A market data refresh is still running; try the rebuild again later")
+        return 1
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
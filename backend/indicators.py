@@ -0,0 +1,164 @@
+"""Technical indicators computed from price history, for every symbol at once.
+
+The recent ticks of the whole universe are laid out as one symbols x time
+matrix (oldest on the left, NaN-padded where a symbol has less history),
+and every indicator is a handful of NumPy operations over that matrix, so
+the cost is a few hundred vector steps whatever the universe size. An
+indicator is only written back once a symbol has enough history for it;
+until then the stored value is left alone.
+
+The updaters advance indicators tick by tick through indicator_state.py;
+the full-window computation here seeds that state and serves as its
+reference.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from price_history import PRICE_HISTORY_COLLECTION
+from update_engine import commit_updates, load_frame
+
+RSI_PERIOD = 14
+SMA_PERIODS = (50, 200)
+EMA_PERIODS = (12, 26)
+VOLATILITY_PERIOD = 20
+INDICATOR_DECIMALS = {"rsi": 1, "volatility": 3}
+
+# Each update pass simulates a trading day's move, so realized volatility
+# is annualised over trading days
+TRADING_DAYS = 252
+
+# Ticks kept per symbol: the longest average plus room for the EMAs to settle
+LOOKBACK_TICKS = 250
+HISTORY_WINDOW = timedelta(days=14)
+
+
+async def load_price_matrix(db, symbols: Optional[Sequence[str]] = None, lookback: int = LOOKBACK_TICKS,
+                            since: Optional[datetime] = None) -> Tuple[List[str], np.ndarray]:
+    """Symbols and their last ``lookback`` prices as a right-aligned, NaN-padded matrix"""
+    query = {"end": {"$gte": since or datetime.utcnow() - HISTORY_WINDOW}}
+    if symbols is not None:
+        query["symbol"] = {"$in": list(symbols)}
+    cursor = db[PRICE_HISTORY_COLLECTION].find(query, {"_id": 0, "symbol": 1, "t": 1, "p": 1})
+
+    ticks: Dict[str, Tuple[list, list]] = {}
+    async for bucket in cursor:
+        times, prices = ticks.setdefault(bucket["symbol"], ([], []))
+        times.extend(bucket.get("t", []))
+        prices.extend(bucket.get("p", []))
+
+    names = sorted(ticks)
+    matrix = np.full((len(names), lookback), np.nan)
+    for row, symbol in enumerate(names):
+        times, prices = ticks[symbol]
+        order = np.argsort(np.array(times, dtype="datetime64[us]"), kind="stable")
+        tail = np.array(prices, dtype=float)[order][-lookback:]
+        matrix[row, lookback - len(tail):] = tail
+    return names, matrix
+
+
+def _history(prices: np.ndarray) -> np.ndarray:
+    """Number of ticks each row actually has"""
+    return np.count_nonzero(~np.isnan(prices), axis=1)
+
+
+def _smoothed(values: np.ndarray, period: int, wilder: bool = False) -> np.ndarray:
+    """Row-wise exponential average, seeded with the simple mean of the first ``period`` values.
+
+    Weighting the n-th value by 1/n while n <= period builds that mean
+    incrementally; after it the usual smoothing factor takes over.
+    """
+    floor = 1 / period if wilder else 2 / (period + 1)
+    average = np.full(values.shape[0], np.nan)
+    seen = np.zeros(values.shape[0])
+    for column in values.T:
+        valid = ~np.isnan(column)
+        seen += valid
+        weight = np.where(seen <= period, 1 / np.maximum(seen, 1), floor)
+        updated = np.where(seen == 1, column, average + weight * (column - average))
+        average = np.where(valid, updated, average)
+    return average
+
+
+def sma(prices: np.ndarray, period: int) -> np.ndarray:
+    window = prices[:, -period:]
+    total = np.nansum(window, axis=1)
+    return np.where(_history(window) == period, total / period, np.nan)
+
+
+def ema(prices: np.ndarray, period: int) -> np.ndarray:
+    return np.where(_history(prices) >= period, _smoothed(prices, period), np.nan)
+
+
+def rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - 100 / (1 + avg_gain / avg_loss)
+    # No losses at all: fully overbought, or neutral if the price never moved
+    return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), value)
+
+
+def rsi(prices: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder's RSI over each row"""
+    change = np.diff(prices, axis=1)
+    avg_gain = _smoothed(np.where(np.isnan(change), np.nan, np.maximum(change, 0)), period, wilder=True)
+    avg_loss = _smoothed(np.where(np.isnan(change), np.nan, np.maximum(-change, 0)), period, wilder=True)
+    return np.where(_history(prices) > period, rsi_from_averages(avg_gain, avg_loss), np.nan)
+
+
+def realized_volatility(prices: np.ndarray, period: int = VOLATILITY_PERIOD) -> np.ndarray:
+    """Annualised standard deviation of the last ``period`` log returns"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(prices[:, -(period + 1):]), axis=1)
+    count = _history(returns)
+    mean = np.nansum(returns, axis=1) / np.maximum(count, 1)
+    variance = np.nansum((returns - mean[:, None]) ** 2, axis=1) / np.maximum(count - 1, 1)
+    return np.where(count == period, np.sqrt(variance * TRADING_DAYS), np.nan)
+
+
+def rounded(indicators: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Round to the precision stored on recommendations"""
+    return {name: np.round(values, INDICATOR_DECIMALS.get(name, 2)) for name, values in indicators.items()}
+
+
+def compute_indicators(prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """Every technical indicator for every row, keyed by TechnicalIndicators field"""
+    indicators = {"rsi": rsi(prices)}
+    for period in SMA_PERIODS:
+        indicators[f"moving_avg_{period}"] = sma(prices, period)
+    for period in EMA_PERIODS:
+        indicators[f"ema_{period}"] = ema(prices, period)
+    indicators["volatility"] = realized_volatility(prices)
+    return rounded(indicators)
+
+
+def build_indicator_ops(ids: List, doc_symbols: Sequence[str], symbols: List[str],
+                        indicators: Dict[str, np.ndarray]) -> List[UpdateOne]:
+    """``$set`` each recommendation's computed indicators, skipping any still warming up"""
+    rows = {symbol: row for row, symbol in enumerate(symbols)}
+    columns = {name: values.tolist() for name, values in indicators.items()}
+    finite = {name: np.isfinite(values).tolist() for name, values in indicators.items()}
+
+    ops = []
+    for _id, symbol in zip(ids, doc_symbols):
+        row = rows.get(symbol)
+        if row is None:
+            continue
+        update = {
+            f"technical_indicators.{name}": columns[name][row]
+            for name in columns if finite[name][row]
+        }
+        if update:
+            ops.append(UpdateOne({"_id": _id}, {"$set": update}))
+    return ops
+
+
+async def refresh_indicators(db, symbols: Optional[Sequence[str]] = None) -> int:
+    """Recompute indicators from price history and write them in one bulk_write"""
+    query = {"symbol": {"$in": list(symbols)}} if symbols is not None else None
+    frame = await load_frame(db.investment_recommendations, {"symbol": ""}, query)
+    names, prices = await load_price_matrix(db, symbols)
+    ops = build_indicator_ops(frame.ids, frame["symbol"], names, compute_indicators(prices))
+    await commit_updates(db.investment_recommendations, ops)
+    return len(ops)
@@ -0,0 +1,208 @@
+"""Background jobs for admin operations, coordinated through MongoDB.
+
+Jobs run as asyncio tasks on the event loop of the worker that accepted
+them, so they reuse that worker's Motor client and never block request
+handling. Under multi-worker gunicorn the rest lives in MongoDB, so every
+worker (and every writer script) sees the same state:
+
+* Job records are stored in ``admin_jobs``, so GET /api/admin/jobs/{id}
+  answers from whichever worker the request lands on. A second submission
+  of a job that is still queued, from any worker, gets the queued job back.
+* Before doing any work a job takes a lease in ``job_leases``: one
+  document per lease name, claimed with findOneAndUpdate only if it is
+  free or expired. Jobs sharing a lease name (and scripts such as
+  update_data.py that hold the same lease) therefore run one at a time
+  across processes, so two refreshes can never race on the same documents.
+
+Leases expire after LEASE_SECONDS and are renewed while the work runs, so
+a crashed holder blocks the next job for at most that long. Queued and
+running jobs heartbeat at the same rate; a record whose heartbeat has gone
+stale belongs to a worker that died or was recycled and is marked failed.
+Finished records are removed by a TTL index after JOB_RETENTION_SECONDS.
+"""
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = "admin_jobs"
+LEASES_COLLECTION = "job_leases"
+JOB_RETENTION_SECONDS = 7 * 86400
+
+LEASE_SECONDS = 60
+# Renew (and heartbeat) three times per lease, so one slow write doesn't lose it
+RENEW_SECONDS = LEASE_SECONDS / 3
+LEASE_POLL_SECONDS = 2.0
+
+
+class LeaseTimeout(TimeoutError):
+    """The lease stayed held by someone else for longer than the caller would wait"""
+
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    status: str = "queued"  # "queued", "running", "succeeded", "failed"
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: datetime = Field(default_factory=datetime.utcnow)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+async def acquire_lease(db, name: str, holder: str, seconds: float = LEASE_SECONDS) -> bool:
+    """Claim (or renew) lease ``name`` for ``holder``; False if someone else holds it"""
+    now = datetime.utcnow()
+    try:
+        lease = await db[LEASES_COLLECTION].find_one_and_update(
+            {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lte": now}}]},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Held and unexpired: the upsert tried to insert a second lease document
+        return False
+    return lease is not None and lease["holder"] == holder
+
+
+async def release_lease(db, name: str, holder: str) -> None:
+    await db[LEASES_COLLECTION].delete_one({"_id": name, "holder": holder})
+
+
+@asynccontextmanager
+async def hold_lease(db, name: str, holder: Optional[str] = None, timeout: Optional[float] = None,
+                     on_wait: Optional[Callable[[], Awaitable[None]]] = None) -> AsyncIterator[str]:
+    """Wait for lease ``name``, keep it renewed for the block, then release it.
+
+    Raises LeaseTimeout if it is still held elsewhere after ``timeout``
+    seconds; ``on_wait`` runs on every poll while waiting.
+    """
+    holder = holder or str(uuid.uuid4())
+    deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+    while not await acquire_lease(db, name, holder):
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            raise LeaseTimeout(f"Lease {name} is held by another process")
+        if on_wait is not None:
+            await on_wait()
+        await asyncio.sleep(LEASE_POLL_SECONDS)
+
+    async def renew():
+        while True:
+            await asyncio.sleep(RENEW_SECONDS)
+            try:
+                if not await acquire_lease(db, name, holder):
+                    logger.warning(f"Lease {name} expired and was taken over while {holder} held it")
+            except Exception as e:
+                logger.warning(f"Could not renew lease {name}: {e}")
+
+    renewal = asyncio.create_task(renew())
+    try:
+        yield holder
+    finally:
+        renewal.cancel()
+        await asyncio.gather(renewal, return_exceptions=True)
+        await release_lease(db, name, holder)
+
+
+class JobRunner:
+    """Runs submitted coroutines under MongoDB leases and records their outcomes"""
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[JOBS_COLLECTION]
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def submit(self, name: str, work: Callable[[], Awaitable[Optional[dict]]],
+                     lease: Optional[str] = None) -> Job:
+        """Queue ``work`` under ``lease`` (default: the job name).
+
+        Returns the already-queued job of the same name, from any worker, if any.
+        """
+        queued = await self._live_queued(name)
+        if queued is not None:
+            return queued
+
+        job = Job(name=name)
+        try:
+            await self.collection.insert_one(job.dict())
+        except DuplicateKeyError:
+            # Another worker queued the same job in the meantime (name_queued_unique)
+            queued = await self._live_queued(name)
+            if queued is not None:
+                return queued
+            raise
+        self._tasks[job.id] = asyncio.create_task(self._run(job, work, lease or name))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        doc = await self.collection.find_one({"id": job_id}, {"_id": 0})
+        if doc is None:
+            return None
+        if await self._fail_if_stale(doc):
+            doc = await self.collection.find_one({"id": job_id}, {"_id": 0})
+        return Job(**doc)
+
+    async def _live_queued(self, name: str) -> Optional[Job]:
+        doc = await self.collection.find_one({"name": name, "status": "queued"}, {"_id": 0})
+        if doc is None or await self._fail_if_stale(doc):
+            return None
+        return Job(**doc)
+
+    async def _fail_if_stale(self, doc: dict) -> bool:
+        """Mark a queued/running job failed if its worker stopped heartbeating"""
+        stale_before = datetime.utcnow() - timedelta(seconds=LEASE_SECONDS)
+        if doc["status"] not in ("queued", "running") or doc["heartbeat_at"] > stale_before:
+            return False
+        await self.collection.update_one(
+            {"id": doc["id"], "status": doc["status"], "heartbeat_at": doc["heartbeat_at"]},
+            {"$set": {"status": "failed", "finished_at": datetime.utcnow(),
+                      "error": "The worker running this job stopped before it finished"}}
+        )
+        return True
+
+    async def _update(self, job: Job, **fields) -> None:
+        for field, value in fields.items():
+            setattr(job, field, value)
+        await self.collection.update_one({"id": job.id}, {"$set": fields})
+
+    async def _run(self, job: Job, work: Callable[[], Awaitable[Optional[dict]]], lease: str) -> None:
+        async def heartbeat():
+            await self._update(job, heartbeat_at=datetime.utcnow())
+
+        async def keep_heartbeat():
+            while True:
+                await asyncio.sleep(RENEW_SECONDS)
+                await heartbeat()
+
+        beating = None
+        try:
+            async with hold_lease(self.db, lease, holder=job.id, on_wait=heartbeat):
+                await self._update(job, status="running", started_at=datetime.utcnow(), heartbeat_at=datetime.utcnow())
+                beating = asyncio.create_task(keep_heartbeat())
+                result = await work()
+            await self._update(job, status="succeeded", result=result, finished_at=datetime.utcnow())
+        except asyncio.CancelledError:
+            await self._update(job, status="failed", error="Cancelled by worker shutdown", finished_at=datetime.utcnow())
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job.name} ({job.id}) failed")
+            await self._update(job, status="failed", error=str(e), finished_at=datetime.utcnow())
+        finally:
+            if beating is not None:
+                beating.cancel()
+            self._tasks.pop(job.id, None)
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
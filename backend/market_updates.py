@@ -0,0 +1,94 @@
+"""The periodic market refresh, shared by update_data.py and the API.
+
+Each pass takes the database handle to write to, so the same code runs
+from the cron-style script (with its own client) and in-process from
+POST /api/admin/refresh-data (reusing the API's client). Every writer of
+prices, ticks and indicator state holds MARKET_DATA_LEASE (see jobs.py)
+while it runs: the admin refresh job, update_data.py,
+comprehensive_update.py, backend/update_market_data_full.py and
+indicator_state.py --rebuild. So none of them ever overlap.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from data_versions import bump_data_version
+from indicator_state import update_indicators
+from price_history import append_ticks
+from update_engine import apply_price_moves, build_set_ops, commit_updates, load_frame, rng, staggered_timestamps
+
+# Lease every read-modify-write pass over investment_recommendations takes
+MARKET_DATA_LEASE = "market-data"
+
+# Price swings are scaled by the asset's risk level
+RISK_VOLATILITY_MULTIPLIERS = {
+    "LOW": 0.3,
+    "MEDIUM": 0.7,
+    "HIGH": 1.2
+}
+
+
+async def update_investment_prices(db) -> int:
+    """Update investment recommendation prices with realistic market movements"""
+    
+    frame = await load_frame(db.investment_recommendations, {"symbol": "", "current_price": 0.0, "risk_level": "MEDIUM"})
+    
+    # Generate realistic price movement (±3% max daily change), scaled by risk level
+    price_change_percent = rng.uniform(-3.0, 3.0, len(frame))
+    price_change_percent *= frame.lookup("risk_level", RISK_VOLATILITY_MULTIPLIERS, 0.7)
+    
+    # Don't drop more than 50% or rise more than 100%
+    new_prices, price_change_amount = apply_price_moves(
+        frame["current_price"], price_change_percent, floor=0.5, cap=2.0
+    )
+    
+    now = datetime.utcnow()
+    new_prices = np.round(new_prices, 2)
+    ops = build_set_ops(frame.ids, {
+        "current_price": new_prices,
+        "price_change_24h": np.round(price_change_amount, 2),
+        "price_change_percent": np.round(price_change_percent, 2),
+        "last_updated": now
+    })
+    await commit_updates(db.investment_recommendations, ops)
+    await append_ticks(db, frame["symbol"], new_prices, now)
+    await update_indicators(db, frame["symbol"], new_prices)
+    return len(frame)
+
+
+async def update_news_timestamps(db) -> int:
+    """Update news article timestamps to keep them fresh"""
+    
+    frame = await load_frame(db.news_articles, {})
+    
+    # Stagger articles 4 hours apart going back from now
+    ops = build_set_ops(frame.ids, {
+        "publish_date": staggered_timestamps(datetime.utcnow(), len(frame), hours_apart=4)
+    })
+    await commit_updates(db.news_articles, ops)
+    return len(frame)
+
+
+async def update_confidence_scores(db) -> int:
+    """Slightly adjust confidence scores to simulate market sentiment changes"""
+    
+    frame = await load_frame(db.investment_recommendations, {"confidence_score": 0})
+    
+    # Small random adjustment (±5 points max), kept within 50-95
+    adjustment = rng.integers(-5, 5, len(frame), endpoint=True)
+    new_confidence = np.clip(frame["confidence_score"] + adjustment, 50, 95).astype(int)
+    
+    ops = build_set_ops(frame.ids, {"confidence_score": new_confidence})
+    await commit_updates(db.investment_recommendations, ops)
+    return len(frame)
+
+
+async def refresh_market_data(db) -> dict:
+    """Run every refresh pass, then bump data versions so caches drop"""
+    summary = {
+        "prices_updated": await update_investment_prices(db),
+        "confidence_scores_updated": await update_confidence_scores(db),
+        "news_timestamps_updated": await update_news_timestamps(db)
+    }
+    await bump_data_version(db, "investment_recommendations", "news_articles")
+    return summary
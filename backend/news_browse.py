@@ -0,0 +1,111 @@
+"""Faceted news browsing: a page of articles plus facet counts in one query.
+
+The UI lists articles next to counts by category, tag, author and
+publish month for the same filters. Instead of a list call plus a
+``$group`` per facet, a single aggregation matches the filters (on an
+index), sorts newest first (on the same index), and fans out with
+``$facet``: one branch cuts the keyset page, the others count.
+
+Counting has to visit every matching article, so the counts are cached
+for a short TTL per filter combination. While they are cached, further
+pages (or repeat requests) are a plain keyset ``find`` instead, so any
+browse request is still one round-trip.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from cache import CacheBackend
+from pagination import keyset_query, sort_spec, split_page
+
+# Most frequent values returned per facet (months: most recent)
+FACET_LIMIT = 50
+FACETS = ("category", "tags", "author", "month")
+
+
+def _counts(field: str) -> List[dict]:
+    return [
+        {"$group": {"_id": field, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": FACET_LIMIT}
+    ]
+
+
+FACET_STAGES = {
+    "category": _counts("$category"),
+    "tags": [{"$unwind": "$tags"}] + _counts("$tags"),
+    "author": _counts("$author"),
+    "month": [
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m", "date": "$publish_date"}}, "count": {"$sum": 1}}},
+        {"$sort": {"_id": -1}},
+        {"$limit": FACET_LIMIT}
+    ]
+}
+
+
+def month_range(month: str) -> Tuple[datetime, datetime]:
+    """[start, end) of a "YYYY-MM" month"""
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must look like YYYY-MM")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def browse_filter(category: Optional[str], tags: Tuple[str, ...], author: Optional[str],
+                  month: Optional[str]) -> dict:
+    query = {}
+    if category:
+        query["category"] = category
+    if tags:
+        query["tags"] = {"$all": list(tags)}
+    if author:
+        query["author"] = author
+    if month:
+        start, end = month_range(month)
+        query["publish_date"] = {"$gte": start, "$lt": end}
+    return query
+
+
+def facet_counts(result: dict) -> Dict[str, List[dict]]:
+    return {
+        facet: [{"value": row["_id"], "count": row["count"]} for row in result.get(facet, [])]
+        for facet in FACETS
+    }
+
+
+async def browse_articles(collection, facet_cache: CacheBackend, projection: dict,
+                          category: Optional[str], tags: Tuple[str, ...], author: Optional[str],
+                          month: Optional[str], cursor: Optional[str],
+                          limit: int) -> Tuple[List[dict], Optional[str], Dict[str, List[dict]]]:
+    """One page of articles, the next-page cursor (or None) and the facet counts"""
+    query = browse_filter(category, tags, author, month)
+    page_query = keyset_query(query, "publish_date", cursor)
+    facet_key = (category, tags, author, month)
+
+    hit, facets = facet_cache.get(facet_key)
+    if hit:
+        docs = await collection.find(page_query, projection) \
+            .sort(sort_spec("publish_date")).limit(limit + 1).to_list(limit + 1)
+        articles, next_cursor = split_page(docs, "publish_date", limit)
+        return articles, next_cursor, facets
+
+    # Facets count the whole filtered set; only the page branch applies the cursor
+    page_branch = [{"$limit": limit + 1}]
+    if cursor:
+        page_branch.insert(0, {"$match": keyset_query({}, "publish_date", cursor)})
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(sort_spec("publish_date"))},
+        {"$project": projection},
+        {"$facet": {"articles": page_branch, **FACET_STAGES}}
+    ]
+    results = await collection.aggregate(pipeline).to_list(1)
+    result = results[0] if results else {}
+
+    facets = facet_counts(result)
+    facet_cache.set(facet_key, facets)
+    articles, next_cursor = split_page(result.get("articles", []), "publish_date", limit)
+    return articles, next_cursor, facets
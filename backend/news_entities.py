@@ -0,0 +1,164 @@
+"""Link news articles to the investments they mention.
+
+Every article carries a ``symbols`` array, filled in once when it is
+written, so "related news" for an investment is one indexed query on
+``{symbols: SYM}`` instead of a regex over every article. NewsTagger
+builds, from the current recommendations:
+
+* an Aho-Corasick automaton (symbol_matcher.AhoCorasick) over lower-cased
+  company names and their short forms ("Apple Inc." -> "apple"), scanned
+  once per article and accepted only on word boundaries,
+* a hash set of ticker symbols, looked up for every capitalised token of
+  the original text. Tickers that are also words or initials (T, V, MA,
+  ALL...) only count when written as ``$SYM`` or ``(SYM)``.
+
+Writers call tag_articles() before inserting. Articles written before
+this existed, or before an investment was added, are re-tagged by the
+backfill (also an admin job in the API):
+
+    python news_entities.py --backfill
+"""
+import argparse
+import asyncio
+import re
+import sys
+from typing import List, Set
+
+from pymongo import UpdateOne
+
+from question_classifier import EXCLUDED_WORDS
+from symbol_matcher import AhoCorasick
+
+NEWS_TEXT_FIELDS = ("title", "summary", "content")
+
+# Trailing words dropped to get the short form people write: "Apple Inc." -> "Apple"
+NAME_SUFFIXES = re.compile(
+    r"(,?\s+(inc\.?|incorporated|corporation|corp\.?|company|co\.?|& co\.?|group|holdings|ltd\.?|plc"
+    r"|class [a-z]|etf|trust|fund))+$"
+)
+MIN_ALIAS_LENGTH = 3
+
+# Upper-case tokens, optionally prefixed "$" or "(": AAPL, $T, (V), BRK.B, BTC-USD
+TICKER_TOKEN = re.compile(r"(?<![\w.$-])([$(]?)([A-Z][A-Z0-9]*(?:[.-][A-Z0-9]+)?)(?![\w-])")
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def name_aliases(name: str) -> Set[str]:
+    """Lower-cased forms of a company name worth matching"""
+    full = " ".join(name.lower().split())
+    short = NAME_SUFFIXES.sub("", full)
+    short = short[4:] if short.startswith("the ") else short
+    short = short[:-4] if short.endswith(".com") else short
+    return {alias for alias in (full, short) if len(alias) >= MIN_ALIAS_LENGTH}
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class NewsTagger:
+    """Finds the covered investments an article mentions, by ticker or company name"""
+
+    def __init__(self, investments: List[dict]):
+        self.symbols = {}
+        patterns = []
+        for inv in investments:
+            symbol = inv["symbol"].upper()
+            self.symbols[symbol] = symbol
+            # BTC-USD is written BTC
+            base = symbol.split("-")[0]
+            if base != symbol and len(base) >= MIN_ALIAS_LENGTH:
+                self.symbols.setdefault(base, symbol)
+            for alias in name_aliases(inv.get("name") or ""):
+                patterns.append((alias, (len(alias), symbol)))
+        self._names = AhoCorasick(patterns)
+
+    def _ambiguous(self, token: str) -> bool:
+        return len(token) <= 2 or token in EXCLUDED_WORDS
+
+    def find_symbols(self, text: str) -> Set[str]:
+        found = set()
+        for match in TICKER_TOKEN.finditer(text):
+            prefix, token = match.groups()
+            symbol = self.symbols.get(token)
+            if symbol and (prefix or not self._ambiguous(token)):
+                found.add(symbol)
+
+        lowered = text.lower()
+        for end, (length, symbol) in self._names.matches(lowered):
+            if symbol in found:
+                continue
+            start = end - length
+            if (start == 0 or not _is_word_char(lowered[start - 1])) and \
+                    (end == len(lowered) or not _is_word_char(lowered[end])):
+                found.add(symbol)
+        return found
+
+    def symbols_for(self, article: dict) -> List[str]:
+        """Sorted symbols mentioned anywhere in the article's text or tags"""
+        parts = [article.get(field) or "" for field in NEWS_TEXT_FIELDS]
+        parts.extend(article.get("tags") or [])
+        return sorted(self.find_symbols("\n".join(parts)))
+
+    def tag(self, article: dict) -> dict:
+        article["symbols"] = self.symbols_for(article)
+        return article
+
+
+async def load_tagger(db) -> NewsTagger:
+    investments = await db.investment_recommendations.find({}, {"_id": 0, "symbol": 1, "name": 1}).to_list(None)
+    return NewsTagger(investments)
+
+
+async def tag_articles(db, articles: List[dict]) -> List[dict]:
+    """Set ``symbols`` on articles about to be inserted; returns them for chaining"""
+    tagger = await load_tagger(db)
+    for article in articles:
+        tagger.tag(article)
+    return articles
+
+
+async def backfill_symbols(db, batch_size: int = BACKFILL_BATCH_SIZE) -> dict:
+    """Re-tag every article against the current universe; writes only the ones that changed"""
+    tagger = await load_tagger(db)
+    projection = {"_id": 0, "id": 1, "symbols": 1, **{field: 1 for field in NEWS_TEXT_FIELDS}, "tags": 1}
+    scanned = updated = 0
+    ops = []
+    async for article in db.news_articles.find({}, projection).batch_size(batch_size):
+        scanned += 1
+        symbols = tagger.symbols_for(article)
+        if article.get("symbols") != symbols:
+            ops.append(UpdateOne({"id": article["id"]}, {"$set": {"symbols": symbols}}))
+        if len(ops) >= batch_size:
+            updated += (await db.news_articles.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await db.news_articles.bulk_write(ops, ordered=False)).modified_count
+    return {"articles_scanned": scanned, "articles_updated": updated}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Tag news articles with the investment symbols they mention")
+    parser.add_argument("--backfill", action="store_true", help="re-tag every stored article")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return 0
+
+    from data_versions import bump_data_version
+    from database import close_client, get_database
+
+    db = get_database()
+    try:
+        summary = await backfill_symbols(db)
+        if summary["articles_updated"]:
+            await bump_data_version(db, "news_articles")
+        print(f"✅ Tagged {summary['articles_updated']} of {summary['articles_scanned']} articles")
+        return 0
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
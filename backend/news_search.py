@@ -0,0 +1,155 @@
+"""Ranked full-text search over news articles.
+
+Backed by one weighted MongoDB text index over title, tags, summary and
+content (declared in indexes.py), so every worker shares the same index
+and new articles are searchable as soon as a writer inserts them. Hits
+are ordered by text score, then newest first, and can be narrowed by tags
+and a publish date range; the filters ride along in the same indexed
+query.
+
+Pages are addressed by offset (a text score can't be range-scanned the
+way publish_date can), wrapped in the same opaque cursor the list routes
+use, and capped at MAX_SEARCH_RESULTS. Snippets are cut from the summary
+or content around the first matching word, with matches wrapped in
+<mark> and the rest HTML-escaped.
+"""
+import html
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from pymongo import TEXT, IndexModel
+
+from pagination import decode_cursor, encode_cursor
+
+# Field weights: a title match counts ten times a body match
+SEARCH_WEIGHTS = {"title": 10, "tags": 5, "summary": 3, "content": 1}
+TEXT_INDEX = IndexModel(
+    [(field, TEXT) for field in SEARCH_WEIGHTS], name="article_text", weights=SEARCH_WEIGHTS,
+    default_language="english", background=True
+)
+
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+# Deep pages get slower with every skipped hit and are rarely useful
+MAX_SEARCH_RESULTS = 1000
+
+SNIPPET_LENGTH = 200
+
+HIT_FIELDS = (
+    "id", "title", "summary", "author", "category", "publish_date", "image_url", "tags", "read_time", "symbols"
+)
+_TEXT_SCORE = {"$meta": "textScore"}
+
+_WORD = re.compile(r"\w+")
+_PHRASE = re.compile(r'"([^"]*)"')
+# Ignored by MongoDB's English text search, so never highlighted either
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "that", "the", "this", "to", "was", "were", "will", "with"
+})
+
+
+def stem(word: str) -> str:
+    """Rough English stem, enough to highlight what the text index matched"""
+    word = word.lower()
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+    # rate/rates/rated and cut/cutting meet on the same stem
+    if len(word) > 3 and (word.endswith("e") or word[-1] == word[-2]):
+        word = word[:-1]
+    return word
+
+
+def query_terms(q: str) -> List[str]:
+    """Stems of the words a search matches on: phrase words and plain words, minus negated ones"""
+    words = [word for phrase in _PHRASE.findall(q) for word in _WORD.findall(phrase)]
+    for token in _PHRASE.sub(" ", q).split():
+        if not token.startswith("-"):
+            words.extend(_WORD.findall(token))
+    return list(dict.fromkeys(stem(word) for word in words if word.lower() not in STOP_WORDS))
+
+
+def highlight(text: str, terms: List[str], length: int = SNIPPET_LENGTH) -> Optional[str]:
+    """Window of ``text`` around the first match with every match in <mark>; None without a match"""
+    text = " ".join(text.split())
+    matches = [match for match in _WORD.finditer(text) if stem(match.group()) in terms]
+    if not matches:
+        return None
+
+    start = max(0, matches[0].start() - length // 4)
+    if start:
+        start = text.find(" ", start) + 1 or start
+    end = min(len(text), start + length)
+    if end < len(text):
+        end = text.rfind(" ", start, end) if " " in text[start:end] else end
+
+    parts, position = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    return ("…" if start else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def search_filter(q: str, tags: List[str], published_after: Optional[datetime],
+                  published_before: Optional[datetime]) -> dict:
+    query = {"$text": {"$search": q}}
+    if tags:
+        query["tags"] = {"$all": tags}
+    published = {}
+    if published_after:
+        published["$gte"] = published_after
+    if published_before:
+        published["$lte"] = published_before
+    if published:
+        query["publish_date"] = published
+    return query
+
+
+def decode_offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    offset, _ = decode_cursor(cursor)
+    if type(offset) is not int or not 0 < offset < MAX_SEARCH_RESULTS:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+def to_hit(article: dict, terms: List[str]) -> dict:
+    """Search hit for one article: the listed fields, its score and a highlighted snippet"""
+    hit = {field: article[field] for field in HIT_FIELDS if field in article}
+    hit["score"] = round(article["score"], 4)
+    snippet = None
+    for field in ("summary", "content", "title"):
+        snippet = highlight(article.get(field) or "", terms)
+        if snippet:
+            break
+    hit["snippet"] = snippet or html.escape(" ".join((article.get("summary") or "").split())[:SNIPPET_LENGTH])
+    return hit
+
+
+async def search_articles(collection, q: str, tags: List[str], published_after: Optional[datetime],
+                          published_before: Optional[datetime], cursor: Optional[str],
+                          limit: int) -> Tuple[List[dict], Optional[str]]:
+    """One page of ranked hits plus the cursor for the next page (or None)"""
+    offset = decode_offset(cursor)
+    limit = min(limit, MAX_SEARCH_RESULTS - offset)
+    projection = {"_id": 0, **{field: 1 for field in HIT_FIELDS}, "content": 1, "score": _TEXT_SCORE}
+    articles = await collection.find(search_filter(q, tags, published_after, published_before), projection) \
+        .sort([("score", _TEXT_SCORE), ("publish_date", -1), ("id", -1)]) \
+        .skip(offset).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(articles) > limit:
+        articles = articles[:limit]
+        if offset + limit < MAX_SEARCH_RESULTS:
+            next_cursor = encode_cursor(offset + limit, articles[-1]["id"])
+    terms = query_terms(q)
+    return [to_hit(article, terms) for article in articles], next_cursor
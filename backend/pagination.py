@@ -0,0 +1,119 @@
+"""Keyset pagination, field projection and NDJSON streaming for list routes.
+
+Pages are ordered by ``(sort_field, id)`` descending. The cursor handed to
+clients is an opaque token wrapping the sort value and id of the last row
+served, so fetching the next page is an index range scan rather than a
+growing ``skip``.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(sort_value, doc_id: str) -> str:
+    if isinstance(sort_value, datetime):
+        payload = {"t": sort_value.isoformat(), "id": doc_id}
+    else:
+        payload = {"v": sort_value, "id": doc_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, str]:
+    """Return (sort_value, id); raises a 400 for anything we did not issue"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if "t" in payload:
+            return datetime.fromisoformat(payload["t"]), str(payload["id"])
+        return payload["v"], str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(query: dict, sort_field: str, cursor: Optional[str]) -> dict:
+    """Narrow ``query`` to rows strictly after the cursor in descending order"""
+    if not cursor:
+        return query
+    sort_value, doc_id = decode_cursor(cursor)
+    after_cursor = {"$or": [
+        {sort_field: {"$lt": sort_value}},
+        {sort_field: sort_value, "id": {"$lt": doc_id}}
+    ]}
+    return {"$and": [query, after_cursor]} if query else after_cursor
+
+
+def sort_spec(sort_field: str) -> List[Tuple[str, int]]:
+    return [(sort_field, -1), ("id", -1)]
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], sort_field: str) -> Tuple[dict, Optional[List[str]]]:
+    """Build a Mongo projection from a ``fields=a,b,c`` parameter.
+
+    Returns the projection plus the requested field list (None when the
+    client wants whole documents). The id and sort field are always
+    fetched because the next cursor is built from them.
+    """
+    allowed = list(allowed)
+    if not fields:
+        return {"_id": 0, **{name: 1 for name in allowed}}, None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    projection = {"_id": 0, "id": 1, sort_field: 1}
+    projection.update({name: 1 for name in requested})
+    return projection, requested
+
+
+def trim_to_fields(doc: dict, requested: Optional[List[str]]) -> dict:
+    """Drop the cursor-only fields the client did not ask for"""
+    if requested is None:
+        return doc
+    return {name: doc[name] for name in requested if name in doc}
+
+
+async def fetch_page(collection, query: dict, projection: dict, sort_field: str,
+                     limit: int) -> Tuple[List[dict], Optional[str]]:
+    """One page of documents plus the cursor for the next page (or None).
+
+    ``query`` should already be narrowed with keyset_query().
+    """
+    docs = await collection.find(query, projection) \
+        .sort(sort_spec(sort_field)).limit(limit + 1).to_list(limit + 1)
+    return split_page(docs, sort_field, limit)
+
+
+def split_page(docs: List[dict], sort_field: str, limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Trim ``limit + 1`` fetched rows to a page; the extra row means there is a next page"""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(sort_field), last["id"])
+    return docs, next_cursor
+
+
+async def stream_ndjson(collection, query: dict, projection: dict, sort_field: str,
+                        limit: Optional[int], requested: Optional[List[str]]) -> AsyncIterator[bytes]:
+    """Yield one JSON document per line straight off the Motor cursor.
+
+    ``query`` should already be narrowed with keyset_query() so a bad
+    cursor is rejected before the response starts.
+    """
+    docs = collection.find(query, projection).sort(sort_spec(sort_field)).batch_size(500)
+    if limit:
+        docs = docs.limit(limit)
+    async for doc in docs:
+        line = json.dumps(jsonable_encoder(trim_to_fields(doc, requested)), ensure_ascii=False)
+        yield (line + "\n").encode()
@@ -1,20 +1,13 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 import random
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 # Comprehensive stock database covering all major sectors
 comprehensive_stock_database = [
@@ -988,7 +981,7 @@ async def populate_comprehensive_stock_database():
     """Populate database with comprehensive stock coverage"""
     try:
         # Clear existing recommendations
-        await db.investment_recommendations.delete_many({})
+        await recommendation_repository.collection.delete_many({})
         print("Cleared existing investment recommendations")
         
         # Add more popular stocks across all sectors
@@ -1104,27 +1097,28 @@ async def populate_comprehensive_stock_database():
         all_stocks = comprehensive_stock_database + additional_stocks
         
         # Insert comprehensive database
-        result = await db.investment_recommendations.insert_many(all_stocks)
-        print(f"Inserted {len(result.inserted_ids)} comprehensive investment recommendations")
+        inserted = await recommendation_repository.insert_many(all_stocks)
+        print(f"Inserted {inserted} comprehensive investment recommendations")
+        await recommendation_repository.mark_changed()
         
         # Verify insertion
-        count = await db.investment_recommendations.count_documents({})
+        count = await recommendation_repository.count()
         print(f"Total recommendations in database: {count}")
         
         # Show comprehensive breakdown
-        asset_types = await db.investment_recommendations.distinct("asset_type")
-        sectors = await db.investment_recommendations.distinct("sector")
+        asset_types = await recommendation_repository.collection.distinct("asset_type")
+        sectors = await recommendation_repository.collection.distinct("sector")
         
         print(f"\nAsset types: {', '.join(asset_types)}")
         print(f"Sectors covered: {', '.join(filter(None, sectors))}")
         
         for asset_type in asset_types:
-            count = await db.investment_recommendations.count_documents({"asset_type": asset_type})
+            count = await recommendation_repository.count({"asset_type": asset_type})
             print(f"- {asset_type}: {count} recommendations")
             
         # Show sector breakdown for stocks
         stock_sectors = {}
-        stocks = await db.investment_recommendations.find({"asset_type": "stock"}).to_list(1000)
+        stocks = await recommendation_repository.collection.find({"asset_type": "stock"}).to_list(1000)
         for stock in stocks:
             sector = stock.get("sector", "Unknown")
             stock_sectors[sector] = stock_sectors.get(sector, 0) + 1
@@ -1134,9 +1128,9 @@ async def populate_comprehensive_stock_database():
             print(f"- {sector}: {count} stocks")
             
         # Recommendation distribution
-        buy_count = await db.investment_recommendations.count_documents({"recommendation": "BUY"})
-        hold_count = await db.investment_recommendations.count_documents({"recommendation": "HOLD"})
-        sell_count = await db.investment_recommendations.count_documents({"recommendation": "SELL"})
+        buy_count = await recommendation_repository.count({"recommendation": "BUY"})
+        hold_count = await recommendation_repository.count({"recommendation": "HOLD"})
+        sell_count = await recommendation_repository.count({"recommendation": "SELL"})
         print(f"\nRecommendations: {buy_count} BUY, {hold_count} HOLD, {sell_count} SELL")
         
         # Sample of included stocks
@@ -1146,7 +1140,7 @@ async def populate_comprehensive_stock_database():
     except Exception as e:
         print(f"Error populating database: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(populate_comprehensive_stock_database())
\ No newline at end of file
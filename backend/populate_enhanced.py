@@ -1,19 +1,12 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 # Enhanced comprehensive investment recommendations
 enhanced_recommendations = [
@@ -711,36 +704,37 @@ async def populate_enhanced_recommendations():
     """Populate database with comprehensive enhanced recommendations"""
     try:
         # Clear existing recommendations
-        await db.investment_recommendations.delete_many({})
+        await recommendation_repository.collection.delete_many({})
         print("Cleared existing investment recommendations")
         
         # Insert enhanced recommendations
-        result = await db.investment_recommendations.insert_many(enhanced_recommendations)
-        print(f"Inserted {len(result.inserted_ids)} enhanced investment recommendations")
+        inserted = await recommendation_repository.insert_many(enhanced_recommendations)
+        print(f"Inserted {inserted} enhanced investment recommendations")
+        await recommendation_repository.mark_changed()
         
         # Verify insertion
-        count = await db.investment_recommendations.count_documents({})
+        count = await recommendation_repository.count()
         print(f"Total recommendations in database: {count}")
         
         # Show comprehensive breakdown
-        asset_types = await db.investment_recommendations.distinct("asset_type")
-        sectors = await db.investment_recommendations.distinct("sector")
+        asset_types = await recommendation_repository.collection.distinct("asset_type")
+        sectors = await recommendation_repository.collection.distinct("sector")
         
         print(f"\nAsset types: {', '.join(asset_types)}")
         print(f"Sectors covered: {', '.join(filter(None, sectors))}")
         
         for asset_type in asset_types:
-            count = await db.investment_recommendations.count_documents({"asset_type": asset_type})
+            count = await recommendation_repository.count({"asset_type": asset_type})
             print(f"- {asset_type}: {count} recommendations")
             
         # Recommendation distribution
-        buy_count = await db.investment_recommendations.count_documents({"recommendation": "BUY"})
-        hold_count = await db.investment_recommendations.count_documents({"recommendation": "HOLD"})
-        sell_count = await db.investment_recommendations.count_documents({"recommendation": "SELL"})
+        buy_count = await recommendation_repository.count({"recommendation": "BUY"})
+        hold_count = await recommendation_repository.count({"recommendation": "HOLD"})
+        sell_count = await recommendation_repository.count({"recommendation": "SELL"})
         print(f"\nRecommendations: {buy_count} BUY, {hold_count} HOLD, {sell_count} SELL")
         
         # Sample technical indicators
-        sample = await db.investment_recommendations.find_one({"symbol": "AAPL"})
+        sample = await recommendation_repository.collection.find_one({"symbol": "AAPL"})
         if sample and "technical_indicators" in sample:
             print(f"\nSample technical indicators (AAPL):")
             for key, value in sample["technical_indicators"].items():
@@ -749,7 +743,7 @@ async def populate_enhanced_recommendations():
     except Exception as e:
         print(f"Error populating database: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(populate_enhanced_recommendations())
\ No newline at end of file
@@ -1,20 +1,13 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 import random
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 # Sample investment recommendations covering stocks, indices, and commodities
 sample_recommendations = [
@@ -267,30 +260,31 @@ async def populate_investment_recommendations():
     """Populate the database with sample investment recommendations"""
     try:
         # Clear existing recommendations
-        await db.investment_recommendations.delete_many({})
+        await recommendation_repository.collection.delete_many({})
         print("Cleared existing investment recommendations")
         
         # Insert sample recommendations
-        result = await db.investment_recommendations.insert_many(sample_recommendations)
-        print(f"Inserted {len(result.inserted_ids)} investment recommendations")
+        inserted = await recommendation_repository.insert_many(sample_recommendations)
+        print(f"Inserted {inserted} investment recommendations")
+        await recommendation_repository.mark_changed()
         
         # Verify insertion
-        count = await db.investment_recommendations.count_documents({})
+        count = await recommendation_repository.count()
         print(f"Total recommendations in database: {count}")
         
         # Show asset types
-        asset_types = await db.investment_recommendations.distinct("asset_type")
+        asset_types = await recommendation_repository.collection.distinct("asset_type")
         print(f"Asset types available: {', '.join(asset_types)}")
         
         # Show recommendations breakdown
         for asset_type in asset_types:
-            count = await db.investment_recommendations.count_documents({"asset_type": asset_type})
+            count = await recommendation_repository.count({"asset_type": asset_type})
             print(f"- {asset_type}: {count} recommendations")
         
     except Exception as e:
         print(f"Error populating database: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(populate_investment_recommendations())
\ No newline at end of file
@@ -1,19 +1,12 @@
 import asyncio
 import uuid
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from database import NewsRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+news_repository = NewsRepository(db)
 
 # Sample news articles with relevant categories and content
 sample_articles = [
@@ -288,25 +281,26 @@ async def populate_database():
     """Populate the database with sample news articles"""
     try:
         # Clear existing news articles
-        await db.news_articles.delete_many({})
+        await news_repository.collection.delete_many({})
         print("Cleared existing news articles")
         
         # Insert sample articles
-        result = await db.news_articles.insert_many(sample_articles)
-        print(f"Inserted {len(result.inserted_ids)} news articles")
+        inserted = await news_repository.insert_tagged(sample_articles)
+        print(f"Inserted {inserted} news articles")
+        await news_repository.mark_changed()
         
         # Verify insertion
-        count = await db.news_articles.count_documents({})
+        count = await news_repository.count()
         print(f"Total articles in database: {count}")
         
         # Show categories
-        categories = await db.news_articles.distinct("category")
+        categories = await news_repository.collection.distinct("category")
         print(f"Categories available: {', '.join(categories)}")
         
     except Exception as e:
         print(f"Error populating database: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(populate_database())
\ No newline at end of file
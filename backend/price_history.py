@@ -0,0 +1,130 @@
+"""Bucketed price history fed by every price updater.
+
+Ticks are not stored one document per point. Each symbol's history is a
+run of bucket documents holding up to BUCKET_SIZE ticks as parallel
+arrays:
+
+    {"symbol": "AAPL", "start": <first tick>, "end": <last tick>,
+     "count": 137, "t": [<datetime>, ...], "p": [191.2, ...]}
+
+Appending a tick is one upsert that ``$push``es onto the symbol's open
+bucket (``count < BUCKET_SIZE``) or starts a new one, and a whole update
+pass goes out as a single bulk_write. Range reads touch only the buckets
+overlapping the window, through the (symbol, start, end) index, so a
+day of minute ticks costs a handful of documents rather than thousands.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from pymongo import UpdateOne
+
+PRICE_HISTORY_COLLECTION = "price_history"
+
+# Ticks per bucket: big enough that reads touch few documents, small
+# enough that buckets stay far below the 16MB document limit
+BUCKET_SIZE = 200
+
+# Query resolutions -> candle width in seconds (None = raw ticks)
+RESOLUTIONS: Dict[str, Optional[int]] = {
+    "tick": None,
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "1d": 86400
+}
+
+
+def build_append_ops(symbols: Iterable[str], prices: Iterable[float],
+                     timestamp: Union[datetime, np.ndarray]) -> List[UpdateOne]:
+    """One bucket upsert per tick; ``timestamp`` is shared or per-row"""
+    if isinstance(symbols, np.ndarray):
+        symbols = symbols.tolist()
+    if isinstance(prices, np.ndarray):
+        # tolist() turns numpy scalars into BSON-encodable Python types
+        prices = prices.tolist()
+    if isinstance(timestamp, np.ndarray):
+        timestamps = timestamp.astype("datetime64[us]").tolist()
+    else:
+        timestamps = None
+
+    ops = []
+    for i, (symbol, price) in enumerate(zip(symbols, prices)):
+        tick_time = timestamps[i] if timestamps is not None else timestamp
+        ops.append(UpdateOne(
+            {"symbol": symbol, "count": {"$lt": BUCKET_SIZE}},
+            {
+                "$push": {"t": tick_time, "p": price},
+                "$inc": {"count": 1},
+                "$min": {"start": tick_time},
+                "$max": {"end": tick_time}
+            },
+            upsert=True
+        ))
+    return ops
+
+
+async def append_ticks(db, symbols: Iterable[str], prices: Iterable[float],
+                       timestamp: Union[datetime, np.ndarray]) -> int:
+    """Append one tick per symbol in a single bulk_write; returns ticks written.
+
+    The write is ordered so repeated ticks for one symbol fill its open
+    bucket in sequence instead of racing to open new ones.
+    """
+    ops = build_append_ops(symbols, prices, timestamp)
+    if not ops:
+        return 0
+    await db[PRICE_HISTORY_COLLECTION].bulk_write(ops, ordered=True)
+    return len(ops)
+
+
+async def load_history(db, symbol: str, start: datetime, end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+    """Tick times (datetime64[us]) and prices for ``symbol`` in [start, end], oldest first"""
+    cursor = db[PRICE_HISTORY_COLLECTION].find(
+        {"symbol": symbol, "start": {"$lte": end}, "end": {"$gte": start}},
+        {"_id": 0, "t": 1, "p": 1}
+    ).sort("start", 1)
+
+    times: List[datetime] = []
+    prices: List[float] = []
+    async for bucket in cursor:
+        times.extend(bucket.get("t", []))
+        prices.extend(bucket.get("p", []))
+
+    times = np.array(times, dtype="datetime64[us]")
+    prices = np.array(prices, dtype=float)
+    # MongoDB keeps datetimes to the millisecond, so compare at that precision
+    in_range = (times >= np.datetime64(start, "ms")) & (times <= np.datetime64(end, "ms"))
+    times, prices = times[in_range], prices[in_range]
+
+    # Buckets written concurrently can interleave; a stable sort keeps tick order
+    order = np.argsort(times, kind="stable")
+    return times[order], prices[order]
+
+
+def resample(times: np.ndarray, prices: np.ndarray, seconds: Optional[int]) -> List[dict]:
+    """OHLC candles ``seconds`` wide (raw ticks when None), as plain dicts"""
+    if not len(times):
+        return []
+    if seconds is None:
+        return [
+            {"timestamp": t, "open": p, "high": p, "low": p, "close": p, "ticks": 1}
+            for t, p in zip(times.tolist(), prices.tolist())
+        ]
+
+    bins = times.astype("datetime64[s]").astype(np.int64) // seconds
+    boundaries = np.flatnonzero(np.diff(bins)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(prices)]))
+
+    candle_times = (bins[starts] * seconds).astype("datetime64[s]").astype("datetime64[us]").tolist()
+    opens = prices[starts].tolist()
+    highs = np.maximum.reduceat(prices, starts).tolist()
+    lows = np.minimum.reduceat(prices, starts).tolist()
+    closes = prices[ends - 1].tolist()
+    counts = (ends - starts).tolist()
+    return [
+        {"timestamp": t, "open": o, "high": h, "low": l, "close": c, "ticks": n}
+        for t, o, h, l, c, n in zip(candle_times, opens, highs, lows, closes, counts)
+    ]
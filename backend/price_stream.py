@@ -0,0 +1,248 @@
+"""Live price deltas for WebSocket and SSE clients.
+
+PriceFeed keeps the last known price fields per symbol and learns about
+changes in one of two ways:
+
+* a MongoDB change stream on investment_recommendations (replica sets), or
+* when change streams are unavailable, one projected query per data
+  version bump (see data_versions.py), diffed against the last snapshot.
+
+Either way the database is read once per worker, never per client.
+Changes are staged and flushed to the PriceBroker in batches; the broker
+fans each batch out to subscribers indexed by symbol, and a subscriber
+that falls behind has its pending batches coalesced instead of queueing
+without bound.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ("current_price", "price_change_24h", "price_change_percent")
+
+
+def parse_symbols(symbols: Optional[str]) -> Optional[Set[str]]:
+    """``"aapl, msft"`` -> {"AAPL", "MSFT"}; None/empty means every symbol"""
+    if not symbols:
+        return None
+    parsed = {symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()}
+    return parsed or None
+
+
+class PriceBatch:
+    """One flush worth of changes, encoded at most once however many clients get it"""
+
+    def __init__(self, changes: Dict[str, dict]):
+        self.changes = changes
+        self._encoded: Optional[str] = None
+
+    def encode(self) -> str:
+        if self._encoded is None:
+            self._encoded = json.dumps({"type": "prices", "changes": self.changes})
+        return self._encoded
+
+
+class Subscription:
+    """A client's symbol filter plus the batches waiting to be sent to it"""
+
+    def __init__(self, broker: "PriceBroker", symbols: Optional[Set[str]], max_pending: int):
+        self.broker = broker
+        self.symbols = symbols
+        self.max_pending = max_pending
+        self._pending: List[PriceBatch] = []
+        self._ready = asyncio.Event()
+
+    def _push(self, batch: PriceBatch) -> None:
+        self._pending.append(batch)
+        if len(self._pending) > self.max_pending:
+            # Slow consumer: keep only the latest value per symbol
+            merged: Dict[str, dict] = {}
+            for pending in self._pending:
+                for symbol, delta in pending.changes.items():
+                    merged.setdefault(symbol, {}).update(delta)
+            self._pending = [PriceBatch(merged)]
+        self._ready.set()
+
+    async def next_message(self) -> str:
+        """Wait for changes and return them as one encoded JSON message"""
+        await self._ready.wait()
+        pending, self._pending = self._pending, []
+        self._ready.clear()
+        if len(pending) == 1:
+            return pending[0].encode()
+        merged: Dict[str, dict] = {}
+        for batch in pending:
+            for symbol, delta in batch.changes.items():
+                merged.setdefault(symbol, {}).update(delta)
+        return PriceBatch(merged).encode()
+
+    def update_symbols(self, add: Iterable[str] = (), remove: Iterable[str] = ()) -> None:
+        self.broker.resubscribe(self, add, remove)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class PriceBroker:
+    """In-process pub/sub for price deltas, indexed by symbol"""
+
+    def __init__(self, max_pending: int = 32):
+        self.max_pending = max_pending
+        self.subscriptions: Set[Subscription] = set()
+        self._everything: Set[Subscription] = set()
+        self._by_symbol: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, symbols: Optional[Set[str]] = None) -> Subscription:
+        subscription = Subscription(self, set(symbols) if symbols else None, self.max_pending)
+        self.subscriptions.add(subscription)
+        self._index(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+        self._unindex(subscription)
+
+    def resubscribe(self, subscription: Subscription, add: Iterable[str], remove: Iterable[str]) -> None:
+        self._unindex(subscription)
+        symbols = set(subscription.symbols or ())
+        symbols |= {symbol.upper() for symbol in add}
+        symbols -= {symbol.upper() for symbol in remove}
+        subscription.symbols = symbols or None
+        self._index(subscription)
+
+    def _unindex(self, subscription: Subscription) -> None:
+        self._everything.discard(subscription)
+        for symbol in subscription.symbols or ():
+            subscribers = self._by_symbol.get(symbol)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_symbol[symbol]
+
+    def _index(self, subscription: Subscription) -> None:
+        if subscription.symbols is None:
+            self._everything.add(subscription)
+        else:
+            for symbol in subscription.symbols:
+                self._by_symbol.setdefault(symbol, set()).add(subscription)
+
+    def publish(self, changes: Dict[str, dict]) -> None:
+        if not changes:
+            return
+        batch = PriceBatch(changes)
+        for subscription in self._everything:
+            subscription._push(batch)
+
+        # Filtered subscribers only see the symbols they asked for
+        filtered: Dict[Subscription, Dict[str, dict]] = {}
+        for symbol, delta in changes.items():
+            for subscription in self._by_symbol.get(symbol, ()):
+                filtered.setdefault(subscription, {})[symbol] = delta
+        for subscription, subset in filtered.items():
+            subscription._push(PriceBatch(subset))
+
+
+class PriceFeed:
+    """Turns database writes into broker batches, via change stream or polling"""
+
+    def __init__(self, db, broker: Optional[PriceBroker] = None, flush_interval: float = 0.25):
+        self.db = db
+        self.broker = broker or PriceBroker()
+        self.flush_interval = flush_interval
+        self.prices: Dict[str, dict] = {}
+        self.mode = "stopped"
+        self._symbols_by_id: Dict[object, str] = {}
+        self._staged: Dict[str, dict] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._starting: Optional[asyncio.Task] = None
+
+    def snapshot(self, symbols: Optional[Set[str]] = None) -> Dict[str, dict]:
+        if symbols is None:
+            return dict(self.prices)
+        return {symbol: self.prices[symbol] for symbol in symbols if symbol in self.prices}
+
+    def _stage(self, symbol: str, fields: dict) -> None:
+        """Record any price field that differs from the last known value"""
+        known = self.prices.setdefault(symbol, {})
+        delta = {name: fields[name] for name in PRICE_FIELDS if name in fields and known.get(name) != fields[name]}
+        if delta:
+            known.update(delta)
+            self._staged.setdefault(symbol, {}).update(delta)
+
+    def flush(self) -> None:
+        staged, self._staged = self._staged, {}
+        self.broker.publish(staged)
+
+    async def load_prices(self) -> None:
+        """Read every symbol's price fields once and stage whatever moved"""
+        projection = {"symbol": 1, **{name: 1 for name in PRICE_FIELDS}}
+        async for doc in self.db.investment_recommendations.find({}, projection):
+            self._symbols_by_id[doc["_id"]] = doc["symbol"]
+            self._stage(doc["symbol"], doc)
+
+    async def start(self) -> None:
+        await self.load_prices()
+        self._staged = {}  # the initial load is the snapshot, not a change
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        self._tasks.append(asyncio.create_task(self._watch()))
+
+    async def ensure_started(self) -> None:
+        """Start on first subscriber, so idle workers never load prices or open a stream"""
+        if self._starting is None:
+            self._starting = asyncio.create_task(self.start())
+        try:
+            await asyncio.shield(self._starting)
+        except Exception:
+            self._starting = None
+            raise
+
+    async def stop(self) -> None:
+        self._starting = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.mode = "stopped"
+
+    async def on_data_version_change(self) -> None:
+        """Polling fallback: one diff query per data version bump"""
+        if self.mode == "polling":
+            await self.load_prices()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._staged:
+                self.flush()
+
+    async def _watch(self) -> None:
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        try:
+            async with self.db.investment_recommendations.watch(pipeline) as stream:
+                self.mode = "change_stream"
+                logger.info("Price feed following the investment_recommendations change stream")
+                async for change in stream:
+                    self._apply_change(change)
+        except OperationFailure as e:
+            # Standalone servers have no oplog to stream from
+            self.mode = "polling"
+            logger.info(f"Change streams unavailable ({e.code}); price feed will poll on data version changes")
+        except Exception as e:
+            self.mode = "polling"
+            logger.warning(f"Price change stream stopped: {e}; falling back to polling")
+
+    def _apply_change(self, change: dict) -> None:
+        doc_id = change["documentKey"]["_id"]
+        if change["operationType"] == "update":
+            fields = change.get("updateDescription", {}).get("updatedFields", {})
+        else:
+            fields = change.get("fullDocument") or {}
+            if "symbol" in fields:
+                self._symbols_by_id[doc_id] = fields["symbol"]
+        symbol = self._symbols_by_id.get(doc_id)
+        if symbol:
+            self._stage(symbol, fields)
@@ -0,0 +1,104 @@
+"""Single-pass intent classification and entity extraction for Q&A questions.
+
+Routing used to run up to six ``any(word in question ...)`` chains after
+the mention scan, then three regexes (recompiled per call) for tickers.
+Here the intent keywords and sector terms are added to the universe's
+Aho-Corasick automaton, so the one pass that finds mentioned investments
+also reports every keyword occurring in the question (overlaps included,
+exactly like ``in``). The intent is the matched keyword highest in
+INTENT_KEYWORDS, which keeps the old if/elif precedence, and candidate
+tickers come from one precompiled regex over the upper-cased question.
+"""
+import re
+from typing import Dict, List, Set
+
+from symbol_matcher import SymbolMatcher
+
+# Checked in this order; the first intent with a keyword in the question wins
+INTENT_KEYWORDS = (
+    ("recommendation", ("should i buy", "recommend", "good investment")),
+    ("price", ("price target", "target price", "price prediction")),
+    ("risk", ("risk", "risky", "safe", "volatile")),
+    ("sector", ("sector", "industry", "technology", "healthcare", "financial")),
+    ("portfolio", ("portfolio", "diversification", "allocation")),
+    ("market", ("market", "economy", "outlook", "trend")),
+)
+REALTIME_INTENT = "realtime"
+GENERAL_INTENT = "general"
+
+SECTOR_TERMS = {
+    "tech": "Technology",
+    "technology": "Technology",
+    "healthcare": "Healthcare",
+    "financial": "Financial Services"
+}
+
+# Words of 2-5 letters; the old 1-5 letter, "$SYM" and "SYM." patterns all
+# matched whole words, so they reduce to this one
+TICKER_PATTERN = re.compile(r"\b[A-Z]{2,5}\b")
+
+# Common words that aren't stock symbols
+EXCLUDED_WORDS = frozenset({
+    'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HAD', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'ITS', 'NEW', 'NOW', 'OLD', 'SEE', 'TWO', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE', 'BUY', 'SELL', 'HOLD', 'STOCK', 'PRICE', 'WHAT', 'WHEN', 'WHERE', 'WHY', 'WILL', 'WITH', 'GOOD', 'BEST', 'HIGH', 'LOW', 'TOP', 'BAD', 'BIG', 'LONG', 'SHORT', 'RISK', 'SAFE'
+})
+
+_KEYWORD_RANKS: Dict[str, int] = {
+    keyword: rank for rank, (intent, keywords) in enumerate(INTENT_KEYWORDS) for keyword in keywords
+}
+_KEYWORDS = frozenset(_KEYWORD_RANKS)
+VOCABULARY = tuple(_KEYWORD_RANKS) + tuple(term for term in SECTOR_TERMS if term not in _KEYWORD_RANKS)
+
+
+def extract_tickers(question: str) -> List[str]:
+    """Potential stock symbols in the question, upper-cased, in question order"""
+    symbols = TICKER_PATTERN.findall(question.upper())
+    return list(dict.fromkeys(sym for sym in symbols if sym not in EXCLUDED_WORDS))
+
+
+class ParsedQuestion:
+    """Intent plus the entities found in one lower-cased question"""
+
+    def __init__(self, intent: str, mentions: List[dict], tickers: List[str],
+                 unknown_symbols: List[str], terms: Set[str]):
+        self.intent = intent
+        self.mentions = mentions
+        self.tickers = tickers
+        self.unknown_symbols = unknown_symbols
+        self.terms = terms
+
+    @property
+    def sectors(self) -> List[str]:
+        return sorted({SECTOR_TERMS[term] for term in self.terms if term in SECTOR_TERMS})
+
+    @property
+    def risk_terms(self) -> List[str]:
+        return self.terms_for("risk")
+
+    @property
+    def price_terms(self) -> List[str]:
+        return self.terms_for("price")
+
+    def terms_for(self, intent: str) -> List[str]:
+        """Matched keywords of one intent, in INTENT_KEYWORDS order"""
+        keywords = dict(INTENT_KEYWORDS)[intent]
+        return [keyword for keyword in keywords if keyword in self.terms]
+
+
+class QuestionClassifier:
+    """Classifies questions against one universe; built with its snapshot"""
+
+    def __init__(self, investments: List[dict]):
+        self.matcher = SymbolMatcher(investments, terms=VOCABULARY)
+
+    def classify(self, question: str) -> ParsedQuestion:
+        """``question`` must already be lower-cased"""
+        mentions, terms = self.matcher.scan(question)
+        tickers = extract_tickers(question)
+        unknown_symbols = [sym for sym in tickers if sym not in self.matcher.symbols]
+
+        if unknown_symbols:
+            intent = REALTIME_INTENT
+        else:
+            keywords = terms & _KEYWORDS
+            intent = INTENT_KEYWORDS[min(map(_KEYWORD_RANKS.get, keywords))][0] if keywords else GENERAL_INTENT
+        return ParsedQuestion(intent, mentions, tickers, unknown_symbols, terms)
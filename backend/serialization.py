@@ -0,0 +1,189 @@
+"""Fast JSON encoding for documents read straight from MongoDB.
+
+Returning ``Model(**doc)`` from a route costs three passes per document:
+the handler builds the model, FastAPI validates it again against
+``response_model``, and the stdlib encoder walks the result. Documents in
+our own collections are already in the right shape, so a DocumentEncoder
+instead follows the response model's field list once, checks each value
+against the field's type with cheap ``type() is`` tests, and hands the
+result to orjson. Routes return the bytes in a plain Response, which
+FastAPI passes through untouched, and paged routes cache those bytes so a
+cache hit costs no encoding at all.
+
+The output must match what FastAPI + JSONResponse produce byte for byte.
+Whenever a value is one the fast path cannot promise that for (a type
+needing coercion, NaN, a float json.dumps would write with an exponent,
+a missing required field...), the whole payload goes through the response
+model and the stdlib encoder instead, exactly as before. orjson is
+optional; without it the fast path still skips the double validation.
+"""
+import json
+import typing
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Type
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+_MISSING = object()
+
+
+class _Mismatch(Exception):
+    """A value the fast path cannot encode exactly as the response model would"""
+
+
+def render_json(content: Any) -> bytes:
+    """Encode ``content`` exactly as starlette's JSONResponse does"""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode already JSON-safe ``content``; same bytes as render_json()"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return render_json(content)
+
+
+def _str(value):
+    if type(value) is str:
+        return value
+    raise _Mismatch
+
+
+def _int(value):
+    if type(value) is int:
+        return value
+    raise _Mismatch
+
+
+def _bool(value):
+    if type(value) is bool:
+        return value
+    raise _Mismatch
+
+
+def _float(value):
+    if type(value) is int:
+        value = float(value)
+    elif type(value) is not float:
+        raise _Mismatch
+    # json.dumps switches to exponents (1e-05, 1e+16) outside this range and
+    # rejects NaN/inf; orjson would write 0.00001, 1e16 and null
+    if value != 0 and not 1e-4 <= abs(value) < 1e16:
+        raise _Mismatch
+    return value
+
+
+def _datetime(value):
+    # Stored timestamps are naive UTC; aware ones serialize differently
+    if type(value) is datetime and value.tzinfo is None:
+        return value.isoformat()
+    raise _Mismatch
+
+
+SCALARS = {str: _str, int: _int, bool: _bool, float: _float, datetime: _datetime}
+
+
+def _passthrough(annotation) -> frozenset:
+    """Value types the annotation accepts exactly as stored, with no check beyond type()"""
+    if annotation in (str, int, bool):
+        return frozenset((annotation,))
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) is typing.Union and type(None) in args and len(args) == 2:
+        inner = args[0] if args[1] is type(None) else args[1]
+        return _passthrough(inner) | {type(None)}
+    return frozenset()
+
+
+def _converter(annotation) -> Callable[[Any], Any]:
+    """Checker/converter for one field annotation"""
+    if annotation in SCALARS:
+        return SCALARS[annotation]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_converter(annotation)
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union and type(None) in args and len(args) == 2:
+        inner = _converter(args[0] if args[1] is type(None) else args[1])
+        return lambda value: None if value is None else inner(value)
+    if origin is list and len(args) == 1:
+        item = _converter(args[0])
+        if item is _str:
+            def strings(value):
+                if type(value) is list and all(type(entry) is str for entry in value):
+                    return value
+                raise _Mismatch
+            return strings
+        def items(value):
+            if type(value) is list:
+                return [item(entry) for entry in value]
+            raise _Mismatch
+        return items
+
+    def unsupported(value):
+        raise _Mismatch
+    return unsupported
+
+
+def _model_converter(model: Type[BaseModel]) -> Callable[[Any], dict]:
+    """Converter building the model's JSON dict (fields in declaration order) from a document"""
+    fields = []
+    for name, field in model.model_fields.items():
+        if field.alias or field.default_factory is not None:
+            raise TypeError(f"{model.__name__}.{name}: aliases and default factories are not supported")
+        convert_field = _converter(field.annotation)
+        default = _MISSING if field.is_required() else convert_field(field.default)
+        fields.append((name, _passthrough(field.annotation), convert_field, default))
+
+    def convert(doc):
+        if type(doc) is not dict:
+            raise _Mismatch
+        out = {}
+        for name, passthrough, convert_field, default in fields:
+            value = doc.get(name, _MISSING)
+            if type(value) in passthrough:
+                out[name] = value
+            elif value is not _MISSING:
+                out[name] = convert_field(value)
+            elif default is not _MISSING:
+                out[name] = default
+            else:
+                raise _Mismatch
+        return out
+    return convert
+
+
+class DocumentEncoder:
+    """Encodes trusted documents as ``model`` would serialize them"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._convert = _model_converter(model)
+
+    def _validated(self, doc: dict) -> Dict[str, Any]:
+        return self.model.model_validate(doc).model_dump(mode="json")
+
+    def encode(self, doc: dict) -> bytes:
+        try:
+            return dumps(self._convert(doc))
+        except _Mismatch:
+            return render_json(self._validated(doc))
+
+    def encode_many(self, docs: Iterable[dict]) -> bytes:
+        docs = docs if isinstance(docs, list) else list(docs)
+        try:
+            return dumps([self._convert(doc) for doc in docs])
+        except _Mismatch:
+            return render_json([self._validated(doc) for doc in docs])
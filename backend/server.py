@@ -1,23 +1,55 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, Body, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
+import random
+import json
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from cache import CacheRegistry
+from database import (
+    NewsRepository, RecommendationRepository, StatusCheckRepository, close_client, get_client, get_database, warm_up
+)
+from compression import MIN_COMPRESS_SIZE, CompressionMiddleware
+from conditional_get import ConditionalGetMiddleware, versioned
+from data_versions import DataVersionWatcher
+from universe import UniverseSnapshot, UniverseStore
+from indexes import ensure_indexes
+from jobs import Job, JobRunner
+import market_updates
+from price_stream import PriceFeed, parse_symbols
+from price_history import RESOLUTIONS, load_history, resample
+from question_classifier import GENERAL_INTENT, REALTIME_INTENT, ParsedQuestion, extract_tickers
+from serialization import JSON_MEDIA_TYPE, DocumentEncoder, render_json
+from news_search import DEFAULT_SEARCH_PAGE_SIZE, MAX_SEARCH_PAGE_SIZE, search_articles
+from news_browse import browse_articles
+from news_entities import backfill_symbols
+from synthetic_profiles import ProfileStore, trading_day
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NDJSON_MEDIA_TYPE,
+    fetch_page, keyset_query, parse_fields, stream_ndjson, trim_to_fields
+)
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection: the process-wide pooled client (see database.py)
+client = get_client()
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
+news_repository = NewsRepository(db)
+status_repository = StatusCheckRepository(db)
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -25,6 +57,64 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Response caches for read-heavy routes. Data only changes when the updater
+# scripts run, so entries are dropped as soon as a collection's data version
+# moves; the TTLs are a safety net on top of that.
+response_cache = CacheRegistry()
+CACHE_TTLS = {
+    "investments": 60,
+    "investment_types": 300,
+    "news": 120,
+    "news_categories": 300,
+    "news_search": 120,
+    "news_facets": 30,
+    "answers": 300,
+    "profiles": 86400,
+    "compressed": 300
+}
+COLLECTION_CACHE_NAMESPACES = {
+    "investment_recommendations": ["investments", "investment_types", "answers", "compressed"],
+    "news_articles": ["news", "news_categories", "news_search", "news_facets", "compressed"]
+}
+# Facet counts for /news/browse, per filter combination; counting visits every
+# matching article, while the page itself is a cheap keyset read
+news_facet_cache = response_cache.register("news_facets", ttl=CACHE_TTLS["news_facets"], maxsize=512)
+# Compressed variants of ETag'd responses, keyed on (ETag, encoding); the
+# ETag already pins the data version, so each is compressed once per version
+compressed_cache = response_cache.register("compressed", ttl=CACHE_TTLS["compressed"], maxsize=512)
+# Admin jobs (data refreshes) run on this event loop; their records and
+# leases live in MongoDB, so any worker can report them and none overlap
+job_runner = JobRunner(db)
+
+# In-memory universe the Q&A handlers answer from, reloaded per data version
+universe = UniverseStore(db, lambda: data_version_watcher.versions.get("investment_recommendations", 0))
+
+# Q&A answers keyed on (intent, entities, universe version): most traffic is a
+# handful of near-identical questions whose answer only changes with the data
+ANSWER_CACHE_SIZE = 1024
+answer_cache = response_cache.register("answers", ttl=CACHE_TTLS["answers"], maxsize=ANSWER_CACHE_SIZE)
+
+# Synthetic profiles for tickers we don't cover, fixed per (symbol, trading day);
+# persisting them lets every worker and restart reuse the same profile
+PROFILE_CACHE_SIZE = 4096
+profile_store = ProfileStore(
+    db,
+    response_cache.register("profiles", ttl=CACHE_TTLS["profiles"], maxsize=PROFILE_CACHE_SIZE),
+    persist=os.environ.get('PERSIST_SYNTHETIC_PROFILES', 'false').lower() == 'true'
+)
+
+# Pushes price deltas to WebSocket/SSE clients
+price_feed = PriceFeed(db)
+
+async def on_data_version_change(collection: str, version: int):
+    response_cache.invalidate(COLLECTION_CACHE_NAMESPACES.get(collection, []))
+    if collection == "investment_recommendations":
+        universe.invalidate()
+        await price_feed.on_data_version_change()
+
+data_version_watcher = DataVersionWatcher(db, interval=float(os.environ.get('DATA_VERSION_POLL_SECONDS', 5)))
+data_version_watcher.subscribe(on_data_version_change)
+
 
 # Define Models
 class StatusCheck(BaseModel):
@@ -59,6 +149,35 @@ class NewsArticleResponse(BaseModel):
     image_url: Optional[str] = None
     tags: List[str] = []
     read_time: int
+    symbols: List[str] = []  # investments the article mentions
+
+class NewsSearchHit(BaseModel):
+    id: str
+    title: str
+    summary: str
+    author: str
+    category: str
+    publish_date: datetime
+    image_url: Optional[str] = None
+    tags: List[str] = []
+    read_time: int
+    symbols: List[str] = []
+    score: float
+    snippet: str  # HTML-escaped, matches wrapped in <mark>
+
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+class NewsFacets(BaseModel):
+    category: List[FacetCount] = []
+    tags: List[FacetCount] = []
+    author: List[FacetCount] = []
+    month: List[FacetCount] = []  # "YYYY-MM", most recent first
+
+class NewsBrowseResponse(BaseModel):
+    articles: List[NewsArticleResponse]
+    facets: NewsFacets
 
 # Investment Models
 class TechnicalIndicators(BaseModel):
@@ -67,6 +186,8 @@ class TechnicalIndicators(BaseModel):
     moving_avg_200: Optional[float] = None
     pe_ratio: Optional[float] = None
     volatility: Optional[float] = None
+    ema_12: Optional[float] = None
+    ema_26: Optional[float] = None
 
 class InvestmentRecommendation(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -110,6 +231,22 @@ class InvestmentRecommendationResponse(BaseModel):
     sector: Optional[str]
     technical_indicators: Optional[TechnicalIndicators]
 
+# Price history Models
+class PriceHistoryPoint(BaseModel):
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+
+class PriceHistoryResponse(BaseModel):
+    symbol: str
+    resolution: str
+    start: datetime
+    end: datetime
+    points: List[PriceHistoryPoint]
+
 # Q&A Models
 class InvestmentQuestion(BaseModel):
     question: str
@@ -123,182 +260,328 @@ class InvestmentAnswer(BaseModel):
     response_time: datetime = Field(default_factory=datetime.utcnow)
     sources: List[str] = []
 
+# Stored documents are encoded straight to JSON bytes (see serialization.py)
+news_encoder = DocumentEncoder(NewsArticleResponse)
+search_hit_encoder = DocumentEncoder(NewsSearchHit)
+browse_encoder = DocumentEncoder(NewsBrowseResponse)
+investment_encoder = DocumentEncoder(InvestmentRecommendationResponse)
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
+# Health checks
+READINESS_TIMEOUT_SECONDS = 2
+
+@api_router.get("/health/live")
+async def liveness_check():
+    """The worker is up and serving requests"""
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness_check():
+    """The worker can reach MongoDB and should receive traffic"""
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), READINESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "error": str(e) or type(e).__name__})
+    return {"status": "ready"}
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    await status_repository.create(status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
+    status_checks = await status_repository.list()
     return [StatusCheck(**status_check) for status_check in status_checks]
 
 # News API Endpoints
+def encoded_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Pre-encoded JSON; FastAPI returns a Response as-is, skipping response_model"""
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+def paged_response(body: bytes, next_cursor: Optional[str]) -> Response:
+    """Attach the next-page cursor to an encoded page"""
+    return encoded_response(body, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@response_cache.cached("news", ttl=CACHE_TTLS["news"])
+async def fetch_news_page(category: Optional[str], cursor: Optional[str], limit: int, fields: Optional[str]):
+    query = {"category": category} if category else {}
+    projection, requested = parse_fields(fields, NewsArticleResponse.model_fields, "publish_date")
+    articles, next_cursor = await fetch_page(
+        db.news_articles, keyset_query(query, "publish_date", cursor), projection, "publish_date", limit
+    )
+    if requested is None:
+        return news_encoder.encode_many(articles), next_cursor
+    return render_json(jsonable_encoder([trim_to_fields(article, requested) for article in articles])), next_cursor
+
 @api_router.get("/news", response_model=List[NewsArticleResponse])
-async def get_news_articles(category: Optional[str] = Query(None)):
-    query = {}
-    if category:
-        query["category"] = category
+@versioned("news_articles")
+async def get_news_articles(
+    category: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,summary"),
+    stream: bool = Query(False, description="Stream every matching article as NDJSON")
+):
+    if stream:
+        query = keyset_query({"category": category} if category else {}, "publish_date", cursor)
+        projection, requested = parse_fields(fields, NewsArticleResponse.model_fields, "publish_date")
+        return StreamingResponse(
+            stream_ndjson(db.news_articles, query, projection, "publish_date", limit, requested),
+            media_type=NDJSON_MEDIA_TYPE
+        )
     
-    articles = await db.news_articles.find(query).sort("publish_date", -1).to_list(100)
-    return [NewsArticleResponse(**article) for article in articles]
+    body, next_cursor = await fetch_news_page(
+        category=category, cursor=cursor, limit=limit or DEFAULT_PAGE_SIZE, fields=fields
+    )
+    return paged_response(body, next_cursor)
+
+@response_cache.cached("news_search", ttl=CACHE_TTLS["news_search"], maxsize=1024)
+async def fetch_search_page(q: str, tags: Tuple[str, ...], start: Optional[datetime], end: Optional[datetime],
+                            cursor: Optional[str], limit: int):
+    hits, next_cursor = await search_articles(db.news_articles, q, list(tags), start, end, cursor, limit)
+    return search_hit_encoder.encode_many(hits), next_cursor
+
+@api_router.get("/news/search", response_model=List[NewsSearchHit])
+@versioned("news_articles")
+async def search_news_articles(
+    q: str = Query(..., min_length=1, max_length=200, description='Words, "exact phrases" and -excluded words'),
+    tags: Optional[str] = Query(None, description="Comma-separated tags every hit must carry"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    """Articles ranked by relevance (title, tags, summary, then content), with highlighted snippets"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query must not be blank")
+    tag_list = tuple(tag.strip() for tag in tags.split(",") if tag.strip()) if tags else ()
+    start = to_naive_utc(start) if start else None
+    end = to_naive_utc(end) if end else None
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    body, next_cursor = await fetch_search_page(
+        q=q.strip(), tags=tag_list, start=start, end=end, cursor=cursor, limit=limit or DEFAULT_SEARCH_PAGE_SIZE
+    )
+    return paged_response(body, next_cursor)
+
+@api_router.get("/news/browse", response_model=NewsBrowseResponse)
+@versioned("news_articles")
+async def browse_news_articles(
+    category: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None, description="Comma-separated tags every article must carry"),
+    author: Optional[str] = Query(None),
+    month: Optional[str] = Query(None, description="Publish month, YYYY-MM"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    """A page of articles plus category, tag, author and month counts for the same filters"""
+    tag_list = tuple(tag.strip() for tag in tags.split(",") if tag.strip()) if tags else ()
+    projection, _ = parse_fields(None, NewsArticleResponse.model_fields, "publish_date")
+    articles, next_cursor, facets = await browse_articles(
+        db.news_articles, news_facet_cache, projection, category, tag_list, author, month,
+        cursor, limit or DEFAULT_PAGE_SIZE
+    )
+    return paged_response(browse_encoder.encode({"articles": articles, "facets": facets}), next_cursor)
 
 @api_router.get("/news/{article_id}", response_model=NewsArticleResponse)
+@versioned("news_articles")
 async def get_news_article(article_id: str):
-    article = await db.news_articles.find_one({"id": article_id})
+    article = await news_repository.get(article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    return NewsArticleResponse(**article)
+    return encoded_response(news_encoder.encode(article))
 
 @api_router.get("/news/categories/list")
+@versioned("news_articles")
+@response_cache.cached("news_categories", ttl=CACHE_TTLS["news_categories"])
 async def get_news_categories():
-    pipeline = [
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    categories = await db.news_articles.aggregate(pipeline).to_list(100)
+    categories = await news_repository.count_by("category")
     return [{"category": cat["_id"], "count": cat["count"]} for cat in categories]
 
 # Investment API Endpoints
-@api_router.get("/investments/summary")
-async def get_investment_summary():
-    total_count = await db.investment_recommendations.count_documents({})
-    
-    # Count by recommendation type
-    buy_count = await db.investment_recommendations.count_documents({"recommendation": "BUY"})
-    hold_count = await db.investment_recommendations.count_documents({"recommendation": "HOLD"})
-    sell_count = await db.investment_recommendations.count_documents({"recommendation": "SELL"})
-    
-    # Count by asset type
-    stocks_count = await db.investment_recommendations.count_documents({"asset_type": "stock"})
-    indices_count = await db.investment_recommendations.count_documents({"asset_type": "index"})
-    commodities_count = await db.investment_recommendations.count_documents({"asset_type": "commodity"})
-    
+
+# All summary counts come from a single $facet aggregation (one round-trip)
+INVESTMENT_SUMMARY_PIPELINE = [
+    {"$facet": {
+        "total": [{"$count": "count"}],
+        "by_recommendation": [{"$group": {"_id": "$recommendation", "count": {"$sum": 1}}}],
+        "by_asset_type": [{"$group": {"_id": "$asset_type", "count": {"$sum": 1}}}]
+    }}
+]
+
+def build_investment_summary(facets: dict) -> dict:
+    """Shape the $facet output into the summary response"""
+    total = facets["total"][0]["count"] if facets.get("total") else 0
+    by_recommendation = {row["_id"]: row["count"] for row in facets.get("by_recommendation", [])}
+    by_asset_type = {row["_id"]: row["count"] for row in facets.get("by_asset_type", [])}
+
     return {
-        "total_recommendations": total_count,
+        "total_recommendations": total,
         "recommendations_by_type": {
-            "BUY": buy_count,
-            "HOLD": hold_count,
-            "SELL": sell_count
+            "BUY": by_recommendation.get("BUY", 0),
+            "HOLD": by_recommendation.get("HOLD", 0),
+            "SELL": by_recommendation.get("SELL", 0)
         },
         "assets_by_type": {
-            "stocks": stocks_count,
-            "indices": indices_count,
-            "commodities": commodities_count
+            "stocks": by_asset_type.get("stock", 0),
+            "indices": by_asset_type.get("index", 0),
+            "commodities": by_asset_type.get("commodity", 0)
         }
     }
 
+@api_router.get("/investments/summary")
+@versioned("investment_recommendations")
+async def get_investment_summary():
+    results = await db.investment_recommendations.aggregate(INVESTMENT_SUMMARY_PIPELINE).to_list(1)
+    return build_investment_summary(results[0] if results else {})
+
 # Q&A API Endpoints
+MAX_BATCH_QUESTIONS = 1000
+
+FALLBACK_ANSWER = {
+    "answer": "I apologize, but I'm unable to process your question at the moment. Please try asking about specific stocks, sectors, or investment strategies.",
+    "relevant_symbols": [],
+    "confidence": 0.5,
+    "sources": []
+}
+
+def build_answer(question: str, answer_data: dict) -> InvestmentAnswer:
+    return InvestmentAnswer(
+        question=question,
+        answer=answer_data["answer"],
+        relevant_symbols=answer_data["relevant_symbols"],
+        confidence=answer_data["confidence"],
+        sources=answer_data["sources"]
+    )
+
+async def answer_with_cache(question: str, snapshot: UniverseSnapshot) -> Tuple[dict, bool]:
+    """Answer data for one question, and whether it came from the answer cache"""
+    # Questions that resolve to the same intent and entities share an answer
+    question_lower = question.lower()
+    parsed = snapshot.classifier.classify(question_lower)
+    key = (parsed.intent, answer_entities(parsed), snapshot.version, snapshot.generation)
+    hit, answer_data = answer_cache.get(key)
+    if not hit:
+        answer_data = await answer_question(parsed, question_lower, snapshot)
+        answer_cache.set(key, answer_data)
+    return answer_data, hit
+
 @api_router.post("/investments/ask", response_model=InvestmentAnswer)
-async def ask_investment_question(question: InvestmentQuestion):
+async def ask_investment_question(question: InvestmentQuestion, response: Response):
     """AI-powered investment Q&A system"""
     try:
-        # Get all investment data for context
-        all_investments = await db.investment_recommendations.find().to_list(100)
-        
-        # Process the question and generate intelligent response
-        answer_data = await process_investment_question(question.question, all_investments)
-        
-        return InvestmentAnswer(
-            question=question.question,
-            answer=answer_data["answer"],
-            relevant_symbols=answer_data["relevant_symbols"],
-            confidence=answer_data["confidence"],
-            sources=answer_data["sources"]
-        )
+        # Answer from the in-memory universe snapshot (no database round-trip)
+        snapshot = await universe.get()
+        answer_data, hit = await answer_with_cache(question.question, snapshot)
+        response.headers["X-Answer-Cache"] = "HIT" if hit else "MISS"
+        return build_answer(question.question, answer_data)
         
     except Exception as e:
         # Fallback response for any errors
-        return InvestmentAnswer(
-            question=question.question,
-            answer="I apologize, but I'm unable to process your question at the moment. Please try asking about specific stocks, sectors, or investment strategies.",
-            relevant_symbols=[],
-            confidence=0.5,
-            sources=[]
-        )
+        return build_answer(question.question, FALLBACK_ANSWER)
+
+async def batch_answers(questions: List[InvestmentQuestion], snapshot: UniverseSnapshot):
+    """Answers in question order; repeated questions are answered once"""
+    try:
+        # Profiles for every unknown ticker in the batch come from one vectorized call
+        await profile_store.get_many(batch_unknown_tickers(questions, snapshot))
+    except Exception:
+        pass  # each question generates its own profile instead
+    
+    answered = {}
+    for question in questions:
+        question_lower = question.question.lower()
+        if question_lower not in answered:
+            try:
+                answered[question_lower], _ = await answer_with_cache(question.question, snapshot)
+            except Exception:
+                # One bad question must not sink the rest of the batch
+                answered[question_lower] = FALLBACK_ANSWER
+        yield build_answer(question.question, answered[question_lower])
+
+def batch_unknown_tickers(questions: List[InvestmentQuestion], snapshot: UniverseSnapshot) -> List[str]:
+    """The ticker each realtime question in the batch will be answered about"""
+    tickers = []
+    for question_lower in dict.fromkeys(question.question.lower() for question in questions):
+        unknown = [sym for sym in extract_tickers(question_lower) if sym not in snapshot.matcher.symbols]
+        if unknown:
+            tickers.append(unknown[0])
+    return tickers
+
+async def stream_batch_answers(questions: List[InvestmentQuestion], snapshot: UniverseSnapshot):
+    async for answer in batch_answers(questions, snapshot):
+        line = json.dumps(jsonable_encoder(answer), ensure_ascii=False)
+        yield (line + "\n").encode()
+
+@api_router.post("/investments/ask/batch", response_model=List[InvestmentAnswer])
+async def ask_investment_questions(
+    questions: List[InvestmentQuestion] = Body(..., min_length=1, max_length=MAX_BATCH_QUESTIONS),
+    stream: bool = Query(False, description="Stream answers as NDJSON, one line per question")
+):
+    """Answer many questions against one universe snapshot, in request order"""
+    try:
+        # Every question in the batch sees the same data version
+        snapshot = await universe.get()
+    except Exception:
+        raise HTTPException(status_code=503, detail="Investment data is unavailable; try again shortly")
+    
+    if stream:
+        return StreamingResponse(stream_batch_answers(questions, snapshot), media_type=NDJSON_MEDIA_TYPE)
+    return [answer async for answer in batch_answers(questions, snapshot)]
 
-async def process_investment_question(question: str, investments: List[dict]) -> dict:
+async def process_investment_question(question: str, investments: UniverseSnapshot) -> dict:
     """Process investment questions and provide intelligent responses"""
     question_lower = question.lower()
-    relevant_symbols = []
-    sources = []
-    confidence = 0.8
-    
-    # Check if question mentions specific symbols
-    symbols_mentioned = []
-    for inv in investments:
-        if inv["symbol"].lower() in question_lower or inv["name"].lower() in question_lower:
-            symbols_mentioned.append(inv)
-            relevant_symbols.append(inv["symbol"])
-    
-    # Check for stock symbols not in our database (real-time analysis)
-    potential_symbols = extract_stock_symbols(question_lower)
-    unknown_symbols = [sym for sym in potential_symbols if not any(inv["symbol"].upper() == sym.upper() for inv in investments)]
-    
-    if unknown_symbols:
-        # Handle real-time analysis for unknown stocks
-        return await handle_realtime_stock_analysis(unknown_symbols[0], question_lower)
-    
-    # Question pattern matching and response generation for known stocks
-    if any(word in question_lower for word in ["should i buy", "recommend", "good investment"]):
-        return await handle_recommendation_question(question_lower, investments, symbols_mentioned)
-    
-    elif any(word in question_lower for word in ["price target", "target price", "price prediction"]):
-        return await handle_price_question(question_lower, investments, symbols_mentioned)
-    
-    elif any(word in question_lower for word in ["risk", "risky", "safe", "volatile"]):
-        return await handle_risk_question(question_lower, investments, symbols_mentioned)
-    
-    elif any(word in question_lower for word in ["sector", "industry", "technology", "healthcare", "financial"]):
-        return await handle_sector_question(question_lower, investments)
-    
-    elif any(word in question_lower for word in ["portfolio", "diversification", "allocation"]):
-        return await handle_portfolio_question(question_lower, investments)
-    
-    elif any(word in question_lower for word in ["market", "economy", "outlook", "trend"]):
-        return await handle_market_question(question_lower, investments)
+    return await answer_question(investments.classifier.classify(question_lower), question_lower, investments)
+
+def answer_entities(parsed: ParsedQuestion) -> Tuple[str, ...]:
+    """The parts of a classified question its answer depends on, besides the data"""
+    if parsed.intent == REALTIME_INTENT:
+        # Synthetic profiles change with the trading day
+        return (parsed.unknown_symbols[0], trading_day().isoformat())
+    if parsed.intent in ("recommendation", "price", "risk", GENERAL_INTENT):
+        # Those handlers answer about the first mentioned investment only
+        return (parsed.mentions[0]["symbol"],) if parsed.mentions else ()
+    if parsed.intent == "sector":
+        # The sector handler singles out technology and summarises the rest
+        return ("Technology",) if "Technology" in parsed.sectors else ()
+    return ()
+
+async def answer_question(parsed: ParsedQuestion, question: str, investments: UniverseSnapshot) -> dict:
+    """Generate the response for a classified question"""
+    intent = parsed.intent
+    symbols_mentioned = parsed.mentions
     
+    if intent == REALTIME_INTENT:
+        # Handle real-time analysis for unknown stocks
+        return await handle_realtime_stock_analysis(parsed.unknown_symbols[0], question)
+    elif intent == "recommendation":
+        return await handle_recommendation_question(question, investments, symbols_mentioned)
+    elif intent == "price":
+        return await handle_price_question(question, investments, symbols_mentioned)
+    elif intent == "risk":
+        return await handle_risk_question(question, investments, symbols_mentioned)
+    elif intent == "sector":
+        return await handle_sector_question(question, investments)
+    elif intent == "portfolio":
+        return await handle_portfolio_question(question, investments)
+    elif intent == "market":
+        return await handle_market_question(question, investments)
     else:
-        return await handle_general_question(question_lower, investments, symbols_mentioned)
-
-def extract_stock_symbols(question: str) -> List[str]:
-    """Extract potential stock symbols from question"""
-    import re
-    
-    # Common patterns for stock symbols in questions
-    patterns = [
-        r'\b([A-Z]{1,5})\b',  # 1-5 uppercase letters
-        r'\$([A-Z]{1,5})\b',  # Dollar sign prefix
-        r'\b([A-Z]{1,5})\.', # Symbol with period
-    ]
-    
-    symbols = []
-    for pattern in patterns:
-        matches = re.findall(pattern, question.upper())
-        symbols.extend(matches)
-    
-    # Filter out common words that aren't stock symbols
-    excluded_words = {
-        'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HAD', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'ITS', 'NEW', 'NOW', 'OLD', 'SEE', 'TWO', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE', 'BUY', 'SELL', 'HOLD', 'STOCK', 'PRICE', 'WHAT', 'WHEN', 'WHERE', 'WHY', 'WILL', 'WITH', 'GOOD', 'BEST', 'HIGH', 'LOW', 'TOP', 'BAD', 'BIG', 'LONG', 'SHORT', 'RISK', 'SAFE'
-    }
-    
-    valid_symbols = [sym for sym in symbols if sym not in excluded_words and len(sym) >= 2 and len(sym) <= 5]
-    return list(set(valid_symbols))  # Remove duplicates
+        return await handle_general_question(question, investments, symbols_mentioned)
 
 async def handle_realtime_stock_analysis(symbol: str, question: str) -> dict:
     """Generate real-time analysis for stocks not in our database"""
-    import random
-    from datetime import datetime, timedelta
-    
-    # Generate realistic stock data based on symbol characteristics
-    stock_data = generate_realistic_stock_data(symbol)
+    # Same profile for a symbol all trading day, so its answers agree (and cache)
+    stock_data = await profile_store.get(symbol)
     
     if not stock_data:
         return {
@@ -309,7 +592,8 @@ async def handle_realtime_stock_analysis(symbol: str, question: str) -> dict:
         }
     
     # Generate comprehensive analysis
-    analysis = generate_stock_analysis(stock_data, question)
+    rng = random.Random(f"realtime:{symbol}:{stock_data['trading_day']}")
+    analysis = generate_stock_analysis(stock_data, question, rng)
     
     return {
         "answer": analysis["answer"],
@@ -318,112 +602,9 @@ async def handle_realtime_stock_analysis(symbol: str, question: str) -> dict:
         "sources": ["Real-time market analysis", f"{symbol} live data", "Technical analysis engine"]
     }
 
-def generate_realistic_stock_data(symbol: str) -> dict:
-    """Generate realistic stock data for real-time analysis"""
-    import random
-    from datetime import datetime, timedelta
-    
-    # Basic validation - simple heuristics for valid symbols
-    if len(symbol) < 1 or len(symbol) > 5 or not symbol.isalpha():
-        return None
-    
-    # Assign characteristics based on symbol patterns
-    sector_mapping = {
-        'A': 'Technology', 'B': 'Financial Services', 'C': 'Healthcare', 'D': 'Consumer Discretionary',
-        'E': 'Energy', 'F': 'Financial Services', 'G': 'Technology', 'H': 'Healthcare',
-        'I': 'Industrials', 'J': 'Consumer Staples', 'K': 'Technology', 'L': 'Real Estate',
-        'M': 'Materials', 'N': 'Technology', 'O': 'Energy', 'P': 'Healthcare',
-        'Q': 'Communication Services', 'R': 'Real Estate', 'S': 'Technology', 'T': 'Communication Services',
-        'U': 'Utilities', 'V': 'Healthcare', 'W': 'Consumer Discretionary', 'X': 'Technology',
-        'Y': 'Consumer Discretionary', 'Z': 'Technology'
-    }
-    
-    first_letter = symbol[0].upper()
-    sector = sector_mapping.get(first_letter, 'Technology')
-    
-    # Generate base price based on symbol length and characteristics
-    if len(symbol) <= 2:
-        # Shorter symbols tend to be more established, higher prices
-        base_price = random.uniform(50, 300)
-        market_cap_range = "Large Cap"
-    elif len(symbol) == 3:
-        # Most common, medium range
-        base_price = random.uniform(20, 150)
-        market_cap_range = "Mid to Large Cap"
-    else:
-        # Longer symbols tend to be smaller companies
-        base_price = random.uniform(5, 50)
-        market_cap_range = "Small to Mid Cap"
-    
-    # Sector-specific adjustments
-    sector_multipliers = {
-        'Technology': random.uniform(1.2, 2.0),
-        'Healthcare': random.uniform(1.1, 1.8),
-        'Financial Services': random.uniform(0.8, 1.3),
-        'Energy': random.uniform(0.7, 1.4),
-        'Utilities': random.uniform(0.6, 1.2),
-        'Consumer Staples': random.uniform(0.8, 1.5),
-        'Consumer Discretionary': random.uniform(0.9, 1.7),
-        'Industrials': random.uniform(0.9, 1.6),
-        'Materials': random.uniform(0.8, 1.4),
-        'Real Estate': random.uniform(0.7, 1.3),
-        'Communication Services': random.uniform(0.9, 1.8)
-    }
-    
-    current_price = base_price * sector_multipliers.get(sector, 1.0)
-    
-    # Generate other realistic metrics
-    volatility = random.uniform(0.15, 0.6)
-    price_change_percent = random.uniform(-5, 5) * (volatility / 0.3)
-    price_change_24h = current_price * (price_change_percent / 100)
-    
-    # Risk level based on volatility and sector
-    if volatility < 0.25:
-        risk_level = "LOW"
-    elif volatility < 0.4:
-        risk_level = "MEDIUM"
-    else:
-        risk_level = "HIGH"
-    
-    # Generate recommendation based on sector trends and price momentum
-    recommendation_weights = {"BUY": 0.6, "HOLD": 0.3, "SELL": 0.1}
-    if price_change_percent > 2:
-        recommendation_weights = {"BUY": 0.7, "HOLD": 0.25, "SELL": 0.05}
-    elif price_change_percent < -3:
-        recommendation_weights = {"BUY": 0.4, "HOLD": 0.4, "SELL": 0.2}
-    
-    recommendation = random.choices(list(recommendation_weights.keys()), 
-                                  weights=list(recommendation_weights.values()))[0]
-    
-    # Target price based on recommendation
-    if recommendation == "BUY":
-        target_multiplier = random.uniform(1.08, 1.25)
-    elif recommendation == "HOLD":
-        target_multiplier = random.uniform(0.95, 1.08)
-    else:  # SELL
-        target_multiplier = random.uniform(0.85, 0.95)
-    
-    target_price = current_price * target_multiplier
-    
-    return {
-        "symbol": symbol.upper(),
-        "name": f"{symbol.upper()} Corporation",
-        "current_price": round(current_price, 2),
-        "target_price": round(target_price, 2),
-        "price_change_24h": round(price_change_24h, 2),
-        "price_change_percent": round(price_change_percent, 2),
-        "sector": sector,
-        "risk_level": risk_level,
-        "recommendation": recommendation,
-        "confidence_score": random.randint(65, 88),
-        "volatility": round(volatility, 3),
-        "market_cap_range": market_cap_range,
-        "last_updated": datetime.utcnow()
-    }
-
-def generate_stock_analysis(stock_data: dict, question: str) -> dict:
+def generate_stock_analysis(stock_data: dict, question: str, rng: random.Random = None) -> dict:
     """Generate comprehensive analysis for a stock"""
-    import random
+    rng = rng or random
     
     symbol = stock_data["symbol"]
     name = stock_data["name"]
@@ -493,7 +674,7 @@ def generate_stock_analysis(stock_data: dict, question: str) -> dict:
     ])
     
     # Select 3-4 random analysis points
-    selected_points = random.sample(analysis_points, min(4, len(analysis_points)))
+    selected_points = rng.sample(analysis_points, min(4, len(analysis_points)))
     
     # Generate main analysis text
     analysis_text = f"**{symbol} ({name}) Real-Time Analysis:**\n\n"
@@ -553,7 +734,7 @@ def generate_stock_analysis(stock_data: dict, question: str) -> dict:
         "confidence": analysis_confidence
     }
 
-async def handle_recommendation_question(question: str, investments: List[dict], symbols_mentioned: List[dict]) -> dict:
+async def handle_recommendation_question(question: str, investments: UniverseSnapshot, symbols_mentioned: List[dict]) -> dict:
     """Handle recommendation-related questions"""
     
     if symbols_mentioned:
@@ -583,8 +764,8 @@ async def handle_recommendation_question(question: str, investments: List[dict],
     
     else:
         # General recommendation question
-        buy_recs = [inv for inv in investments if inv["recommendation"] == "BUY"]
-        top_buys = sorted(buy_recs, key=lambda x: x["confidence_score"], reverse=True)[:3]
+        buy_rows = investments.rows("recommendation", "BUY")
+        top_buys = investments.docs(investments.top(buy_rows, "confidence_score", 3))
         
         answer = f"Based on our current analysis, here are our top 3 BUY recommendations:\n\n"
         for i, inv in enumerate(top_buys, 1):
@@ -600,7 +781,7 @@ async def handle_recommendation_question(question: str, investments: List[dict],
             "sources": ["Current investment recommendations", "Analyst reports"]
         }
 
-async def handle_price_question(question: str, investments: List[dict], symbols_mentioned: List[dict]) -> dict:
+async def handle_price_question(question: str, investments: UniverseSnapshot, symbols_mentioned: List[dict]) -> dict:
     """Handle price target and prediction questions"""
     
     if symbols_mentioned:
@@ -643,7 +824,7 @@ async def handle_price_question(question: str, investments: List[dict], symbols_
     else:
         answer = "Our price targets are based on comprehensive fundamental and technical analysis. Here are some key targets:\n\n"
         
-        high_conviction = [inv for inv in investments if inv["confidence_score"] >= 80][:4]
+        high_conviction = investments.docs(np.flatnonzero(investments.columns["confidence_score"] >= 80)[:4])
         for inv in high_conviction:
             change = ((inv['target_price'] - inv['current_price']) / inv['current_price']) * 100
             answer += f"• **{inv['symbol']}**: ${inv['current_price']:.2f} → ${inv['target_price']:.2f} ({change:+.1f}%) in {inv['timeframe']}\n"
@@ -657,7 +838,7 @@ async def handle_price_question(question: str, investments: List[dict], symbols_
             "sources": ["Price target analysis", "Technical analysis reports"]
         }
 
-async def handle_risk_question(question: str, investments: List[dict], symbols_mentioned: List[dict]) -> dict:
+async def handle_risk_question(question: str, investments: UniverseSnapshot, symbols_mentioned: List[dict]) -> dict:
     """Handle risk-related questions"""
     
     if symbols_mentioned:
@@ -693,14 +874,15 @@ async def handle_risk_question(question: str, investments: List[dict], symbols_m
         }
     
     else:
-        low_risk = [inv for inv in investments if inv["risk_level"] == "LOW"]
-        high_risk = [inv for inv in investments if inv["risk_level"] == "HIGH"]
+        low_risk = investments.rows("risk_level", "LOW")
+        high_risk = investments.rows("risk_level", "HIGH")
+        symbols = investments.columns["symbol"]
         
         answer = f"**Risk Analysis Overview:**\n\n"
         answer += f"**Low Risk Options ({len(low_risk)} available):** "
-        answer += ", ".join([inv["symbol"] for inv in low_risk[:5]])
+        answer += ", ".join(symbols[low_risk[:5]])
         answer += f"\n\n**High Risk/High Reward ({len(high_risk)} available):** "
-        answer += ", ".join([inv["symbol"] for inv in high_risk[:5]])
+        answer += ", ".join(symbols[high_risk[:5]])
         answer += "\n\nRisk levels are determined by volatility, sector stability, and fundamental strength."
         
         return {
@@ -710,18 +892,11 @@ async def handle_risk_question(question: str, investments: List[dict], symbols_m
             "sources": ["Risk assessment framework", "Portfolio risk analysis"]
         }
 
-async def handle_sector_question(question: str, investments: List[dict]) -> dict:
+async def handle_sector_question(question: str, investments: UniverseSnapshot) -> dict:
     """Handle sector-related questions"""
     
-    sectors = {}
-    for inv in investments:
-        if inv.get("sector"):
-            if inv["sector"] not in sectors:
-                sectors[inv["sector"]] = []
-            sectors[inv["sector"]].append(inv)
-    
     if "technology" in question or "tech" in question:
-        tech_stocks = sectors.get("Technology", [])
+        tech_stocks = investments.docs(investments.rows("sector", "Technology"))
         answer = f"**Technology Sector Analysis:**\n\n"
         answer += f"We cover {len(tech_stocks)} technology stocks with strong growth potential:\n"
         
@@ -739,9 +914,10 @@ async def handle_sector_question(question: str, investments: List[dict]) -> dict
     
     else:
         answer = "**Sector Breakdown:**\n\n"
-        for sector, stocks in sectors.items():
-            buy_count = len([s for s in stocks if s["recommendation"] == "BUY"])
-            answer += f"• **{sector}**: {len(stocks)} stocks, {buy_count} BUY recommendations\n"
+        recommendations = investments.columns["recommendation"]
+        for sector, rows in investments.groups["sector"].items():
+            buy_count = np.count_nonzero(recommendations[rows] == "BUY")
+            answer += f"• **{sector}**: {len(rows)} stocks, {buy_count} BUY recommendations\n"
         
         answer += "\nEach sector is analyzed based on specific industry dynamics and economic factors."
         
@@ -752,29 +928,25 @@ async def handle_sector_question(question: str, investments: List[dict]) -> dict
             "sources": ["Sector analysis", "Industry research"]
         }
 
-async def handle_portfolio_question(question: str, investments: List[dict]) -> dict:
+async def handle_portfolio_question(question: str, investments: UniverseSnapshot) -> dict:
     """Handle portfolio and diversification questions"""
     
-    buy_recs = [inv for inv in investments if inv["recommendation"] == "BUY"]
-    sectors = {}
-    
-    for inv in buy_recs:
-        if inv.get("sector"):
-            if inv["sector"] not in sectors:
-                sectors[inv["sector"]] = []
-            sectors[inv["sector"]].append(inv)
+    buy_rows = investments.rows("recommendation", "BUY")
+    # Best-rated BUY per sector (first one on ties), sectors in universe order
+    top_picks = {
+        sector: investments.investments[investments.top(rows, "confidence_score", 1)[0]]
+        for sector, rows in investments.group_within(buy_rows, "sector").items()
+    }
     
     answer = "**Diversified Portfolio Recommendations:**\n\n"
     answer += "For a balanced portfolio, consider allocation across multiple sectors:\n\n"
     
-    for sector, stocks in list(sectors.items())[:5]:
-        top_pick = max(stocks, key=lambda x: x["confidence_score"])
+    for sector, top_pick in list(top_picks.items())[:5]:
         answer += f"• **{sector}**: {top_pick['symbol']} ({top_pick['confidence_score']}% confidence)\n"
     
     answer += f"\n**Risk Distribution:**\n"
-    risk_levels = {"LOW": 0, "MEDIUM": 0, "HIGH": 0}
-    for inv in buy_recs:
-        risk_levels[inv["risk_level"]] += 1
+    buy_risks = investments.columns["risk_level"][buy_rows]
+    risk_levels = {risk: int(np.count_nonzero(buy_risks == risk)) for risk in ("LOW", "MEDIUM", "HIGH")}
     
     total = sum(risk_levels.values())
     for risk, count in risk_levels.items():
@@ -785,18 +957,18 @@ async def handle_portfolio_question(question: str, investments: List[dict]) -> d
     
     return {
         "answer": answer,
-        "relevant_symbols": [max(stocks, key=lambda x: x["confidence_score"])["symbol"] for stocks in sectors.values()],
+        "relevant_symbols": [top_pick["symbol"] for top_pick in top_picks.values()],
         "confidence": 0.85,
         "sources": ["Portfolio optimization analysis", "Risk management framework"]
     }
 
-async def handle_market_question(question: str, investments: List[dict]) -> dict:
+async def handle_market_question(question: str, investments: UniverseSnapshot) -> dict:
     """Handle market outlook and trend questions"""
     
     total_recs = len(investments)
-    buy_count = len([inv for inv in investments if inv["recommendation"] == "BUY"])
-    hold_count = len([inv for inv in investments if inv["recommendation"] == "HOLD"])
-    sell_count = len([inv for inv in investments if inv["recommendation"] == "SELL"])
+    buy_count = investments.count("recommendation", "BUY")
+    hold_count = investments.count("recommendation", "HOLD")
+    sell_count = investments.count("recommendation", "SELL")
     
     buy_percentage = (buy_count / total_recs) * 100
     
@@ -810,10 +982,10 @@ async def handle_market_question(question: str, investments: List[dict]) -> dict
     answer += f"• SELL: {sell_count} positions ({(sell_count/total_recs)*100:.0f}%)\n\n"
     
     # Get sectors with most BUY recommendations
-    sector_buys = {}
-    for inv in investments:
-        if inv["recommendation"] == "BUY" and inv.get("sector"):
-            sector_buys[inv["sector"]] = sector_buys.get(inv["sector"], 0) + 1
+    sector_buys = {
+        sector: len(rows)
+        for sector, rows in investments.group_within(investments.rows("recommendation", "BUY"), "sector").items()
+    }
     
     top_sectors = sorted(sector_buys.items(), key=lambda x: x[1], reverse=True)[:3]
     answer += f"**Strongest Sectors:** {', '.join([sector for sector, count in top_sectors])}\n\n"
@@ -827,7 +999,7 @@ async def handle_market_question(question: str, investments: List[dict]) -> dict
         "sources": ["Market analysis", "Analyst consensus", "Economic indicators"]
     }
 
-async def handle_general_question(question: str, investments: List[dict], symbols_mentioned: List[dict]) -> dict:
+async def handle_general_question(question: str, investments: UniverseSnapshot, symbols_mentioned: List[dict]) -> dict:
     """Handle general investment questions"""
     
     if symbols_mentioned:
@@ -856,7 +1028,7 @@ async def handle_general_question(question: str, investments: List[dict], symbol
         answer += "• **Sector insights** (e.g., 'How's the tech sector?')\n"
         answer += "• **Portfolio advice** (e.g., 'How should I diversify?')\n"
         answer += "• **Market outlook** (e.g., 'What's the market trend?')\n\n"
-        answer += f"I have analysis on {len(investments)} investments across {len(set(inv.get('sector') for inv in investments if inv.get('sector')))} sectors."
+        answer += f"I have analysis on {len(investments)} investments across {len(investments.groups['sector'])} sectors."
         
         return {
             "answer": answer,
@@ -866,64 +1038,264 @@ async def handle_general_question(question: str, investments: List[dict], symbol
         }
 
 @api_router.get("/investments/types/list")
+@versioned("investment_recommendations")
+@response_cache.cached("investment_types", ttl=CACHE_TTLS["investment_types"])
 async def get_investment_asset_types():
-    pipeline = [
-        {"$group": {"_id": "$asset_type", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    types = await db.investment_recommendations.aggregate(pipeline).to_list(100)
+    types = await recommendation_repository.count_by("asset_type")
     return [{"asset_type": type_data["_id"], "count": type_data["count"]} for type_data in types]
 
+@response_cache.cached("investments", ttl=CACHE_TTLS["investments"])
+async def fetch_investment_page(asset_type: Optional[str], cursor: Optional[str], limit: int, fields: Optional[str]):
+    query = {"asset_type": asset_type} if asset_type else {}
+    projection, requested = parse_fields(fields, InvestmentRecommendationResponse.model_fields, "last_updated")
+    recommendations, next_cursor = await fetch_page(
+        db.investment_recommendations, keyset_query(query, "last_updated", cursor), projection, "last_updated", limit
+    )
+    if requested is None:
+        return investment_encoder.encode_many(recommendations), next_cursor
+    return render_json(jsonable_encoder([trim_to_fields(rec, requested) for rec in recommendations])), next_cursor
+
 @api_router.get("/investments", response_model=List[InvestmentRecommendationResponse])
-async def get_investment_recommendations(asset_type: Optional[str] = Query(None)):
-    query = {}
-    if asset_type:
-        query["asset_type"] = asset_type
+@versioned("investment_recommendations")
+async def get_investment_recommendations(
+    asset_type: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. symbol,current_price"),
+    stream: bool = Query(False, description="Stream every matching recommendation as NDJSON")
+):
+    if stream:
+        query = keyset_query({"asset_type": asset_type} if asset_type else {}, "last_updated", cursor)
+        projection, requested = parse_fields(fields, InvestmentRecommendationResponse.model_fields, "last_updated")
+        return StreamingResponse(
+            stream_ndjson(db.investment_recommendations, query, projection, "last_updated", limit, requested),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+    
+    body, next_cursor = await fetch_investment_page(
+        asset_type=asset_type, cursor=cursor, limit=limit or DEFAULT_PAGE_SIZE, fields=fields
+    )
+    return paged_response(body, next_cursor)
+
+DEFAULT_HISTORY_WINDOW = timedelta(days=1)
+MAX_HISTORY_POINTS = 10000
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC; normalise aware query values to match"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+# Declared before /investments/{recommendation_id}; the extra path segment
+# keeps the two from ever matching the same URL
+@api_router.get("/investments/{symbol}/history", response_model=PriceHistoryResponse)
+async def get_price_history(
+    symbol: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    resolution: str = Query("tick", description="tick, 1m, 5m, 15m, 1h or 1d")
+):
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown resolution; use one of {', '.join(RESOLUTIONS)}")
+    
+    end = to_naive_utc(end) if end else datetime.utcnow()
+    start = to_naive_utc(start) if start else end - DEFAULT_HISTORY_WINDOW
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    times, prices = await load_history(db, symbol.upper(), start, end)
+    points = resample(times, prices, RESOLUTIONS[resolution])
+    if len(points) > MAX_HISTORY_POINTS:
+        raise HTTPException(status_code=400, detail="Too many points; narrow the range or use a coarser resolution")
+    
+    return {"symbol": symbol.upper(), "resolution": resolution, "start": start, "end": end, "points": points}
+
+async def investment_symbol(recommendation_id: str) -> Optional[str]:
+    """Symbol of a recommendation, from the in-memory universe when it has it"""
+    try:
+        inv = (await universe.get()).by_id.get(recommendation_id)
+    except Exception:
+        inv = None
+    if inv is None:
+        # Added since the snapshot was loaded, or the snapshot is unavailable
+        return await recommendation_repository.symbol_for(recommendation_id)
+    return inv["symbol"]
+
+@response_cache.cached("news", ttl=CACHE_TTLS["news"])
+async def fetch_related_news_page(symbol: str, cursor: Optional[str], limit: int):
+    projection, _ = parse_fields(None, NewsArticleResponse.model_fields, "publish_date")
+    articles, next_cursor = await fetch_page(
+        db.news_articles, keyset_query({"symbols": symbol}, "publish_date", cursor), projection, "publish_date", limit
+    )
+    return news_encoder.encode_many(articles), next_cursor
+
+@api_router.get("/investments/{recommendation_id}/news", response_model=List[NewsArticleResponse])
+@versioned("investment_recommendations", "news_articles")
+async def get_investment_news(
+    recommendation_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    """Articles mentioning the investment, newest first"""
+    symbol = await investment_symbol(recommendation_id)
+    if not symbol:
+        raise HTTPException(status_code=404, detail="Investment recommendation not found")
     
-    recommendations = await db.investment_recommendations.find(query).sort("last_updated", -1).to_list(100)
-    return [InvestmentRecommendationResponse(**rec) for rec in recommendations]
+    body, next_cursor = await fetch_related_news_page(symbol=symbol, cursor=cursor, limit=limit or DEFAULT_PAGE_SIZE)
+    return paged_response(body, next_cursor)
 
 @api_router.get("/investments/{recommendation_id}", response_model=InvestmentRecommendationResponse)
+@versioned("investment_recommendations")
 async def get_investment_recommendation(recommendation_id: str):
-    recommendation = await db.investment_recommendations.find_one({"id": recommendation_id})
+    recommendation = await recommendation_repository.get(recommendation_id)
     if not recommendation:
         raise HTTPException(status_code=404, detail="Investment recommendation not found")
-    return InvestmentRecommendationResponse(**recommendation)
-
-# Include the router in the main app
-app.include_router(api_router)
+    return encoded_response(investment_encoder.encode(recommendation))
 
 # Manual data refresh endpoint
-@api_router.post("/admin/refresh-data")
+async def run_market_refresh() -> dict:
+    summary = await market_updates.refresh_market_data(db)
+    # Drop cached responses right away instead of waiting for the version poll
+    response_cache.invalidate()
+    universe.invalidate()
+    await price_feed.on_data_version_change()
+    return summary
+
+@api_router.post("/admin/refresh-data", status_code=202)
 async def refresh_market_data():
-    """Manually refresh market data for demonstration purposes"""
-    import subprocess
-    import os
-    
+    """Queue an in-process market data refresh and return its job id"""
+    job = await job_runner.submit("refresh-data", run_market_refresh, lease=market_updates.MARKET_DATA_LEASE)
+    return {
+        "success": True,
+        "message": "Market data refresh queued",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/admin/jobs/{job.id}"
+    }
+
+async def run_news_symbol_backfill() -> dict:
+    summary = await backfill_symbols(db)
+    if summary["articles_updated"]:
+        response_cache.invalidate(COLLECTION_CACHE_NAMESPACES["news_articles"])
+        # Other workers drop their news caches on the next version poll
+        await news_repository.mark_changed()
+    return summary
+
+@api_router.post("/admin/news/backfill-symbols", status_code=202)
+async def backfill_news_symbols():
+    """Queue re-tagging every article with the investment symbols it mentions"""
+    job = await job_runner.submit("backfill-news-symbols", run_news_symbol_backfill)
+    return {
+        "success": True,
+        "message": "News symbol backfill queued",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/admin/jobs/{job.id}"
+    }
+
+@api_router.get("/admin/jobs/{job_id}", response_model=Job)
+async def get_job_status(job_id: str):
+    job = await job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+# Real-time price streaming
+SSE_KEEPALIVE_SECONDS = 15
+
+@api_router.websocket("/stream/prices")
+async def stream_prices_websocket(websocket: WebSocket, symbols: Optional[str] = Query(None)):
+    """Push price deltas; clients may send {"subscribe": [...]} / {"unsubscribe": [...]}"""
+    await websocket.accept()
+    await price_feed.ensure_started()
+    subscription = price_feed.broker.subscribe(parse_symbols(symbols))
+
+    async def send_changes():
+        while True:
+            await websocket.send_text(await subscription.next_message())
+
+    async def receive_subscription_changes():
+        while True:
+            message = await websocket.receive_json()
+            subscription.update_symbols(
+                add=message.get("subscribe", []),
+                remove=message.get("unsubscribe", [])
+            )
+            await websocket.send_json({"type": "snapshot", "prices": price_feed.snapshot(subscription.symbols)})
+
+    tasks = []
     try:
-        # Run the update script
-        result = subprocess.run([
-            "python", "/app/update_data.py"
-        ], capture_output=True, text=True, cwd="/app")
-        
-        if result.returncode == 0:
-            return {
-                "success": True,
-                "message": "Market data refreshed successfully",
-                "output": result.stdout
-            }
-        else:
-            return {
-                "success": False,
-                "message": "Failed to refresh data",
-                "error": result.stderr
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": "Error refreshing data",
-            "error": str(e)
+        await websocket.send_json({"type": "snapshot", "prices": price_feed.snapshot(subscription.symbols)})
+        tasks = [asyncio.create_task(send_changes()), asyncio.create_task(receive_subscription_changes())]
+        # Whichever side stops first (usually a disconnect) ends the stream
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning(f"Price stream closed: {task.exception()}")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+@api_router.get("/stream/prices/sse")
+async def stream_prices_sse(request: Request, symbols: Optional[str] = Query(None)):
+    """Server-Sent Events fallback for clients that can't open a WebSocket"""
+    await price_feed.ensure_started()
+    subscription = price_feed.broker.subscribe(parse_symbols(symbols))
+
+    async def events():
+        try:
+            snapshot = {"type": "snapshot", "prices": price_feed.snapshot(subscription.symbols)}
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.next_message(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: prices\ndata: {message}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@api_router.get("/admin/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for every response cache namespace"""
+    return {
+        "namespaces": response_cache.stats(),
+        "data_versions": data_version_watcher.versions,
+        "universe": universe.stats(),
+        "price_stream": {
+            "mode": price_feed.mode,
+            "subscribers": len(price_feed.broker.subscriptions)
         }
+    }
+
+@api_router.post("/admin/cache/invalidate")
+async def invalidate_cache(namespace: Optional[str] = Query(None)):
+    """Drop cached responses for one namespace, or all of them"""
+    response_cache.invalidate([namespace] if namespace else None)
+    if not namespace:
+        universe.invalidate()
+    return {"success": True, "invalidated": namespace or "all"}
+
+# Include the router in the main app (after every route has been declared)
+app.include_router(api_router)
+
+# Answers If-None-Match/If-Modified-Since on @versioned routes from the
+# in-memory data versions, before any route (or Mongo) is reached
+app.add_middleware(ConditionalGetMiddleware, router=app.router, watcher=data_version_watcher)
+# Outside the conditional check, so a 304 never pays for compression
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESS_MIN_SIZE', MIN_COMPRESS_SIZE)),
+    cache=compressed_cache
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -931,6 +1303,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Answer-Cache", "ETag"],
 )
 
 # Configure logging
@@ -940,6 +1313,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def warm_up_connection_pool():
+    # Handshake the minimum pool before traffic arrives; an unreachable
+    # server is reported by /health/ready, so don't fail startup over it
+    try:
+        opened = await warm_up()
+        logger.info(f"MongoDB connection pool warmed up ({opened} connections)")
+    except Exception as e:
+        logger.warning(f"MongoDB warm-up failed: {e}")
+
+@app.on_event("startup")
+async def start_data_version_watcher():
+    data_version_watcher.start()
+
+@app.on_event("startup")
+async def build_indexes():
+    # Runs in the background so a long index build never delays startup.
+    # The production launcher builds indexes once before forking workers
+    # and turns this off so each worker doesn't repeat it.
+    if os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true':
+        app.state.index_build = asyncio.create_task(ensure_indexes(db))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await data_version_watcher.stop()
+    await job_runner.shutdown()
+    await price_feed.stop()
+    close_client()
@@ -0,0 +1,128 @@
+"""Symbol and company-name matching for free-text questions.
+
+An Aho-Corasick automaton over the lower-cased symbols and names of the
+investment universe finds every mention in a single pass over the text,
+and a hash set answers "is this ticker covered?" in constant time.
+Both are built once per data version rather than per request. Extra
+vocabulary terms (e.g. the Q&A intent keywords) can ride along in the
+same automaton, so one pass over the question reports them too.
+"""
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; each pattern carries a key"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Hashable]] = [set()]
+
+        for pattern, key in patterns:
+            if pattern:
+                self._add(pattern, key)
+        self._link()
+
+        # Transitions with the failure links already followed, filled in
+        # lazily; only characters some pattern uses are ever stored
+        self._alphabet = {char for edges in self._goto for char in edges}
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _add(self, pattern: str, key: Hashable) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            node = next_node
+        self._output[node].add(key)
+
+    def _link(self) -> None:
+        """Breadth-first pass computing failure links and merged outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] |= self._output[self._fail[child]]
+
+    def _transition(self, node: int, char: str) -> int:
+        state = node
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        next_node = self._goto[state].get(char, 0)
+        self._delta[node][char] = next_node
+        return next_node
+
+    def search(self, text: str) -> Set[Hashable]:
+        """Keys of every pattern occurring anywhere in ``text``"""
+        delta = self._delta
+        alphabet = self._alphabet
+        output = self._output
+        found: Set[Hashable] = set()
+        node = 0
+        for char in text:
+            next_node = delta[node].get(char)
+            if next_node is None:
+                next_node = self._transition(node, char) if char in alphabet else 0
+            node = next_node
+            if output[node]:
+                found |= output[node]
+        return found
+
+    def matches(self, text: str) -> Iterator[Tuple[int, Hashable]]:
+        """(end index, key) for every pattern occurrence, end exclusive"""
+        delta = self._delta
+        alphabet = self._alphabet
+        output = self._output
+        node = 0
+        for position, char in enumerate(text):
+            next_node = delta[node].get(char)
+            if next_node is None:
+                next_node = self._transition(node, char) if char in alphabet else 0
+            node = next_node
+            for key in output[node]:
+                yield position + 1, key
+
+
+class SymbolMatcher:
+    """Finds which investments a question mentions, by symbol or by name"""
+
+    def __init__(self, investments: List[dict], terms: Iterable[str] = ()):
+        self.investments = investments
+        self.symbols = {inv["symbol"].upper() for inv in investments}
+        # Investments are keyed by position (int), vocabulary terms by the term itself
+        self.terms = frozenset(terms)
+        patterns = [(term, term) for term in self.terms]
+        for position, inv in enumerate(investments):
+            patterns.append((inv["symbol"].lower(), position))
+            patterns.append((inv["name"].lower(), position))
+        self._automaton = AhoCorasick(patterns)
+
+    def __len__(self) -> int:
+        return len(self.investments)
+
+    def scan(self, question_lower: str) -> Tuple[List[dict], Set[str]]:
+        """Mentioned investments (in universe order) and vocabulary terms, in one pass"""
+        found = self._automaton.search(question_lower)
+        terms = found & self.terms
+        if terms:
+            found -= terms
+        return [self.investments[position] for position in sorted(found)], terms
+
+    def find_mentions(self, question_lower: str) -> List[dict]:
+        """Investments whose symbol or name appears in the question, in universe order"""
+        return self.scan(question_lower)[0]
+
+    def is_known_symbol(self, symbol: str) -> bool:
+        return symbol.upper() in self.symbols
+
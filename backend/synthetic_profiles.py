@@ -0,0 +1,247 @@
+"""Deterministic synthetic profiles for tickers outside our coverage.
+
+/investments/ask used to invent a fresh price, recommendation and target
+for an unknown ticker on every question, so the same symbol got
+contradictory answers. A profile is now a pure function of (symbol,
+trading day): the symbol and day are hashed to a 64-bit seed, and every
+random quantity is drawn from a counter-based generator (splitmix64 of
+seed + draw number). Row i of a batch depends only on seed i, so
+generate_profiles() builds profiles for any number of symbols with a
+handful of NumPy array operations and generate_profile() is simply a
+batch of one; both give the same profile for the same symbol and day.
+
+ProfileStore memoizes profiles in a bounded LRU keyed on (symbol, day),
+so repeat questions about a ticker cost a dict lookup. It can also
+persist them to the synthetic_profiles collection (a TTL index expires
+old days) so every worker and restart serves the stored profile instead
+of regenerating it.
+"""
+import hashlib
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from pymongo import UpdateOne
+
+from cache import CacheBackend, TTLCache
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_PROFILES_COLLECTION = "synthetic_profiles"
+
+# Stored profiles outlive their trading day by a day, then MongoDB drops them
+PROFILE_RETENTION_SECONDS = 2 * 24 * 3600
+
+SECTOR_BY_LETTER = {
+    'A': 'Technology', 'B': 'Financial Services', 'C': 'Healthcare', 'D': 'Consumer Discretionary',
+    'E': 'Energy', 'F': 'Financial Services', 'G': 'Technology', 'H': 'Healthcare',
+    'I': 'Industrials', 'J': 'Consumer Staples', 'K': 'Technology', 'L': 'Real Estate',
+    'M': 'Materials', 'N': 'Technology', 'O': 'Energy', 'P': 'Healthcare',
+    'Q': 'Communication Services', 'R': 'Real Estate', 'S': 'Technology', 'T': 'Communication Services',
+    'U': 'Utilities', 'V': 'Healthcare', 'W': 'Consumer Discretionary', 'X': 'Technology',
+    'Y': 'Consumer Discretionary', 'Z': 'Technology'
+}
+
+# Price multiplier range per sector, applied on top of the base price
+SECTOR_MULTIPLIERS = {
+    'Technology': (1.2, 2.0),
+    'Healthcare': (1.1, 1.8),
+    'Financial Services': (0.8, 1.3),
+    'Energy': (0.7, 1.4),
+    'Utilities': (0.6, 1.2),
+    'Consumer Staples': (0.8, 1.5),
+    'Consumer Discretionary': (0.9, 1.7),
+    'Industrials': (0.9, 1.6),
+    'Materials': (0.8, 1.4),
+    'Real Estate': (0.7, 1.3),
+    'Communication Services': (0.9, 1.8)
+}
+
+# By symbol length (<=2, 3, 4-5): shorter symbols tend to be more
+# established companies with higher prices
+BASE_PRICE_RANGES = np.array([(50, 300), (20, 150), (5, 50)], dtype=float)
+MARKET_CAP_RANGES = ("Large Cap", "Mid to Large Cap", "Small to Mid Cap")
+
+# Volatility at or above which risk is MEDIUM, then HIGH
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
+RISK_THRESHOLDS = np.array([0.25, 0.4])
+
+# Cumulative BUY, HOLD weights (the rest is SELL) by momentum: 60/30/10
+# normally, 70/25/5 after a >2% gain, 40/40/20 after a >3% loss
+RECOMMENDATIONS = ("BUY", "HOLD", "SELL")
+RECOMMENDATION_CUTOFFS = np.array([(0.6, 0.9), (0.7, 0.95), (0.4, 0.8)])
+
+# Target price multiplier range per recommendation
+TARGET_MULTIPLIERS = np.array([(1.08, 1.25), (0.95, 1.08), (0.85, 0.95)])
+
+# Column of the uniform draw matrix each quantity uses
+(_BASE_PRICE, _SECTOR_MULTIPLIER, _VOLATILITY, _PRICE_CHANGE,
+ _RECOMMENDATION, _TARGET, _CONFIDENCE) = range(7)
+DRAWS = 7
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def trading_day(now: Optional[datetime] = None) -> date:
+    """The (UTC) trading day profiles are seeded with; weekends roll back to Friday"""
+    day = (now or datetime.utcnow()).date()
+    if day.weekday() >= 5:
+        day -= timedelta(days=day.weekday() - 4)
+    return day
+
+
+def is_valid_symbol(symbol: str) -> bool:
+    return 1 <= len(symbol) <= 5 and symbol.isalpha()
+
+
+def profile_seed(symbol: str, day: date) -> int:
+    digest = hashlib.blake2b(f"{symbol.upper()}:{day.isoformat()}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def uniforms(seeds: np.ndarray, draws: int) -> np.ndarray:
+    """(len(seeds), draws) uniforms in [0, 1); row i depends only on seeds[i]"""
+    with np.errstate(over="ignore"):
+        state = seeds[:, None] + np.arange(1, draws + 1, dtype=np.uint64)[None, :] * _GOLDEN
+        state = (state ^ (state >> np.uint64(30))) * _MIX_1
+        state = (state ^ (state >> np.uint64(27))) * _MIX_2
+        state ^= state >> np.uint64(31)
+    return (state >> np.uint64(11)).astype(float) / float(1 << 53)
+
+
+def _between(u: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+    """Scale uniforms to per-row (low, high) ranges"""
+    return ranges[:, 0] + u * (ranges[:, 1] - ranges[:, 0])
+
+
+def generate_profiles(symbols: List[str], day: date) -> List[Optional[dict]]:
+    """Profiles for ``symbols`` on ``day``, in order; None for symbols that can't be tickers"""
+    valid = list(dict.fromkeys(symbol.upper() for symbol in symbols if is_valid_symbol(symbol)))
+    profiles: Dict[str, dict] = {}
+    if valid:
+        seeds = np.array([profile_seed(symbol, day) for symbol in valid], dtype=np.uint64)
+        u = uniforms(seeds, DRAWS)
+
+        size = np.clip(np.array([len(symbol) for symbol in valid]) - 2, 0, 2)
+        sectors = [SECTOR_BY_LETTER.get(symbol[0], 'Technology') for symbol in valid]
+        sector_ranges = np.array([SECTOR_MULTIPLIERS[sector] for sector in sectors])
+        current_price = (_between(u[:, _BASE_PRICE], BASE_PRICE_RANGES[size])
+                         * _between(u[:, _SECTOR_MULTIPLIER], sector_ranges))
+
+        volatility = 0.15 + u[:, _VOLATILITY] * 0.45
+        price_change_percent = (u[:, _PRICE_CHANGE] * 10 - 5) * (volatility / 0.3)
+        price_change_24h = current_price * (price_change_percent / 100)
+        risk = np.searchsorted(RISK_THRESHOLDS, volatility, side="right")
+
+        momentum = (price_change_percent > 2) + 2 * (price_change_percent < -3)
+        cutoffs = RECOMMENDATION_CUTOFFS[momentum]
+        draw = u[:, _RECOMMENDATION, None]
+        recommendation = (draw >= cutoffs).sum(axis=1)
+        target_price = current_price * _between(u[:, _TARGET], TARGET_MULTIPLIERS[recommendation])
+        confidence_score = 65 + (u[:, _CONFIDENCE] * 24).astype(int)
+
+        prices = np.round([current_price, target_price, price_change_24h, price_change_percent], 2)
+        columns = zip(
+            valid, sectors, *prices.tolist(), np.round(volatility, 3).tolist(), risk.tolist(),
+            recommendation.tolist(), confidence_score.tolist(), size.tolist()
+        )
+        generated_at = datetime.utcnow()
+        for (symbol, sector, current, target, change_24h, change_percent,
+             vol, risk_index, rec_index, confidence, size_index) in columns:
+            profiles[symbol] = {
+                "symbol": symbol,
+                "name": f"{symbol} Corporation",
+                "current_price": current,
+                "target_price": target,
+                "price_change_24h": change_24h,
+                "price_change_percent": change_percent,
+                "sector": sector,
+                "risk_level": RISK_LEVELS[risk_index],
+                "recommendation": RECOMMENDATIONS[rec_index],
+                "confidence_score": confidence,
+                "volatility": vol,
+                "market_cap_range": MARKET_CAP_RANGES[size_index],
+                "trading_day": day.isoformat(),
+                "last_updated": generated_at
+            }
+    return [profiles.get(symbol.upper()) for symbol in symbols]
+
+
+def generate_profile(symbol: str, day: date) -> Optional[dict]:
+    return generate_profiles([symbol], day)[0]
+
+
+class ProfileStore:
+    """Memoized (and optionally persisted) profiles, keyed on (symbol, trading day)"""
+
+    def __init__(self, db, cache: Optional[CacheBackend] = None, persist: bool = False):
+        self.db = db
+        self.cache = cache if cache is not None else TTLCache(maxsize=4096, ttl=24 * 3600)
+        self.persist = persist
+
+    async def get(self, symbol: str, day: Optional[date] = None) -> Optional[dict]:
+        """Profile for one symbol; None if it can't be a ticker"""
+        day = day or trading_day()
+        hit, profile = self.cache.get((symbol.upper(), day))
+        if hit:
+            return profile
+        return (await self.get_many([symbol], day))[symbol.upper()]
+
+    async def get_many(self, symbols: Iterable[str], day: Optional[date] = None) -> Dict[str, Optional[dict]]:
+        """Profiles by upper-cased symbol; everything not memoized is generated in one batch"""
+        day = day or trading_day()
+        profiles: Dict[str, Optional[dict]] = {}
+        missing = []
+        for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+            hit, profile = self.cache.get((symbol, day))
+            if hit:
+                profiles[symbol] = profile
+            else:
+                missing.append(symbol)
+
+        if missing and self.persist:
+            stored = await self._load(missing, day)
+            profiles.update(stored)
+            missing = [symbol for symbol in missing if symbol not in stored]
+        if missing:
+            generated = dict(zip(missing, generate_profiles(missing, day)))
+            profiles.update(generated)
+            if self.persist:
+                await self._save([profile for profile in generated.values() if profile], day)
+
+        for symbol, profile in profiles.items():
+            self.cache.set((symbol, day), profile)
+        return profiles
+
+    async def _load(self, symbols: List[str], day: date) -> Dict[str, dict]:
+        # Persistence only saves regeneration, so a database hiccup must not fail the answer
+        try:
+            cursor = self.db[SYNTHETIC_PROFILES_COLLECTION].find(
+                {"symbol": {"$in": symbols}, "trading_day": day.isoformat()},
+                {"_id": 0, "created_at": 0}
+            )
+            return {doc["symbol"]: doc async for doc in cursor}
+        except Exception as e:
+            logger.warning(f"Could not load synthetic profiles: {e}")
+            return {}
+
+    async def _save(self, profiles: List[dict], day: date) -> None:
+        if not profiles:
+            return
+        created_at = datetime.utcnow()
+        # $setOnInsert: a worker that lost the race keeps the profile already stored
+        operations = [
+            UpdateOne(
+                {"symbol": profile["symbol"], "trading_day": day.isoformat()},
+                {"$setOnInsert": {**profile, "created_at": created_at}},
+                upsert=True
+            )
+            for profile in profiles
+        ]
+        try:
+            await self.db[SYNTHETIC_PROFILES_COLLECTION].bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Could not store synthetic profiles: {e}")
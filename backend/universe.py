@@ -0,0 +1,133 @@
+"""Process-wide snapshot of the recommendation universe for the Q&A engine.
+
+/investments/ask used to re-read (and silently cap at 100) every
+recommendation per question, then regroup them with list comprehensions
+in each handler. A UniverseSnapshot is loaded once per data version and
+holds:
+
+* the documents themselves (only the fields the handlers read),
+* NumPy columns for the fields handlers filter, count and rank on,
+* precomputed row indexes by recommendation, sector and risk_level,
+* the QuestionClassifier (and its SymbolMatcher) for routing questions and
+  spotting mentioned symbols and names.
+
+Snapshots are immutable. UniverseStore swaps in a new one with a single
+assignment after a version bump, so a request that grabbed the old one
+finishes on a consistent view while the next request sees the new data.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from question_classifier import QuestionClassifier
+
+# Fields the Q&A handlers read from a recommendation
+SNAPSHOT_FIELDS = (
+    "id", "symbol", "name", "asset_type", "current_price", "target_price", "recommendation",
+    "risk_level", "confidence_score", "timeframe", "analyst", "analysis", "key_factors",
+    "sector", "technical_indicators"
+)
+NUMERIC_COLUMNS = ("current_price", "target_price", "confidence_score")
+CATEGORY_COLUMNS = ("symbol", "recommendation", "sector", "risk_level")
+GROUPED_BY = ("recommendation", "sector", "risk_level")
+
+
+class UniverseSnapshot:
+    """Every recommendation at one data version, with columns and group indexes"""
+
+    def __init__(self, investments: List[dict], version: int = 0, generation: int = 0):
+        self.investments = investments
+        self.version = version
+        # Store invalidation count at load time; tells apart snapshots that
+        # share a data version (e.g. reloaded before the version poll caught up)
+        self.generation = generation
+        self.loaded_at = datetime.utcnow()
+        self.classifier = QuestionClassifier(investments)
+        self.matcher = self.classifier.matcher
+        self.by_id = {inv["id"]: inv for inv in investments if inv.get("id")}
+
+        self.columns: Dict[str, np.ndarray] = {}
+        for field in NUMERIC_COLUMNS:
+            self.columns[field] = np.array([inv.get(field) or 0 for inv in investments], dtype=float)
+        for field in CATEGORY_COLUMNS:
+            self.columns[field] = np.array([inv.get(field) for inv in investments], dtype=object)
+
+        # value -> row numbers in universe order; groups keep first-seen order
+        self.groups: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in GROUPED_BY:
+            rows: Dict[str, List[int]] = {}
+            for row, value in enumerate(self.columns[field]):
+                if value:
+                    rows.setdefault(value, []).append(row)
+            self.groups[field] = {value: np.array(members, dtype=int) for value, members in rows.items()}
+
+    def __len__(self) -> int:
+        return len(self.investments)
+
+    def rows(self, field: str, value: str) -> np.ndarray:
+        return self.groups[field].get(value, np.empty(0, dtype=int))
+
+    def count(self, field: str, value: str) -> int:
+        return len(self.rows(field, value))
+
+    def docs(self, rows) -> List[dict]:
+        return [self.investments[row] for row in rows]
+
+    def top(self, rows: np.ndarray, column: str, n: Optional[int] = None) -> np.ndarray:
+        """``rows`` ordered by ``column`` descending; ties keep universe order"""
+        order = np.argsort(-self.columns[column][rows], kind="stable")
+        return rows[order][:n]
+
+    def group_within(self, rows: np.ndarray, field: str) -> Dict[str, np.ndarray]:
+        """Split ``rows`` by ``field``, groups in first-seen order"""
+        values = self.columns[field][rows]
+        groups: Dict[str, List[int]] = {}
+        for row, value in zip(rows.tolist(), values):
+            if value:
+                groups.setdefault(value, []).append(row)
+        return {value: np.array(members, dtype=int) for value, members in groups.items()}
+
+    def stats(self) -> dict:
+        return {"version": self.version, "generation": self.generation, "size": len(self), "loaded_at": self.loaded_at}
+
+
+class UniverseStore:
+    """Holds the current snapshot and reloads it lazily after invalidation"""
+
+    def __init__(self, db, version_source=None):
+        self.db = db
+        # Callable returning the current investment_recommendations data version
+        self.version_source = version_source or (lambda: 0)
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> UniverseSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        async with self._lock:
+            # Another request may have loaded it while we waited
+            if self._snapshot is not None:
+                return self._snapshot
+            generation = self._generation
+            snapshot = await self.load(generation)
+            # Data that changed mid-load is served once but never kept
+            if generation == self._generation:
+                self._snapshot = snapshot
+            return snapshot
+
+    async def load(self, generation: int = 0) -> UniverseSnapshot:
+        version = self.version_source()
+        projection = {"_id": 0, **{field: 1 for field in SNAPSHOT_FIELDS}}
+        investments = await self.db.investment_recommendations.find({}, projection).to_list(None)
+        return UniverseSnapshot(investments, version, generation)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._snapshot = None
+
+    def stats(self) -> Optional[dict]:
+        return self._snapshot.stats() if self._snapshot is not None else None
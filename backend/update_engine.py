@@ -0,0 +1,104 @@
+"""Vectorized bulk update engine shared by the updater scripts.
+
+The updaters used to fetch every document and await one ``update_one`` per
+row. Here a pass loads only the fields it needs into NumPy columns,
+computes every new value in one array operation and commits the result as
+a single ordered ``bulk_write``, so a pass costs two round-trips no matter
+how large the universe is.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+# Shared generator so every updater draws from the same stream
+rng = np.random.default_rng()
+
+
+def _get_path(doc: dict, path: str, default: Any) -> Any:
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return default
+        value = value.get(part)
+    return default if value is None else value
+
+
+class UpdateFrame:
+    """Projected documents held column-wise: one array per requested field"""
+
+    def __init__(self, ids: List[Any], columns: Dict[str, np.ndarray]):
+        self.ids = ids
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    def lookup(self, field: str, mapping: Dict[Any, float], default: float) -> np.ndarray:
+        """Map a categorical column (e.g. risk_level) to numbers"""
+        return np.array([mapping.get(value, default) for value in self.columns[field]], dtype=float)
+
+
+async def load_frame(collection, fields: Dict[str, Any], query: Optional[dict] = None) -> UpdateFrame:
+    """Fetch ``fields`` (dotted paths allowed) for every matching document.
+
+    ``fields`` maps each path to the default used when a document lacks it;
+    numeric defaults produce float columns, anything else an object column.
+    """
+    projection = {path: 1 for path in fields}
+    docs = await collection.find(query or {}, projection).to_list(None)
+
+    ids = [doc["_id"] for doc in docs]
+    columns = {}
+    for path, default in fields.items():
+        values = [_get_path(doc, path, default) for doc in docs]
+        if isinstance(default, (int, float)) and not isinstance(default, bool):
+            columns[path] = np.array(values, dtype=float)
+        else:
+            columns[path] = np.array(values, dtype=object)
+    return UpdateFrame(ids, columns)
+
+
+def apply_price_moves(prices: np.ndarray, change_percent: np.ndarray,
+                      floor: float, cap: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Move prices by ``change_percent`` and clamp to [floor, cap] x old price"""
+    change_amount = prices * (change_percent / 100)
+    new_prices = np.clip(prices + change_amount, prices * floor, prices * cap)
+    return new_prices, change_amount
+
+
+def build_set_ops(ids: List[Any], fields: Dict[str, Any]) -> List[UpdateOne]:
+    """One ``$set`` per document; array values are per-row, scalars shared"""
+    per_row = {}
+    shared = {}
+    for name, value in fields.items():
+        if isinstance(value, np.ndarray):
+            # tolist() turns numpy scalars into BSON-encodable Python types
+            per_row[name] = value.tolist()
+        else:
+            shared[name] = value
+
+    ops = []
+    for i, _id in enumerate(ids):
+        update = dict(shared)
+        for name, column in per_row.items():
+            update[name] = column[i]
+        ops.append(UpdateOne({"_id": _id}, {"$set": update}))
+    return ops
+
+
+async def commit_updates(collection, ops: List[UpdateOne]) -> int:
+    """Write all ops in one ordered bulk_write; returns the modified count"""
+    if not ops:
+        return 0
+    result = await collection.bulk_write(ops, ordered=True)
+    return result.modified_count
+
+
+def staggered_timestamps(now, count: int, hours_apart: int) -> np.ndarray:
+    """``count`` timestamps going back from ``now`` in fixed steps"""
+    steps = np.arange(count) * np.timedelta64(hours_apart, "h")
+    return (np.datetime64(now, "us") - steps).astype("datetime64[us]")
@@ -1,95 +1,87 @@
 import asyncio
-import random
 import uuid
-from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
+from datetime import datetime
+import numpy as np
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from data_versions import bump_data_version
+from database import NewsRepository, RecommendationRepository, close_client, get_database
+from indicator_state import update_indicators
+from jobs import LeaseTimeout, hold_lease
+from market_updates import MARKET_DATA_LEASE
+from price_history import append_ticks
+from update_engine import build_set_ops, commit_updates, load_frame, rng
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
+news_repository = NewsRepository(db)
+
+# Seconds to wait for a refresh in progress elsewhere before giving up
+REFRESH_LEASE_TIMEOUT = 300
 
 async def update_investment_prices():
     """Simulate regular price updates for dynamic market feel"""
     try:
-        # Get all investment recommendations
-        investments = await db.investment_recommendations.find().to_list(1000)
+        # Get all investment recommendations (only the fields the move needs)
+        investments = await load_frame(recommendation_repository.collection, {
+            "symbol": "",
+            "name": "",
+            "asset_type": "stock",
+            "current_price": 0.0,
+            "technical_indicators.volatility": 0.25
+        })
         print(f"Updating prices for {len(investments)} investments...")
         
-        updates_made = 0
-        significant_moves = []
+        asset_type = investments["asset_type"]
+        current_price = investments["current_price"]
+        is_stock = asset_type == "stock"
+        is_index = asset_type == "index"
+        
+        # Different movement ranges by asset type:
+        # stocks -3%..+3% weighted by volatility, indices -1.5%..+1.5%,
+        # commodities -4%..+4% (Bitcoin even more volatile at 6%)
+        max_change = np.where(investments["symbol"] == "BTC-USD", 0.06, 0.04)
+        max_change = np.where(is_index, 0.015, max_change)
+        max_change = np.where(is_stock, 0.03 * (investments["technical_indicators.volatility"] / 0.25), max_change)
+        price_change_percent = rng.uniform(-1.0, 1.0, len(investments)) * max_change
+        
+        # Calculate new price
+        price_change_amount = current_price * price_change_percent
+        new_price = current_price + price_change_amount
+        
+        # Ensure positive prices
+        non_positive = new_price <= 0
+        if non_positive.any():
+            new_price = np.where(non_positive, current_price * 0.95, new_price)
+            price_change_amount = new_price - current_price
+            price_change_percent = np.where(non_positive, price_change_amount / current_price, price_change_percent)
+        
+        # Update every investment in a single bulk write, then record the ticks
+        now = datetime.utcnow()
+        ops = build_set_ops(investments.ids, {
+            "current_price": np.round(new_price, 2),
+            "price_change_24h": np.round(price_change_amount, 2),
+            "price_change_percent": np.round(price_change_percent * 100, 2),
+            "last_updated": now
+        })
+        await commit_updates(recommendation_repository.collection, ops)
+        await append_ticks(db, investments["symbol"], np.round(new_price, 2), now)
+        await update_indicators(db, investments["symbol"], np.round(new_price, 2))
         
-        for investment in investments:
-            # Generate realistic price movements based on asset type and volatility
-            asset_type = investment["asset_type"]
-            current_price = investment["current_price"]
-            volatility = investment.get("technical_indicators", {}).get("volatility", 0.25)
-            
-            # Different movement ranges by asset type
-            if asset_type == "stock":
-                # Stocks: -3% to +3% daily range, weighted by volatility
-                max_change = 0.03 * (volatility / 0.25)
-                price_change_percent = random.uniform(-max_change, max_change)
-            elif asset_type == "index":
-                # Indices: -1.5% to +1.5% daily range (less volatile)
-                price_change_percent = random.uniform(-0.015, 0.015)
-            else:  # commodity
-                # Commodities: -4% to +4% daily range (more volatile)
-                max_change = 0.04
-                if investment["symbol"] == "BTC-USD":
-                    max_change = 0.06  # Bitcoin even more volatile
-                price_change_percent = random.uniform(-max_change, max_change)
-            
-            # Calculate new price
-            price_change_amount = current_price * price_change_percent
-            new_price = current_price + price_change_amount
-            
-            # Ensure positive prices
-            if new_price <= 0:
-                new_price = current_price * 0.95
-                price_change_amount = new_price - current_price
-                price_change_percent = price_change_amount / current_price
-            
-            # Update the investment
-            await db.investment_recommendations.update_one(
-                {"id": investment["id"]},
-                {
-                    "$set": {
-                        "current_price": round(new_price, 2),
-                        "price_change_24h": round(price_change_amount, 2),
-                        "price_change_percent": round(price_change_percent * 100, 2),
-                        "last_updated": datetime.utcnow()
-                    }
-                }
-            )
-            
-            updates_made += 1
-            
-            # Track significant moves (>2% for stocks, >3% for commodities)
-            threshold = 0.02 if asset_type in ["stock", "index"] else 0.03
-            if abs(price_change_percent) > threshold:
-                significant_moves.append({
-                    "symbol": investment["symbol"],
-                    "name": investment["name"],
-                    "change_percent": price_change_percent * 100,
-                    "new_price": new_price
-                })
+        print(f"Successfully updated {len(investments)} investment prices")
         
-        print(f"Successfully updated {updates_made} investment prices")
+        # Track significant moves (>2% for stocks, >3% for commodities)
+        threshold = np.where(is_stock | is_index, 0.02, 0.03)
+        significant = np.flatnonzero(np.abs(price_change_percent) > threshold)
         
         # Show significant moves
-        if significant_moves:
+        if len(significant):
             print(f"\nSignificant price movements:")
-            for move in sorted(significant_moves, key=lambda x: abs(x["change_percent"]), reverse=True)[:10]:
-                direction = "📈" if move["change_percent"] > 0 else "📉"
-                print(f"{direction} {move['symbol']}: {move['change_percent']:+.2f}% (${move['new_price']:.2f})")
+            top_moves = significant[np.argsort(-np.abs(price_change_percent[significant]))][:10]
+            for i in top_moves:
+                change_percent = price_change_percent[i] * 100
+                direction = "📈" if change_percent > 0 else "📉"
+                print(f"{direction} {investments['symbol'][i]}: {change_percent:+.2f}% (${new_price[i]:.2f})")
         
         print(f"\nPrice update completed at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
         
@@ -100,7 +92,7 @@ async def add_market_update_news():
     """Add a market update news article based on current movements"""
     try:
         # Get some recent price movements
-        recent_movers = await db.investment_recommendations.find().sort("last_updated", -1).limit(10).to_list(10)
+        recent_movers = await recommendation_repository.collection.find().sort("last_updated", -1).limit(10).to_list(10)
         
         # Calculate market summary
         positive_moves = len([inv for inv in recent_movers if inv["price_change_percent"] > 0])
@@ -141,8 +133,8 @@ Looking ahead, investors will focus on upcoming economic data releases and corpo
             "read_time": 3
         }
         
-        # Insert the market update
-        await db.news_articles.insert_one(market_update_article)
+        # Insert the market update, linked to the movers it lists
+        await news_repository.insert_tagged([market_update_article])
         print("Added market update news article")
         
     except Exception as e:
@@ -150,10 +142,15 @@ Looking ahead, investors will focus on upcoming economic data releases and corpo
 
 async def main():
     try:
-        await update_investment_prices()
-        await add_market_update_news()
+        # Wait out a refresh already running in the API (or another updater script)
+        async with hold_lease(db, MARKET_DATA_LEASE, timeout=REFRESH_LEASE_TIMEOUT):
+            await update_investment_prices()
+            await add_market_update_news()
+            await bump_data_version(db, "investment_recommendations", "news_articles")
+    except LeaseTimeout:
+        print("⏭️ Another market data refresh is still running; skipped this update")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
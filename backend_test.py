@@ -748,6 +748,278 @@ def test_investment_qa_api(tester):
         print(f"{'✅' if contains_high_risk else '❌'} Mentions HIGH risk")
         print(f"{'✅' if len(mentioned_volatile_stocks) >= 1 else '❌'} Identifies volatile options ({len(mentioned_volatile_stocks)})")
 
+def test_pagination_api(tester):
+    """Test limit, field projection and cursor handling on list endpoints"""
+    print("\n📄 TESTING PAGINATION AND PROJECTION")
+    print("="*50)
+    
+    success, page = tester.run_test(
+        "Get News Page (limit=5, title/summary only)",
+        "GET",
+        "api/news",
+        200,
+        params={"limit": 5, "fields": "id,title,summary"}
+    )
+    
+    if success:
+        only_requested = all(set(article.keys()) <= {"id", "title", "summary"} for article in page)
+        print(f"{'✅' if len(page) <= 5 else '❌'} Page size respected ({len(page)})")
+        print(f"{'✅' if only_requested else '❌'} Only requested fields returned")
+    
+    success, page = tester.run_test(
+        "Get Investments Page (limit=10)",
+        "GET",
+        "api/investments",
+        200,
+        params={"limit": 10}
+    )
+    
+    if success:
+        print(f"{'✅' if len(page) <= 10 else '❌'} Page size respected ({len(page)})")
+    
+    tester.run_test(
+        "Reject Unknown Projection Field",
+        "GET",
+        "api/investments",
+        400,
+        params={"fields": "symbol,not_a_field"}
+    )
+    
+    tester.run_test(
+        "Reject Invalid Cursor",
+        "GET",
+        "api/news",
+        400,
+        params={"cursor": "not-a-cursor"}
+    )
+
+def test_price_history_api(tester):
+    """Test the bucketed price history endpoint"""
+    print("\n📈 TESTING PRICE HISTORY")
+    print("="*50)
+    
+    success, history = tester.run_test(
+        "Get AAPL Price History (5m candles)",
+        "GET",
+        "api/investments/AAPL/history",
+        200,
+        params={"resolution": "5m"}
+    )
+    
+    if success:
+        points = history.get("points", [])
+        ordered = all(a["timestamp"] <= b["timestamp"] for a, b in zip(points, points[1:]))
+        consistent = all(p["low"] <= min(p["open"], p["close"]) and p["high"] >= max(p["open"], p["close"]) for p in points)
+        print(f"   Candles returned: {len(points)}")
+        print(f"{'✅' if ordered else '❌'} Candles in time order")
+        print(f"{'✅' if consistent else '❌'} High/low bracket open/close")
+    
+    tester.run_test(
+        "Reject Unknown Resolution",
+        "GET",
+        "api/investments/AAPL/history",
+        400,
+        params={"resolution": "7m"}
+    )
+
+def test_answer_cache(tester):
+    """Test that repeated Q&A questions are served from the answer cache"""
+    print("\n🗂️ TESTING Q&A ANSWER CACHE")
+    print("="*50)
+    
+    question = {"question": "What's the market outlook?", "user_id": "test_user"}
+    success, first = tester.run_test("Ask market outlook (first)", "POST", "api/investments/ask", 200, data=question)
+    success_again, second = tester.run_test("Ask market outlook (repeat)", "POST", "api/investments/ask", 200, data=question)
+    
+    if success and success_again:
+        print(f"{'✅' if first['answer'] == second['answer'] else '❌'} Repeated question gets the same answer")
+    
+    # run_test() does not expose headers, so check the cache header directly
+    response = requests.post(f"{tester.base_url}/api/investments/ask", json=question)
+    cache_status = response.headers.get("X-Answer-Cache")
+    print(f"{'✅' if cache_status == 'HIT' else '❌'} X-Answer-Cache header reports a hit ({cache_status})")
+
+def test_batch_qa_api(tester):
+    """Test answering several questions in one request"""
+    print("\n📦 TESTING BATCH Q&A")
+    print("="*50)
+    
+    questions = [
+        {"question": "Should I buy AAPL?"},
+        {"question": "What's the market outlook?"},
+        {"question": "Should I buy AAPL?"}
+    ]
+    success, answers = tester.run_test("Ask a batch of questions", "POST", "api/investments/ask/batch", 200, data=questions)
+    
+    if success:
+        in_order = [answer["question"] for answer in answers] == [q["question"] for q in questions]
+        print(f"{'✅' if len(answers) == len(questions) else '❌'} One answer per question ({len(answers)})")
+        print(f"{'✅' if in_order else '❌'} Answers returned in request order")
+        print(f"{'✅' if answers[0]['answer'] == answers[2]['answer'] else '❌'} Repeated question answered consistently")
+    
+    tester.run_test("Reject Empty Batch", "POST", "api/investments/ask/batch", 422, data=[])
+
+def test_conditional_get(tester):
+    """Test ETag/Last-Modified validators and 304 responses on read routes"""
+    print("\n🏷️ TESTING CONDITIONAL GET")
+    print("="*50)
+    
+    # run_test() does not expose headers or send conditional ones, so use requests directly
+    for endpoint in ["api/investments", "api/news", "api/investments/summary"]:
+        url = f"{tester.base_url}/{endpoint}"
+        response = requests.get(url)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag:
+            print(f"⚠️ {endpoint}: no ETag yet (no data version recorded; run an update script)")
+            continue
+        
+        revalidated = requests.get(url, headers={"If-None-Match": etag})
+        print(f"{'✅' if revalidated.status_code == 304 and not revalidated.content else '❌'} {endpoint}: If-None-Match answered with an empty 304 ({revalidated.status_code})")
+        print(f"{'✅' if revalidated.headers.get('ETag') == etag else '❌'} {endpoint}: 304 repeats the ETag")
+        
+        if last_modified:
+            since = requests.get(url, headers={"If-Modified-Since": last_modified})
+            print(f"{'✅' if since.status_code == 304 else '❌'} {endpoint}: If-Modified-Since answered with 304 ({since.status_code})")
+        
+        stale = requests.get(url, headers={"If-None-Match": '"stale-tag"'})
+        print(f"{'✅' if stale.status_code == 200 else '❌'} {endpoint}: stale ETag gets the full body ({stale.status_code})")
+    
+    first_page = requests.get(f"{tester.base_url}/api/investments", params={"limit": 5}).headers.get("ETag")
+    full_page = requests.get(f"{tester.base_url}/api/investments").headers.get("ETag")
+    if first_page and full_page:
+        print(f"{'✅' if first_page != full_page else '❌'} Different query strings get different ETags")
+
+def test_status_checks(tester):
+    """Test that a status check written through the repository reads back"""
+    print("\n📋 TESTING STATUS CHECKS")
+    print("="*50)
+    
+    client_name = f"backend_test-{datetime.utcnow():%Y%m%d%H%M%S}"
+    success, created = tester.run_test("Create Status Check", "POST", "api/status", 200, data={"client_name": client_name})
+    
+    if success:
+        success, checks = tester.run_test("Get Status Checks", "GET", "api/status", 200)
+        if success:
+            stored = [check for check in checks if check["id"] == created["id"]]
+            print(f"{'✅' if stored and stored[0]['client_name'] == client_name else '❌'} Created status check is listed")
+    
+    tester.run_test("Create Status Check Without Name", "POST", "api/status", 422, data={})
+
+def test_response_compression(tester):
+    """Test gzip negotiation and ETag'd compressed variants"""
+    print("\n🗜️ TESTING RESPONSE COMPRESSION")
+    print("="*50)
+    
+    url = f"{tester.base_url}/api/news"
+    plain = requests.get(url, headers={"Accept-Encoding": "identity"})
+    compressed = requests.get(url, headers={"Accept-Encoding": "gzip"})
+    encoding = compressed.headers.get("Content-Encoding")
+    print(f"{'✅' if encoding == 'gzip' else '❌'} News list gzipped when accepted ({encoding})")
+    print(f"{'✅' if plain.headers.get('Content-Encoding') is None else '❌'} Identity requested, identity served")
+    print(f"{'✅' if compressed.json() == plain.json() else '❌'} Decompressed body matches the identity body")
+    print(f"{'✅' if 'accept-encoding' in compressed.headers.get('Vary', '').lower() else '❌'} Vary: Accept-Encoding set")
+    
+    etag = compressed.headers.get("ETag")
+    if etag:
+        print(f"{'✅' if etag != plain.headers.get('ETag') else '❌'} Compressed variant has its own ETag ({etag})")
+        revalidated = requests.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        print(f"{'✅' if revalidated.status_code == 304 else '❌'} Compressed variant revalidates with 304 ({revalidated.status_code})")
+    
+    small = requests.get(f"{tester.base_url}/api/investments/summary", headers={"Accept-Encoding": "gzip"})
+    print(f"{'✅' if small.headers.get('Content-Encoding') is None else '❌'} Small summary body left uncompressed")
+
+def test_related_news_api(tester):
+    """Test news linked to an investment through its symbols"""
+    print("\n🔗 TESTING RELATED NEWS")
+    print("="*50)
+    
+    success, investments = tester.run_test("Get Investments Page (limit=20)", "GET", "api/investments", 200, params={"limit": 20})
+    
+    if success and investments:
+        inv = investments[0]
+        success, articles = tester.run_test(
+            f"Get News About {inv['symbol']}",
+            "GET",
+            f"api/investments/{inv['id']}/news",
+            200
+        )
+        if success:
+            linked = all(inv["symbol"] in article["symbols"] for article in articles)
+            newest_first = all(a["publish_date"] >= b["publish_date"] for a, b in zip(articles, articles[1:]))
+            print(f"   Articles mentioning {inv['symbol']}: {len(articles)}")
+            print(f"{'✅' if linked else '❌'} Every article is linked to {inv['symbol']}")
+            print(f"{'✅' if newest_first else '❌'} Newest articles first")
+    
+    tester.run_test("Get News About Unknown Investment", "GET", "api/investments/invalid-id-12345/news", 404)
+
+def test_news_browse_api(tester):
+    """Test faceted news browsing"""
+    print("\n🗃️ TESTING NEWS BROWSE")
+    print("="*50)
+    
+    success, page = tester.run_test(
+        "Browse News (limit=5)",
+        "GET",
+        "api/news/browse",
+        200,
+        params={"limit": 5}
+    )
+    
+    if success:
+        facets = page.get("facets", {})
+        print(f"{'✅' if len(page.get('articles', [])) <= 5 else '❌'} Page size respected ({len(page.get('articles', []))})")
+        print(f"{'✅' if set(facets) == {'category', 'tags', 'author', 'month'} else '❌'} All facets returned")
+        
+        if facets.get("category"):
+            facet = facets["category"][0]
+            success, filtered = tester.run_test(
+                f"Browse News in {facet['value']}",
+                "GET",
+                "api/news/browse",
+                200,
+                params={"category": facet["value"]}
+            )
+            if success:
+                same_category = all(a["category"] == facet["value"] for a in filtered["articles"])
+                print(f"{'✅' if same_category else '❌'} Every article in the chosen category")
+                print(f"{'✅' if filtered['facets']['category'] == [facet] else '❌'} Category facet narrowed to the filter")
+    
+    tester.run_test("Reject Malformed Month", "GET", "api/news/browse", 400, params={"month": "2024-13"})
+
+def test_news_search_api(tester):
+    """Test ranked full-text news search"""
+    print("\n🔎 TESTING NEWS SEARCH")
+    print("="*50)
+    
+    success, hits = tester.run_test(
+        "Search News for 'rates'",
+        "GET",
+        "api/news/search",
+        200,
+        params={"q": "rates", "limit": 5}
+    )
+    
+    if success:
+        ranked = all(a["score"] >= b["score"] for a, b in zip(hits, hits[1:]))
+        print(f"{'✅' if len(hits) <= 5 else '❌'} Page size respected ({len(hits)})")
+        print(f"{'✅' if ranked else '❌'} Hits ordered by score")
+        print(f"{'✅' if all('snippet' in hit for hit in hits) else '❌'} Every hit has a snippet")
+        
+        if hits and hits[0]["tags"]:
+            tag = hits[0]["tags"][0]
+            success, tagged = tester.run_test(
+                f"Search News for 'rates' tagged {tag}",
+                "GET",
+                "api/news/search",
+                200,
+                params={"q": "rates", "tags": tag}
+            )
+            if success:
+                print(f"{'✅' if all(tag in hit['tags'] for hit in tagged) else '❌'} Every hit carries the tag")
+    
+    tester.run_test("Reject Blank Search", "GET", "api/news/search", 400, params={"q": " "})
+
 def main():
     # Get the backend URL from the frontend .env file
     backend_url = "https://f331cb83-b6cd-4e1b-a4a7-993eac227251.preview.emergentagent.com"
@@ -781,6 +1053,36 @@ def main():
     # Test the Investment Q&A API endpoints with expanded stock coverage
     test_investment_qa_api(tester)
     
+    # Test pagination and projection on the list endpoints
+    test_pagination_api(tester)
+    
+    # Test the price history endpoint
+    test_price_history_api(tester)
+    
+    # Test the Q&A answer cache
+    test_answer_cache(tester)
+    
+    # Test the batch Q&A endpoint
+    test_batch_qa_api(tester)
+    
+    # Test full-text news search
+    test_news_search_api(tester)
+    
+    # Test faceted news browsing
+    test_news_browse_api(tester)
+    
+    # Test news linked to investments
+    test_related_news_api(tester)
+    
+    # Test ETags and 304 responses
+    test_conditional_get(tester)
+    
+    # Test response compression
+    test_response_compression(tester)
+    
+    # Test status checks
+    test_status_checks(tester)
+    
     # Print summary of all tests
     tester.print_summary()
     
@@ -1,27 +1,22 @@
 import asyncio
 import sys
-import os
 import random
+from pathlib import Path
 
 # Add the backend directory to the path
-sys.path.append('/app/backend')
+sys.path.append(str(Path(__file__).resolve().parent / "backend"))
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
+from database import RecommendationRepository, close_client, get_database
 
-# Load environment variables
-load_dotenv('/app/backend/.env')
-
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see backend/database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 async def balance_recommendations():
     """Convert some HOLD recommendations to SELL for better balance"""
     
     # Get all HOLD recommendations
-    hold_recs = await db.investment_recommendations.find({"recommendation": "HOLD"}).to_list(1000)
+    hold_recs = await recommendation_repository.list_by_recommendation("HOLD")
     
     # Convert 3-4 HOLD to SELL
     sell_candidates = random.sample(hold_recs, min(4, len(hold_recs)))
@@ -34,32 +29,22 @@ async def balance_recommendations():
         new_confidence = random.randint(55, 70)
         
         # Update to SELL with appropriate reasoning
-        await db.investment_recommendations.update_one(
-            {"id": rec["id"]},
-            {
-                "$set": {
-                    "recommendation": "SELL",
-                    "target_price": round(new_target, 2),
-                    "confidence_score": new_confidence,
-                    "analysis": rec["analysis"] + " However, current valuation appears stretched and near-term headwinds may pressure performance."
-                }
-            }
-        )
+        await recommendation_repository.update_fields(rec["id"], {
+            "recommendation": "SELL",
+            "target_price": round(new_target, 2),
+            "confidence_score": new_confidence,
+            "analysis": rec["analysis"] + " However, current valuation appears stretched and near-term headwinds may pressure performance."
+        })
         print(f"✅ Updated {rec['symbol']} to SELL recommendation")
 
 async def main():
     try:
         await balance_recommendations()
+        # Tell the API its cached responses are stale
+        await recommendation_repository.mark_changed()
         
         # Get final summary
-        summary = await db.investment_recommendations.aggregate([
-            {
-                "$group": {
-                    "_id": "$recommendation",
-                    "count": {"$sum": 1}
-                }
-            }
-        ]).to_list(10)
+        summary = await recommendation_repository.count_by("recommendation", limit=10)
         
         print("\n📊 Final recommendation distribution:")
         for item in summary:
@@ -68,7 +53,7 @@ async def main():
     except Exception as e:
         print(f"❌ Error: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""Benchmark the price updater: per-document update_one vs one bulk_write.
+
+Seeds universes of increasing size in a scratch database and times a full
+price-update pass with both strategies. Usage:
+
+    python benchmarks/bench_bulk_updates.py --sizes 100 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+import numpy as np
+
+load_dotenv(BACKEND_DIR / '.env')
+
+from database import close_client, get_client
+from update_engine import apply_price_moves, build_set_ops, commit_updates, load_frame, rng
+
+
+async def seed(collection, size: int):
+    await collection.delete_many({})
+    docs = [{
+        "id": str(uuid.uuid4()),
+        "symbol": f"S{i}",
+        "current_price": round(random.uniform(5, 500), 2),
+        "risk_level": random.choice(["LOW", "MEDIUM", "HIGH"]),
+        "analysis": "x" * 500,
+        "key_factors": ["factor"] * 5
+    } for i in range(size)]
+    await collection.insert_many(docs)
+
+
+async def per_document_pass(collection):
+    """The original loop: full documents, one awaited update_one each"""
+    for rec in await collection.find().to_list(None):
+        change = random.uniform(-3.0, 3.0)
+        await collection.update_one({"id": rec["id"]}, {"$set": {
+            "current_price": round(rec["current_price"] * (1 + change / 100), 2),
+            "price_change_percent": round(change, 2),
+            "last_updated": datetime.utcnow()
+        }})
+
+
+async def bulk_pass(collection):
+    frame = await load_frame(collection, {"current_price": 0.0})
+    change = rng.uniform(-3.0, 3.0, len(frame))
+    new_prices, _ = apply_price_moves(frame["current_price"], change, floor=0.5, cap=2.0)
+    await commit_updates(collection, build_set_ops(frame.ids, {
+        "current_price": np.round(new_prices, 2),
+        "price_change_percent": np.round(change, 2),
+        "last_updated": datetime.utcnow()
+    }))
+
+
+async def timed(strategy, collection) -> float:
+    start = time.perf_counter()
+    await strategy(collection)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    client = get_client()
+    db = client[f"{os.environ['DB_NAME']}_bench"]
+    collection = db.investment_recommendations
+
+    try:
+        print(f"{'universe':>10} {'update_one loop':>18} {'bulk_write':>12}")
+        for size in args.sizes:
+            await seed(collection, size)
+            loop_ms = await timed(per_document_pass, collection)
+            bulk_ms = await timed(bulk_pass, collection)
+            print(f"{size:>10} {loop_ms:>15.1f} ms {bulk_ms:>9.1f} ms")
+    finally:
+        await client.drop_database(db.name)
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
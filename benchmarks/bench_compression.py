@@ -0,0 +1,96 @@
+"""Benchmark response compression: bytes on the wire and CPU per level.
+
+Pure CPU, no database: encodes pages of synthetic recommendations and
+articles (full markdown content) exactly as the list routes do, then for
+gzip and brotli at a range of levels reports, per response,
+
+* bytes:  compressed size, and the ratio to the identity body,
+* cpu:    best-of-three process CPU to compress it,
+* decode: CPU a client spends decompressing it.
+
+``*`` marks the levels compression.py uses on the fly and for cached
+variants; a cached variant costs one cache lookup after the first
+request per data version. Every output is checked to round-trip first.
+Usage:
+
+    python benchmarks/bench_compression.py --rows 20 100 --rounds 20
+"""
+import argparse
+import gzip
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+
+load_dotenv(BACKEND_DIR / '.env')
+
+import compression
+from load_test import make_investments, make_news
+from server import investment_encoder, news_encoder
+
+GZIP_LEVELS = (1, 4, 6, 9)
+BROTLI_QUALITIES = (1, 4, 5, 8, 9, 11)
+
+
+def codecs():
+    """(label, compress, decompress, in use) for every level measured"""
+    in_use = {
+        ("gzip", compression.GZIP_LEVEL), ("gzip", compression.CACHED_GZIP_LEVEL),
+        ("br", compression.BROTLI_QUALITY), ("br", compression.CACHED_BROTLI_QUALITY)
+    }
+    for level in GZIP_LEVELS:
+        yield (f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0),
+               gzip.decompress, ("gzip", level) in in_use)
+    if compression.brotli is None:
+        return
+    for quality in BROTLI_QUALITIES:
+        yield (f"br-{quality}", lambda body, quality=quality: compression.brotli.compress(body, quality=quality),
+               compression.brotli.decompress, ("br", quality) in in_use)
+
+
+def cpu_per_call(run, rounds: int) -> float:
+    """Best-of-three process CPU seconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.process_time()
+        for _ in range(rounds):
+            run()
+        best = min(best, (time.process_time() - start) / rounds)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    if compression.brotli is None:
+        print("brotli is not installed; only gzip is measured")
+
+    print(f"{'page':<16} {'codec':<8} {'bytes':>9} {'ratio':>7} {'cpu':>10} {'decode':>10}")
+    for rows in args.rows:
+        pages = [
+            (f"investments/{rows}", investment_encoder.encode_many(make_investments(rows))),
+            (f"news/{rows}", news_encoder.encode_many(make_news(rows)))
+        ]
+        for name, body in pages:
+            print(f"{name:<16} {'identity':<8} {len(body):>9} {1:>6.1f}x")
+            for label, compress, decompress, in_use in codecs():
+                compressed = compress(body)
+                if decompress(compressed) != body:
+                    raise SystemExit(f"{name}/{label}: output does not round-trip")
+                seconds = cpu_per_call(lambda: compress(body), args.rounds)
+                decode = cpu_per_call(lambda: decompress(compressed), args.rounds)
+                print(f"{name:<16} {label + ('*' if in_use else ''):<8} {len(compressed):>9} "
+                      f"{len(body) / len(compressed):>6.1f}x {seconds * 1000:>7.2f} ms {decode * 1000:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark GET /api/investments/summary: seven count_documents vs one $facet.
+
+Seeds a scratch database on the configured MongoDB, times both strategies
+and prints latency percentiles. Usage:
+
+    python benchmarks/bench_investment_summary.py --docs 10000 --rounds 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+
+load_dotenv(BACKEND_DIR / '.env')
+
+from database import close_client, get_client
+from server import INVESTMENT_SUMMARY_PIPELINE, build_investment_summary
+
+
+async def seed(collection, docs: int):
+    await collection.delete_many({})
+    batch = []
+    for _ in range(docs):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "symbol": uuid.uuid4().hex[:4].upper(),
+            "asset_type": random.choice(["stock", "stock", "stock", "index", "commodity"]),
+            "recommendation": random.choice(["BUY", "BUY", "HOLD", "SELL"]),
+            "current_price": round(random.uniform(5, 500), 2),
+        })
+        if len(batch) == 1000:
+            await collection.insert_many(batch)
+            batch = []
+    if batch:
+        await collection.insert_many(batch)
+
+
+async def summary_seven_counts(collection) -> dict:
+    """The pre-$facet implementation, kept here as the baseline"""
+    return {
+        "total_recommendations": await collection.count_documents({}),
+        "recommendations_by_type": {
+            "BUY": await collection.count_documents({"recommendation": "BUY"}),
+            "HOLD": await collection.count_documents({"recommendation": "HOLD"}),
+            "SELL": await collection.count_documents({"recommendation": "SELL"})
+        },
+        "assets_by_type": {
+            "stocks": await collection.count_documents({"asset_type": "stock"}),
+            "indices": await collection.count_documents({"asset_type": "index"}),
+            "commodities": await collection.count_documents({"asset_type": "commodity"})
+        }
+    }
+
+
+async def summary_facet(collection) -> dict:
+    results = await collection.aggregate(INVESTMENT_SUMMARY_PIPELINE).to_list(1)
+    return build_investment_summary(results[0] if results else {})
+
+
+async def time_strategy(strategy, collection, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await strategy(collection)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list):
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<14} mean {statistics.mean(ordered):7.2f} ms   "
+          f"p50 {statistics.median(ordered):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    client = get_client()
+    db = client[f"{os.environ['DB_NAME']}_bench"]
+    collection = db.investment_recommendations
+
+    try:
+        print(f"Seeding {args.docs} recommendations...")
+        await seed(collection, args.docs)
+
+        assert await summary_seven_counts(collection) == await summary_facet(collection)
+
+        report("seven counts", await time_strategy(summary_seven_counts, collection, args.rounds))
+        report("$facet", await time_strategy(summary_facet, collection, args.rounds))
+    finally:
+        await client.drop_database(db.name)
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
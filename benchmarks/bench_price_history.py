@@ -0,0 +1,94 @@
+"""Benchmark price-history storage: one document per tick vs bucketed ticks.
+
+Writes the same tick stream (symbols x update passes, one minute apart)
+into a scratch database with both layouts, then reads one symbol's last
+day back. Reports write time, documents stored and range-read time. Usage:
+
+    python benchmarks/bench_price_history.py --symbols 500 --passes 1440
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+import numpy as np
+from pymongo import ASCENDING, InsertOne
+
+load_dotenv(BACKEND_DIR / '.env')
+
+from database import close_client, get_client
+from indexes import INDEXES
+from price_history import PRICE_HISTORY_COLLECTION, append_ticks, load_history
+
+
+async def write_per_tick(collection, symbols, prices, timestamp):
+    await collection.bulk_write([
+        InsertOne({"symbol": symbol, "t": timestamp, "p": price})
+        for symbol, price in zip(symbols.tolist(), prices.tolist())
+    ], ordered=False)
+
+
+async def read_per_tick(collection, symbol, start, end):
+    docs = await collection.find({"symbol": symbol, "t": {"$gte": start, "$lte": end}}).sort("t", 1).to_list(None)
+    return len(docs)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--passes", type=int, default=1440, help="update passes (ticks per symbol)")
+    args = parser.parse_args()
+
+    client = get_client()
+    db = client[f"{os.environ['DB_NAME']}_bench"]
+    per_tick = db.price_ticks
+    await per_tick.create_index([("symbol", ASCENDING), ("t", ASCENDING)])
+    await db[PRICE_HISTORY_COLLECTION].create_indexes(INDEXES[PRICE_HISTORY_COLLECTION])
+
+    symbols = np.array([f"S{i}" for i in range(args.symbols)])
+    prices = np.full(args.symbols, 100.0)
+    start = datetime.utcnow() - timedelta(minutes=args.passes)
+    rng = np.random.default_rng(7)
+
+    try:
+        per_tick_ms = bucket_ms = 0.0
+        for n in range(args.passes):
+            prices = np.round(prices * (1 + rng.normal(0, 0.002, args.symbols)), 2)
+            timestamp = start + timedelta(minutes=n)
+
+            t0 = time.perf_counter()
+            await write_per_tick(per_tick, symbols, prices, timestamp)
+            t1 = time.perf_counter()
+            await append_ticks(db, symbols, prices, timestamp)
+            t2 = time.perf_counter()
+            per_tick_ms += (t1 - t0) * 1000
+            bucket_ms += (t2 - t1) * 1000
+
+        end = start + timedelta(minutes=args.passes)
+        t0 = time.perf_counter()
+        per_tick_points = await read_per_tick(per_tick, "S0", start, end)
+        t1 = time.perf_counter()
+        times, _ = await load_history(db, "S0", start, end)
+        t2 = time.perf_counter()
+
+        ticks = args.symbols * args.passes
+        print(f"{ticks} ticks ({args.symbols} symbols x {args.passes} passes)")
+        print(f"{'layout':>12} {'write':>12} {'documents':>10} {'read S0':>10} {'points':>7}")
+        print(f"{'per-tick':>12} {per_tick_ms:>9.1f} ms {await per_tick.count_documents({}):>10} "
+              f"{(t1 - t0) * 1000:>7.1f} ms {per_tick_points:>7}")
+        print(f"{'bucketed':>12} {bucket_ms:>9.1f} ms {await db[PRICE_HISTORY_COLLECTION].count_documents({}):>10} "
+              f"{(t2 - t1) * 1000:>7.1f} ms {len(times):>7}")
+    finally:
+        await client.drop_database(db.name)
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
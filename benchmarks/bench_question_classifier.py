@@ -0,0 +1,181 @@
+"""Benchmark Q&A routing: keyword chains + per-call regexes vs the compiled classifier.
+
+Pure CPU, no database: builds a synthetic universe and a corpus of
+real-looking questions (known symbols and names, unknown tickers, "$SYM"
+and "SYM." forms, sector/risk/price wording, chit-chat), checks that
+QuestionClassifier routes every one of them exactly as the previous code
+did (unknown tickers compared as a set, as the original returned them),
+then times both. Usage:
+
+    python benchmarks/bench_question_classifier.py --questions 100000 --universe 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Hashable, List, Set, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from load_test import make_investments
+from question_classifier import QuestionClassifier
+from symbol_matcher import SymbolMatcher
+
+TEMPLATES = [
+    "Should I buy {symbol}?", "should i buy {symbol} now or wait", "Is {name} a good investment?",
+    "Do you recommend {symbol} for a long-term hold?", "What's the price target for {symbol}?",
+    "{symbol} target price next year", "price prediction for ${symbol}", "How risky is {symbol}?",
+    "is {name} safe for retirement money", "Why is {symbol} so volatile lately?",
+    "How is the technology sector doing?", "best healthcare stocks in your coverage",
+    "Which industry looks strongest?", "any financial names you like?",
+    "How should I diversify my portfolio?", "what allocation do you suggest for a 30 year old",
+    "What's the market outlook?", "how is the economy affecting stocks", "current market trend",
+    "What are your top picks?", "tell me about {name}", "thoughts on {symbol}.", "hello", "thanks!",
+    "Should I buy {unknown}?", "what about ${unknown} and {symbol}", "is {unknown} risky",
+    "compare {symbol} with {unknown}.", "{unknown} price target", "What are the safest large-cap stocks?",
+    "Show me high-growth opportunities", "Most volatile stocks in your coverage?",
+    "I have 10k to invest, what sector and how much risk?", "tech or healthcare for 2025?",
+]
+
+
+def make_questions(count: int, investments: List[dict], rng: random.Random) -> List[str]:
+    questions = []
+    for _ in range(count):
+        inv = rng.choice(investments)
+        unknown = "".join(rng.choice("QXZJVW") for _ in range(rng.randint(3, 4)))
+        question = rng.choice(TEMPLATES).format(symbol=inv["symbol"], name=inv["name"], unknown=unknown)
+        questions.append(question.upper() if rng.random() < 0.05 else question)
+    return questions
+
+
+# --- Previous routing, copied verbatim for comparison --------------------
+# extract_stock_symbols as originally written in server.py; classify_question
+# and the automaton scan as they stood before the compiled classifier
+
+def legacy_extract_stock_symbols(question: str) -> List[str]:
+    """Extract potential stock symbols from question"""
+    import re
+    
+    # Common patterns for stock symbols in questions
+    patterns = [
+        r'\b([A-Z]{1,5})\b',  # 1-5 uppercase letters
+        r'\$([A-Z]{1,5})\b',  # Dollar sign prefix
+        r'\b([A-Z]{1,5})\.', # Symbol with period
+    ]
+    
+    symbols = []
+    for pattern in patterns:
+        matches = re.findall(pattern, question.upper())
+        symbols.extend(matches)
+    
+    # Filter out common words that aren't stock symbols
+    excluded_words = {
+        'THE', 'AND', 'FOR', 'ARE', 'BUT', 'NOT', 'YOU', 'ALL', 'CAN', 'HAD', 'HER', 'WAS', 'ONE', 'OUR', 'OUT', 'DAY', 'GET', 'HAS', 'HIM', 'HIS', 'HOW', 'ITS', 'NEW', 'NOW', 'OLD', 'SEE', 'TWO', 'WHO', 'BOY', 'DID', 'ITS', 'LET', 'PUT', 'SAY', 'SHE', 'TOO', 'USE', 'BUY', 'SELL', 'HOLD', 'STOCK', 'PRICE', 'WHAT', 'WHEN', 'WHERE', 'WHY', 'WILL', 'WITH', 'GOOD', 'BEST', 'HIGH', 'LOW', 'TOP', 'BAD', 'BIG', 'LONG', 'SHORT', 'RISK', 'SAFE'
+    }
+    
+    valid_symbols = [sym for sym in symbols if sym not in excluded_words and len(sym) >= 2 and len(sym) <= 5]
+    return list(set(valid_symbols))  # Remove duplicates
+
+
+def legacy_search(self, text: str) -> Set[Hashable]:
+    """Keys of every pattern occurring anywhere in ``text``"""
+    goto = self._goto
+    fail = self._fail
+    output = self._output
+    found: Set[Hashable] = set()
+    node = 0
+    for char in text:
+        while node and char not in goto[node]:
+            node = fail[node]
+        node = goto[node].get(char, 0)
+        if output[node]:
+            found |= output[node]
+    return found
+
+
+class LegacySymbolMatcher(SymbolMatcher):
+    def find_mentions(self, question_lower: str) -> List[dict]:
+        """Investments whose symbol or name appears in the question, in universe order"""
+        return [self.investments[position] for position in sorted(legacy_search(self._automaton, question_lower))]
+
+
+def legacy_classify_question(question: str, investments) -> Tuple[str, List[dict], List[str]]:
+    """Intent, mentioned investments and unknown tickers for a lower-cased question"""
+    # Check if question mentions specific symbols (single pass over the question)
+    matcher = investments.matcher
+    symbols_mentioned = matcher.find_mentions(question)
+    
+    # Check for stock symbols not in our database (real-time analysis)
+    potential_symbols = legacy_extract_stock_symbols(question)
+    unknown_symbols = [sym for sym in potential_symbols if not matcher.is_known_symbol(sym)]
+    
+    if unknown_symbols:
+        return "realtime", symbols_mentioned, unknown_symbols
+    
+    # Question pattern matching for known stocks
+    if any(word in question for word in ["should i buy", "recommend", "good investment"]):
+        intent = "recommendation"
+    elif any(word in question for word in ["price target", "target price", "price prediction"]):
+        intent = "price"
+    elif any(word in question for word in ["risk", "risky", "safe", "volatile"]):
+        intent = "risk"
+    elif any(word in question for word in ["sector", "industry", "technology", "healthcare", "financial"]):
+        intent = "sector"
+    elif any(word in question for word in ["portfolio", "diversification", "allocation"]):
+        intent = "portfolio"
+    elif any(word in question for word in ["market", "economy", "outlook", "trend"]):
+        intent = "market"
+    else:
+        intent = "general"
+    return intent, symbols_mentioned, unknown_symbols
+
+
+def time_per_question(strategies: dict, questions: List[str], repeats: int = 5) -> dict:
+    """Best seconds per question for each strategy; rounds alternate so both see the same machine load"""
+    best = {label: float("inf") for label in strategies}
+    for _ in range(repeats):
+        for label, classify in strategies.items():
+            start = time.perf_counter()
+            for question in questions:
+                classify(question)
+            best[label] = min(best[label], (time.perf_counter() - start) / len(questions))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--universe", type=int, default=500)
+    args = parser.parse_args()
+
+    random.seed(7)
+    investments = make_investments(args.universe)
+    questions = [question.lower() for question in make_questions(args.questions, investments, random.Random(7))]
+
+    legacy_snapshot = SimpleNamespace(matcher=LegacySymbolMatcher(investments))
+    classifier = QuestionClassifier(investments)
+
+    for question in questions:
+        intent, mentions, unknown = legacy_classify_question(question, legacy_snapshot)
+        parsed = classifier.classify(question)
+        # The original de-duplicated tickers through a set, so only which ones were found is comparable
+        if (parsed.intent, parsed.mentions, sorted(parsed.unknown_symbols)) != (intent, mentions, sorted(unknown)):
+            raise SystemExit(f"Routing differs for {question!r}: {parsed.intent} vs {intent}")
+
+    timings = time_per_question({
+        "legacy": lambda question: legacy_classify_question(question, legacy_snapshot),
+        "compiled": classifier.classify
+    }, questions)
+    legacy, compiled = timings["legacy"], timings["compiled"]
+    print(f"{len(questions)} questions, {args.universe} investments; routing identical")
+    print(f"{'strategy':<10} {'per question':>13} {'questions/s':>12}")
+    for label, seconds in (("legacy", legacy), ("compiled", compiled)):
+        print(f"{label:<10} {seconds * 1e6:>10.2f} us {1 / seconds:>12,.0f}")
+    print(f"speedup    {legacy / compiled:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
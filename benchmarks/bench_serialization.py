@@ -0,0 +1,117 @@
+"""Benchmark response serialization for list routes: response models vs DocumentEncoder.
+
+Pure CPU, no database: builds pages of synthetic recommendations and
+articles and times, per request,
+
+* models:  Model(**doc) per document, FastAPI's response_model validation
+           and JSONResponse rendering (the previous path),
+* encoder: DocumentEncoder.encode_many() with orjson (a cache miss),
+* stdlib:  the same encoder with orjson unavailable,
+* cached:  wrapping already-encoded bytes in a Response (a cache hit).
+
+Every strategy's bytes are checked against the models path first. Usage:
+
+    python benchmarks/bench_serialization.py --rows 1000 --rounds 50
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+
+load_dotenv(BACKEND_DIR / '.env')
+
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import serialization
+from load_test import make_investments, make_news
+from server import InvestmentRecommendationResponse, NewsArticleResponse, investment_encoder, news_encoder
+
+
+def models_path(model, field):
+    def render(docs):
+        content = [model(**doc) for doc in docs]
+        body = asyncio.run(serialize_response(field=field, response_content=content))
+        return JSONResponse(body).body
+    return render
+
+
+def encoder_path(encoder):
+    def render(docs):
+        return Response(content=encoder.encode_many(docs), media_type=serialization.JSON_MEDIA_TYPE).body
+    return render
+
+
+def stdlib_path(encoder):
+    def render(docs):
+        orjson, serialization.orjson = serialization.orjson, None
+        try:
+            return encoder_path(encoder)(docs)
+        finally:
+            serialization.orjson = orjson
+    return render
+
+
+def cached_path(encoder, docs):
+    body = encoder.encode_many(docs)
+    def render(_):
+        return Response(content=body, media_type=serialization.JSON_MEDIA_TYPE).body
+    return render
+
+
+def cpu_per_request(render, docs, rounds: int) -> float:
+    """Best-of-three process CPU seconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.process_time()
+        for _ in range(rounds):
+            render(docs)
+        best = min(best, (time.process_time() - start) / rounds)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(42)
+    datasets = [
+        ("investments", InvestmentRecommendationResponse, investment_encoder, make_investments(args.rows)),
+        ("news", NewsArticleResponse, news_encoder, make_news(args.rows))
+    ]
+    if serialization.orjson is None:
+        print("orjson is not installed; 'encoder' falls back to the stdlib encoder")
+
+    print(f"{'route':<12} {'strategy':<8} {'cpu/request':>12} {'speedup':>8} {'bytes':>9}")
+    for name, model, encoder, docs in datasets:
+        field = create_response_field(name="response", type_=List[model])
+        strategies = [
+            ("models", models_path(model, field)),
+            ("encoder", encoder_path(encoder)),
+            ("stdlib", stdlib_path(encoder)),
+            ("cached", cached_path(encoder, docs))
+        ]
+        expected = strategies[0][1](docs)
+        baseline = None
+        for label, render in strategies:
+            body = render(docs)
+            if body != expected:
+                raise SystemExit(f"{name}/{label}: output differs from the response-model path")
+            seconds = cpu_per_request(render, docs, args.rounds)
+            baseline = baseline or seconds
+            print(f"{name:<12} {label:<8} {seconds * 1000:>9.2f} ms {baseline / seconds:>7.1f}x {len(body):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark synthetic profiles for unknown tickers: per-symbol random vs vectorized.
+
+Pure CPU, no database. Times, per profile,
+
+* legacy:  the previous generator (random module, one symbol per call),
+* single:  generate_profile(), a vectorized batch of one,
+* batch:   generate_profiles() over every symbol in one call,
+* memo:    ProfileStore.get() once the profile is memoized.
+
+and checks first that a batch and single calls give identical profiles.
+Usage:
+
+    python benchmarks/bench_synthetic_profiles.py --symbols 5000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from synthetic_profiles import (
+    SECTOR_BY_LETTER, SECTOR_MULTIPLIERS, ProfileStore, generate_profile, generate_profiles, is_valid_symbol
+)
+
+LEGACY_TARGETS = {"BUY": (1.08, 1.25), "HOLD": (0.95, 1.08), "SELL": (0.85, 0.95)}
+
+
+def legacy_profile(symbol: str) -> dict:
+    """The previous per-call generator, minus its constant tables"""
+    if not is_valid_symbol(symbol):
+        return None
+    sector = SECTOR_BY_LETTER.get(symbol[0].upper(), 'Technology')
+    if len(symbol) <= 2:
+        base_price = random.uniform(50, 300)
+    elif len(symbol) == 3:
+        base_price = random.uniform(20, 150)
+    else:
+        base_price = random.uniform(5, 50)
+    multipliers = {name: random.uniform(low, high) for name, (low, high) in SECTOR_MULTIPLIERS.items()}
+    current_price = base_price * multipliers[sector]
+    volatility = random.uniform(0.15, 0.6)
+    price_change_percent = random.uniform(-5, 5) * (volatility / 0.3)
+    weights = {"BUY": 0.6, "HOLD": 0.3, "SELL": 0.1}
+    if price_change_percent > 2:
+        weights = {"BUY": 0.7, "HOLD": 0.25, "SELL": 0.05}
+    elif price_change_percent < -3:
+        weights = {"BUY": 0.4, "HOLD": 0.4, "SELL": 0.2}
+    recommendation = random.choices(list(weights), weights=list(weights.values()))[0]
+    target_price = current_price * random.uniform(*LEGACY_TARGETS[recommendation])
+    return {
+        "symbol": symbol.upper(),
+        "current_price": round(current_price, 2),
+        "target_price": round(target_price, 2),
+        "price_change_percent": round(price_change_percent, 2),
+        "recommendation": recommendation,
+        "confidence_score": random.randint(65, 88),
+        "volatility": round(volatility, 3)
+    }
+
+
+def make_symbols(count: int, rng: random.Random) -> List[str]:
+    return ["".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 5)))
+            for _ in range(count)]
+
+
+def time_per_profile(run, count: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        run()
+        best = min(best, (time.perf_counter() - start) / count)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=5000)
+    args = parser.parse_args()
+
+    day = date(2024, 1, 2)
+    symbols = make_symbols(args.symbols, random.Random(7))
+    without_timestamp = lambda profile: {k: v for k, v in profile.items() if k != "last_updated"}
+    batch = generate_profiles(symbols, day)
+    for symbol, profile in zip(symbols, batch):
+        if without_timestamp(profile) != without_timestamp(generate_profile(symbol, day)):
+            raise SystemExit(f"Batch and single profiles differ for {symbol}")
+
+    store = ProfileStore(db=None)
+    asyncio.run(store.get_many(symbols, day))
+
+    async def memo_lookups():
+        for symbol in symbols:
+            await store.get(symbol, day)
+
+    results = [
+        ("legacy", time_per_profile(lambda: [legacy_profile(symbol) for symbol in symbols], len(symbols))),
+        ("single", time_per_profile(lambda: [generate_profile(symbol, day) for symbol in symbols], len(symbols))),
+        ("batch", time_per_profile(lambda: generate_profiles(symbols, day), len(symbols))),
+        ("memo", time_per_profile(lambda: asyncio.run(memo_lookups()), len(symbols)))
+    ]
+    print(f"{len(symbols)} symbols; batch and single profiles identical")
+    print(f"{'strategy':<8} {'per profile':>12} {'speedup':>8}")
+    for label, seconds in results:
+        print(f"{label:<8} {seconds * 1e6:>9.2f} us {results[0][1] / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""Concurrent load test for the /api read routes and price streams, run in-process.
+
+The FastAPI app is driven through httpx's ASGI transport (no network, no
+uvicorn) against a freshly seeded scratch database, either on a local
+MongoDB or, with --mongo memory, an in-memory mongomock-motor stand-in
+(which has no $text, so the search routes are skipped there).
+For each universe size it reports p50/p95/p99 latency and requests per
+second per route, and writes everything to JSON so runs from different
+commits can be compared. Every read route is covered, plus the price
+streams (time from connect to the first event, over SSE and WebSocket).
+The mutating admin routes are left out, see build_routes(). Usage:
+
+    python benchmarks/load_test.py --universe 100 10000 --output before.json
+    python benchmarks/load_test.py --universe 100 10000 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = REPO_DIR / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+
+load_dotenv(BACKEND_DIR / '.env')
+
+from price_history import PRICE_HISTORY_COLLECTION, append_ticks
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Energy", "Consumer Discretionary",
+           "Consumer Staples", "Industrials", "Communication Services", "Utilities", "Real Estate"]
+NEWS_CATEGORIES = ["Markets", "Technology", "Economy", "Earnings", "Crypto", "Commodities"]
+QUESTIONS = [
+    "Should I buy {symbol}?",
+    "What's the price target for {symbol}?",
+    "How risky is {symbol}?",
+    "How is the technology sector doing?",
+    "How should I diversify my portfolio?",
+    "What's the market outlook?",
+    "What are your top picks?",
+    "Tell me about {name}",
+    "Should I buy ZZQX?",
+]
+# Hourly ticks per symbol, covering the history route's default one-day window
+HISTORY_TICKS = 24
+# Stream scenarios: connect, wait for the first event, disconnect
+STREAM_METHODS = ("SSE", "WEBSOCKET")
+STREAM_TIMEOUT_SECONDS = 10
+SEARCH_QUERIES = ["rates", "earnings guidance", '"latest data"', "stocks -crypto", "investors weighed", "market story"]
+
+
+def make_symbol(i: int) -> str:
+    letters = ""
+    i += 26  # skip single-letter tickers
+    while i:
+        i, rem = divmod(i, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def make_investments(count: int) -> list:
+    now = datetime.utcnow()
+    docs = []
+    for i in range(count):
+        price = round(random.uniform(5, 800), 2)
+        docs.append({
+            "id": str(uuid.uuid4()),
+            "symbol": make_symbol(i),
+            "name": f"{make_symbol(i).title()} Holdings {i}",
+            "asset_type": random.choices(["stock", "index", "commodity"], weights=[85, 10, 5])[0],
+            "current_price": price,
+            "target_price": round(price * random.uniform(0.85, 1.3), 2),
+            "recommendation": random.choices(["BUY", "HOLD", "SELL"], weights=[60, 30, 10])[0],
+            "risk_level": random.choice(["LOW", "MEDIUM", "HIGH"]),
+            "confidence_score": random.randint(55, 95),
+            "timeframe": random.choice(["3M", "6M", "12M"]),
+            "analyst": random.choice(["Sarah Kim", "Michael Chen", "Emma Thompson"]),
+            "analysis": "Fundamentals remain solid with improving margins and steady demand. " * 4,
+            "key_factors": [f"Factor {n}" for n in range(5)],
+            "last_updated": now - timedelta(seconds=i),
+            "price_change_24h": round(random.uniform(-5, 5), 2),
+            "price_change_percent": round(random.uniform(-3, 3), 2),
+            "market_cap": f"${random.randint(1, 900)}B",
+            "sector": random.choice(SECTORS),
+            "technical_indicators": {
+                "rsi": round(random.uniform(25, 80), 1),
+                "moving_avg_50": round(price * random.uniform(0.95, 1.05), 2),
+                "moving_avg_200": round(price * random.uniform(0.9, 1.1), 2),
+                "pe_ratio": round(random.uniform(10, 45), 1),
+                "volatility": round(random.uniform(0.1, 0.5), 2)
+            }
+        })
+    return docs
+
+
+def make_news(count: int) -> list:
+    now = datetime.utcnow()
+    body = "Markets moved as investors weighed earnings, rates and guidance. " * 60
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Market story {i}: stocks react to the latest data",
+        "summary": "A short summary of what happened and why it matters for investors.",
+        "content": body,
+        "author": random.choice(["Market Data Team", "Jennifer Rodriguez", "Richard Thompson"]),
+        "category": random.choice(NEWS_CATEGORIES),
+        "publish_date": now - timedelta(minutes=i),
+        "image_url": None,
+        "tags": random.sample(["Stocks", "Rates", "AI", "Energy", "Earnings", "Crypto"], 3),
+        "read_time": random.randint(2, 9)
+    } for i in range(count)]
+
+
+async def seed(db, universe: int, news: int):
+    investments = make_investments(universe)
+    articles = make_news(news)
+    # Link every article to a few investments, the way tag_articles would
+    symbols = [inv["symbol"] for inv in investments]
+    for article in articles:
+        article["symbols"] = random.sample(symbols, min(3, len(symbols)))
+
+    for name, docs in (("investment_recommendations", investments), ("news_articles", articles)):
+        await db[name].delete_many({})
+        for start in range(0, len(docs), 5000):
+            await db[name].insert_many(docs[start:start + 5000])
+
+    await db[PRICE_HISTORY_COLLECTION].delete_many({})
+    now = datetime.utcnow()
+    for hours_ago in range(HISTORY_TICKS, 0, -1):
+        prices = [round(inv["current_price"] * random.uniform(0.97, 1.03), 2) for inv in investments]
+        await append_ticks(db, symbols, prices, now - timedelta(hours=hours_ago))
+
+
+def build_routes(investments: list, articles: list, job_id: str, text_search: bool = True) -> dict:
+    """Route name -> callable producing (method, path, params, json) per request
+
+    ``job_id`` is an admin job submitted during setup. ``text_search=False``
+    leaves out the $text routes, which mongomock can't run. Methods in
+    STREAM_METHODS open a stream and wait for its first event (see
+    first_stream_event).
+
+    Left out on purpose: POST /api/admin/refresh-data and
+    /api/admin/news/backfill-symbols rewrite the data the other routes
+    read, and POST /api/admin/cache/invalidate empties their caches, so
+    timing any of them would mostly measure the disruption to the rest.
+    """
+    def pick_symbols():
+        return [inv["symbol"] for inv in random.sample(investments, min(5, len(investments)))]
+
+    def pick_question():
+        inv = random.choice(investments)
+        return {"question": random.choice(QUESTIONS).format(symbol=inv["symbol"], name=inv["name"])}
+
+    routes = {
+        "GET /api/": lambda: ("GET", "/api/", None, None),
+        "GET /api/health/live": lambda: ("GET", "/api/health/live", None, None),
+        "GET /api/health/ready": lambda: ("GET", "/api/health/ready", None, None),
+        "POST /api/status": lambda: ("POST", "/api/status", None, {"client_name": "load_test"}),
+        "GET /api/status": lambda: ("GET", "/api/status", None, None),
+        "GET /api/investments": lambda: ("GET", "/api/investments", None, None),
+        "GET /api/investments?asset_type": lambda: ("GET", "/api/investments", {"asset_type": "stock"}, None),
+        "GET /api/investments?fields": lambda: (
+            "GET", "/api/investments", {"fields": "symbol,current_price,price_change_percent", "limit": 500}, None),
+        "GET /api/investments/{id}": lambda: (
+            "GET", f"/api/investments/{random.choice(investments)['id']}", None, None),
+        "GET /api/investments/summary": lambda: ("GET", "/api/investments/summary", None, None),
+        "GET /api/investments/types/list": lambda: ("GET", "/api/investments/types/list", None, None),
+        "GET /api/investments/{symbol}/history": lambda: (
+            "GET", f"/api/investments/{random.choice(investments)['symbol']}/history", None, None),
+        "GET /api/investments/{symbol}/history?resolution": lambda: (
+            "GET", f"/api/investments/{random.choice(investments)['symbol']}/history", {"resolution": "1h"}, None),
+        "GET /api/investments/{id}/news": lambda: (
+            "GET", f"/api/investments/{random.choice(investments)['id']}/news", None, None),
+        "POST /api/investments/ask": lambda: ("POST", "/api/investments/ask", None, pick_question()),
+        "POST /api/investments/ask/batch": lambda: (
+            "POST", "/api/investments/ask/batch", None, [pick_question() for _ in range(50)]),
+        "GET /api/news": lambda: ("GET", "/api/news", None, None),
+        "GET /api/news?category": lambda: ("GET", "/api/news", {"category": random.choice(NEWS_CATEGORIES)}, None),
+        "GET /api/news?fields": lambda: ("GET", "/api/news", {"fields": "id,title,summary"}, None),
+        "GET /api/news/{id}": lambda: ("GET", f"/api/news/{random.choice(articles)['id']}", None, None),
+        "GET /api/news/categories/list": lambda: ("GET", "/api/news/categories/list", None, None),
+        "GET /api/news/browse": lambda: ("GET", "/api/news/browse", None, None),
+        "GET /api/news/browse?category": lambda: (
+            "GET", "/api/news/browse", {"category": random.choice(NEWS_CATEGORIES)}, None),
+        "GET /api/admin/cache/stats": lambda: ("GET", "/api/admin/cache/stats", None, None),
+        "GET /api/admin/jobs/{id}": lambda: ("GET", f"/api/admin/jobs/{job_id}", None, None),
+        "SSE /api/stream/prices/sse": lambda: (
+            "SSE", "/api/stream/prices/sse", {"symbols": ",".join(pick_symbols())}, None),
+        "WS /api/stream/prices": lambda: (
+            "WEBSOCKET", "/api/stream/prices", {"symbols": ",".join(pick_symbols())}, None),
+    }
+    if text_search:
+        routes["GET /api/news/search"] = lambda: ("GET", "/api/news/search", {"q": random.choice(SEARCH_QUERIES)}, None)
+        routes["GET /api/news/search?tags"] = lambda: (
+            "GET", "/api/news/search", {"q": random.choice(SEARCH_QUERIES), "tags": "Rates"}, None)
+    return routes
+
+
+async def run_setup_job(http) -> str:
+    """Submit one market refresh for the job status route to read, and wait for it to finish"""
+    job_id = (await http.post("/api/admin/refresh-data")).json()["job_id"]
+    for _ in range(600):
+        if (await http.get(f"/api/admin/jobs/{job_id}")).json()["status"] in ("succeeded", "failed"):
+            break
+        await asyncio.sleep(0.1)
+    return job_id
+
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def first_stream_event(app, method: str, path: str, params: Optional[dict]) -> bool:
+    """Open an SSE or WebSocket stream on the ASGI app, wait for its first event, then disconnect.
+
+    httpx's ASGI transport buffers the whole body and has no WebSocket
+    support, so streams are driven through the ASGI interface directly.
+    """
+    websocket = method == "WEBSOCKET"
+    scope = {
+        "type": "websocket" if websocket else "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "ws" if websocket else "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": urlencode(params or {}).encode(),
+        "headers": [(b"host", b"loadtest")], "client": ("127.0.0.1", 0), "server": ("loadtest", 80),
+        "subprotocols": []
+    }
+    connected = False
+    disconnect = asyncio.Event()
+    first_event = asyncio.get_running_loop().create_future()
+
+    async def receive():
+        nonlocal connected
+        if not connected:
+            connected = True
+            return {"type": "websocket.connect"} if websocket else {"type": "http.request", "body": b""}
+        await disconnect.wait()
+        return {"type": "websocket.disconnect", "code": 1000} if websocket else {"type": "http.disconnect"}
+
+    async def send(message):
+        if first_event.done():
+            return
+        if message["type"] in ("websocket.close", "websocket.http.response.start"):
+            first_event.set_result(False)
+        elif message["type"] == "http.response.start" and message["status"] != 200:
+            first_event.set_result(False)
+        elif message["type"] == "websocket.send" or (message["type"] == "http.response.body" and message.get("body")):
+            first_event.set_result(True)
+
+    stream = asyncio.create_task(app(scope, receive, send))
+    try:
+        return await asyncio.wait_for(asyncio.shield(first_event), STREAM_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        disconnect.set()
+        try:
+            await asyncio.wait_for(stream, STREAM_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, Exception):
+            stream.cancel()
+
+
+async def drive(http, app, make_request, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, path, params, body = make_request()
+            start = time.perf_counter()
+            if method in STREAM_METHODS:
+                received = await first_stream_event(app, method, path, params)
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += not received
+                continue
+            try:
+                response = await http.request(method, path, params=params, json=body)
+            except Exception:
+                # An exception raised by the app counts like a 500, it doesn't end the run
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / wall, 1) if wall else 0.0,
+        "mean_ms": round(statistics.mean(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(current: dict, baseline: dict):
+    print(f"\nComparison against {baseline['meta'].get('commit')}:")
+    baseline_runs = {(run["universe"], run["news"]): run for run in baseline["runs"]}
+    for run in current["runs"]:
+        before = baseline_runs.get((run["universe"], run["news"]))
+        if not before:
+            continue
+        print(f"  universe={run['universe']} news={run['news']}")
+        for route, stats in run["routes"].items():
+            old = before["routes"].get(route)
+            if not old or not old["p95_ms"]:
+                continue
+            change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+            print(f"    {route:<48} p95 {old['p95_ms']:8.2f} -> {stats['p95_ms']:8.2f} ms ({change:+.0f}%)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universe", type=int, nargs="+", default=[100, 10000],
+                        help="recommendation counts to seed, one run per size (e.g. 100 10000 100000)")
+    parser.add_argument("--news", type=int, default=1000, help="news articles to seed")
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--routes", nargs="*", help="only run routes whose name contains one of these")
+    parser.add_argument("--mongo", choices=["local", "memory"], default="local",
+                        help="local: MongoDB at BENCH_MONGO_URL/MONGO_URL; memory: mongomock-motor")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="earlier results JSON to compare p95 latencies against")
+    args = parser.parse_args()
+
+    # Point the app at a scratch database before it is imported
+    os.environ["DB_NAME"] = f"{os.environ.get('DB_NAME', 'test_database')}_loadtest"
+    os.environ["MONGO_URL"] = os.environ.get("BENCH_MONGO_URL", os.environ["MONGO_URL"])
+    os.environ.setdefault("ENSURE_INDEXES_ON_STARTUP", "true")
+    if args.mongo == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--mongo memory needs mongomock-motor (pip install mongomock-motor)")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    import httpx
+    import server
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "mongo": args.mongo,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "runs": []
+    }
+
+    await server.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as http:
+            job_id = None
+            for universe in args.universe:
+                print(f"\nSeeding {universe} recommendations and {args.news} articles...")
+                await seed(server.db, universe, args.news)
+                server.response_cache.invalidate()
+                server.universe.invalidate()
+
+                investments = await server.db.investment_recommendations.find({}, {"id": 1, "symbol": 1, "name": 1}).to_list(None)
+                articles = await server.db.news_articles.find({}, {"id": 1}).to_list(None)
+                if job_id is None:
+                    job_id = await run_setup_job(http)
+                routes = build_routes(investments, articles, job_id, text_search=args.mongo != "memory")
+
+                run = {"universe": universe, "news": args.news, "routes": {}}
+                for name, make_request in routes.items():
+                    if args.routes and not any(part in name for part in args.routes):
+                        continue
+                    stats = await drive(http, server.app, make_request, args.requests, args.concurrency)
+                    run["routes"][name] = stats
+                    print(f"  {name:<48} {stats['rps']:9.1f} req/s   p50 {stats['p50_ms']:8.2f}   "
+                          f"p95 {stats['p95_ms']:8.2f}   p99 {stats['p99_ms']:8.2f} ms   errors {stats['errors']}")
+                results["runs"].append(run)
+    finally:
+        await server.client.drop_database(os.environ["DB_NAME"])
+        await server.app.router.shutdown()
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        print_comparison(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,23 +1,30 @@
 import asyncio
 import sys
-import os
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
 import random
 
 # Add the backend directory to the path
-sys.path.append('/app/backend')
+sys.path.append(str(Path(__file__).resolve().parent / "backend"))
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
+import numpy as np
 import uuid
 
-# Load environment variables
-load_dotenv('/app/backend/.env')
+from data_versions import bump_data_version
+from database import NewsRepository, RecommendationRepository, close_client, get_database
+from indicator_state import update_indicators
+from jobs import LeaseTimeout, hold_lease
+from market_updates import MARKET_DATA_LEASE
+from price_history import append_ticks
+from update_engine import apply_price_moves, build_set_ops, commit_updates, load_frame, rng, staggered_timestamps
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see backend/database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
+news_repository = NewsRepository(db)
+
+# Seconds to wait for a refresh in progress elsewhere before giving up
+REFRESH_LEASE_TIMEOUT = 300
 
 # Pool of additional recommendations to add periodically
 NEW_RECOMMENDATIONS_POOL = [
@@ -151,22 +158,19 @@ async def add_random_recommendation():
     new_rec = random.choice(NEW_RECOMMENDATIONS_POOL)
     NEW_RECOMMENDATIONS_POOL.remove(new_rec)
     
-    # Add required fields
+    # Add required fields; technical indicators fill in from the symbol's
+    # rolling state as its price history builds up
     new_rec.update({
         "id": str(uuid.uuid4()),
         "last_updated": datetime.utcnow(),
         "price_change_24h": round(random.uniform(-3, 3), 2),
         "price_change_percent": round(random.uniform(-2.5, 2.5), 2),
-        "technical_indicators": {
-            "rsi": round(random.uniform(30, 80), 1),
-            "moving_avg_50": round(new_rec["current_price"] * random.uniform(0.95, 1.05), 2),
-            "moving_avg_200": round(new_rec["current_price"] * random.uniform(0.90, 1.10), 2),
-            "pe_ratio": round(random.uniform(15, 45), 1),
-            "volatility": round(random.uniform(0.15, 0.35), 2)
-        }
+        "technical_indicators": {}
     })
     
-    await db.investment_recommendations.insert_one(new_rec)
+    await recommendation_repository.insert(new_rec)
+    await append_ticks(db, [new_rec["symbol"]], [new_rec["current_price"]], new_rec["last_updated"])
+    await update_indicators(db, [new_rec["symbol"]], [new_rec["current_price"]])
     print(f"✅ Added new recommendation: {new_rec['symbol']} - {new_rec['name']}")
 
 async def add_random_news():
@@ -184,57 +188,51 @@ async def add_random_news():
         "publish_date": datetime.utcnow(),
         "image_url": "https://images.unsplash.com/photo-1486406146926-c627a92ad1ab"
     })
-    
-    await db.news_articles.insert_one(new_article)
+    await news_repository.insert_tagged([new_article])
     print(f"✅ Added new news article: {new_article['title'][:50]}...")
 
 async def update_existing_data():
     """Update existing recommendations and news with fresh data"""
     
     # Update investment prices and confidence scores
-    recommendations = await db.investment_recommendations.find().to_list(1000)
-    updated_count = 0
+    frame = await load_frame(recommendation_repository.collection, {
+        "symbol": "",
+        "current_price": 0.0,
+        "confidence_score": 0,
+        "technical_indicators.volatility": 0.25
+    })
     
-    for rec in recommendations:
-        # Generate realistic price movement
-        volatility = rec.get("technical_indicators", {}).get("volatility", 0.25)
-        price_change_percent = random.uniform(-2.0, 2.0) * volatility
-        
-        old_price = rec["current_price"]
-        price_change_amount = old_price * (price_change_percent / 100)
-        new_price = max(old_price * 0.7, min(old_price * 1.5, old_price + price_change_amount))
-        
-        # Small confidence adjustment
-        confidence_adjustment = random.randint(-3, 3)
-        new_confidence = max(50, min(95, rec["confidence_score"] + confidence_adjustment))
-        
-        await db.investment_recommendations.update_one(
-            {"id": rec["id"]},
-            {
-                "$set": {
-                    "current_price": round(new_price, 2),
-                    "price_change_24h": round(price_change_amount, 2),
-                    "price_change_percent": round(price_change_percent, 2),
-                    "confidence_score": new_confidence,
-                    "last_updated": datetime.utcnow()
-                }
-            }
-        )
-        updated_count += 1
+    # Generate realistic price movement scaled by each asset's volatility
+    price_change_percent = rng.uniform(-2.0, 2.0, len(frame)) * frame["technical_indicators.volatility"]
+    new_prices, price_change_amount = apply_price_moves(
+        frame["current_price"], price_change_percent, floor=0.7, cap=1.5
+    )
     
-    print(f"✅ Updated {updated_count} investment recommendations")
+    # Small confidence adjustment
+    confidence_adjustment = rng.integers(-3, 3, len(frame), endpoint=True)
+    new_confidence = np.clip(frame["confidence_score"] + confidence_adjustment, 50, 95).astype(int)
     
-    # Update news timestamps
-    articles = await db.news_articles.find().to_list(1000)
-    for i, article in enumerate(articles):
-        # Stagger articles over recent period
-        hours_ago = i * 2  # 2 hours between articles
-        new_timestamp = datetime.utcnow() - timedelta(hours=hours_ago)
-        
-        await db.news_articles.update_one(
-            {"id": article["id"]},
-            {"$set": {"publish_date": new_timestamp}}
-        )
+    now = datetime.utcnow()
+    new_prices = np.round(new_prices, 2)
+    ops = build_set_ops(frame.ids, {
+        "current_price": new_prices,
+        "price_change_24h": np.round(price_change_amount, 2),
+        "price_change_percent": np.round(price_change_percent, 2),
+        "confidence_score": new_confidence,
+        "last_updated": now
+    })
+    await commit_updates(recommendation_repository.collection, ops)
+    await append_ticks(db, frame["symbol"], new_prices, now)
+    await update_indicators(db, frame["symbol"], new_prices)
+    
+    print(f"✅ Updated {len(frame)} investment recommendations")
+    
+    # Update news timestamps, staggered 2 hours apart over the recent period
+    articles = await load_frame(news_repository.collection, {})
+    ops = build_set_ops(articles.ids, {
+        "publish_date": staggered_timestamps(datetime.utcnow(), len(articles), hours_apart=2)
+    })
+    await commit_updates(news_repository.collection, ops)
     
     print(f"✅ Updated {len(articles)} news article timestamps")
 
@@ -246,7 +244,7 @@ async def smart_recommendation_updates():
         "tech_rally", "energy_surge", "defensive_rotation", "growth_momentum", "value_play"
     ])
     
-    recommendations = await db.investment_recommendations.find().to_list(1000)
+    frame = await load_frame(recommendation_repository.collection, {"symbol": "", "current_price": 0.0, "sector": "Diversified"})
     
     sector_multipliers = {
         "tech_rally": {"Technology": 1.5, "Healthcare": 0.8, "Energy": 0.7},
@@ -258,29 +256,23 @@ async def smart_recommendation_updates():
     
     current_multipliers = sector_multipliers.get(market_conditions, {})
     
-    for rec in recommendations:
-        sector = rec.get("sector", "Diversified")
-        multiplier = current_multipliers.get(sector, 1.0)
-        
-        # Apply sector-specific movement
-        base_change = random.uniform(-1.5, 1.5)
-        sector_adjusted_change = base_change * multiplier
-        
-        old_price = rec["current_price"]
-        price_change_amount = old_price * (sector_adjusted_change / 100)
-        new_price = max(old_price * 0.8, min(old_price * 1.3, old_price + price_change_amount))
-        
-        await db.investment_recommendations.update_one(
-            {"id": rec["id"]},
-            {
-                "$set": {
-                    "current_price": round(new_price, 2),
-                    "price_change_24h": round(price_change_amount, 2),
-                    "price_change_percent": round(sector_adjusted_change, 2),
-                    "last_updated": datetime.utcnow()
-                }
-            }
-        )
+    # Apply sector-specific movement
+    sector_adjusted_change = rng.uniform(-1.5, 1.5, len(frame)) * frame.lookup("sector", current_multipliers, 1.0)
+    new_prices, price_change_amount = apply_price_moves(
+        frame["current_price"], sector_adjusted_change, floor=0.8, cap=1.3
+    )
+    
+    now = datetime.utcnow()
+    new_prices = np.round(new_prices, 2)
+    ops = build_set_ops(frame.ids, {
+        "current_price": new_prices,
+        "price_change_24h": np.round(price_change_amount, 2),
+        "price_change_percent": np.round(sector_adjusted_change, 2),
+        "last_updated": now
+    })
+    await commit_updates(recommendation_repository.collection, ops)
+    await append_ticks(db, frame["symbol"], new_prices, now)
+    await update_indicators(db, frame["symbol"], new_prices)
     
     print(f"✅ Applied {market_conditions} market condition updates")
 
@@ -289,32 +281,39 @@ async def main():
     print("🔄 Running comprehensive data update...")
     
     try:
-        # Regular data updates
-        await update_existing_data()
-        
-        # Smart market-based updates
-        await smart_recommendation_updates()
-        
-        # Occasionally add new content (30% chance)
-        if random.random() < 0.3:
-            await add_random_recommendation()
-        
-        if random.random() < 0.3:
-            await add_random_news()
+        # Wait out a refresh already running in the API (or update_data.py)
+        async with hold_lease(db, MARKET_DATA_LEASE, timeout=REFRESH_LEASE_TIMEOUT):
+            # Regular data updates
+            await update_existing_data()
+            
+            # Smart market-based updates
+            await smart_recommendation_updates()
+            
+            # Occasionally add new content (30% chance)
+            if random.random() < 0.3:
+                await add_random_recommendation()
+            
+            if random.random() < 0.3:
+                await add_random_news()
+            
+            # Tell the API its cached responses are stale
+            await bump_data_version(db, "investment_recommendations", "news_articles")
         
         # Get final counts
-        rec_count = await db.investment_recommendations.count_documents({})
-        news_count = await db.news_articles.count_documents({})
+        rec_count = await recommendation_repository.count()
+        news_count = await news_repository.count()
         
         print(f"\n✨ Update completed!")
         print(f"   • {rec_count} total investment recommendations")
         print(f"   • {news_count} total news articles")
         print(f"   • All prices and data refreshed with market movements")
         
+    except LeaseTimeout:
+        print("⏭️ Another market data refresh is still running; skipped this update")
     except Exception as e:
         print(f"❌ Error during update: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -4,26 +4,54 @@ set -e
 # Start the FastAPI backend
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
+# Build indexes once here rather than in every worker
+echo "Ensuring MongoDB indexes"
+python3 indexes.py || echo "Index build failed; starting anyway"
+export ENSURE_INDEXES_ON_STARTUP=false
+
 echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Multi-worker gunicorn with uvicorn workers (sized by WEB_CONCURRENCY, default: one per core)
+gunicorn -c gunicorn_conf.py server:app &
 BACKEND_PID=$!
+# Set once nginx starts; until then drain only has gunicorn to stop
+NGINX_PID=
 
-echo "Waiting for backend to start..."
-sleep 30
+# Drain on termination: stop the proxy taking new connections, then let
+# gunicorn finish in-flight requests (up to GRACEFUL_TIMEOUT) before exiting.
+# Installed before the readiness wait, so a SIGTERM during startup still
+# reaches gunicorn instead of orphaning it.
+drain() {
+    echo "Draining..."
+    nginx -s quit 2>/dev/null || kill $NGINX_PID 2>/dev/null || true
+    kill -TERM $BACKEND_PID 2>/dev/null || true
+    wait $BACKEND_PID || true
+    exit 0
+}
+trap drain TERM INT
 
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Backend failed to start at initialization, exiting"
-    exit 1
-fi
+# Wait until the backend reports ready (MongoDB reachable) instead of sleeping blindly
+echo "Waiting for backend to become ready..."
+READY_TIMEOUT=${READY_TIMEOUT:-60}
+waited=0
+until wget -q -O /dev/null http://127.0.0.1:8001/api/health/ready; do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend failed to start at initialization, exiting"
+        exit 1
+    fi
+    if [ $waited -ge $READY_TIMEOUT ]; then
+        echo "Backend not ready after ${READY_TIMEOUT}s, exiting"
+        kill $BACKEND_PID
+        exit 1
+    fi
+    sleep 1
+    waited=$((waited + 1))
+done
+echo "Backend ready after ${waited}s"
 
 # Start Nginx
 nginx -g 'daemon off;' &
 NGINX_PID=$!
 
-# Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
-
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
     sleep 1
@@ -1,23 +1,19 @@
 import asyncio
 import sys
-import os
 from datetime import datetime, timedelta
+from pathlib import Path
 import random
 
 # Add the backend directory to the path
-sys.path.append('/app/backend')
+sys.path.append(str(Path(__file__).resolve().parent / "backend"))
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 import uuid
 
-# Load environment variables
-load_dotenv('/app/backend/.env')
+from database import RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see backend/database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
 
 async def create_comprehensive_investment_recommendations():
     """Create a comprehensive set of investment recommendations across all sectors"""
@@ -664,12 +660,11 @@ async def create_comprehensive_investment_recommendations():
     ]
     
     # Add the existing recommendations to preserve them
-    existing_recs = await db.investment_recommendations.find().to_list(1000)
+    existing_recs = await recommendation_repository.collection.find().to_list(1000)
     all_recommendations = existing_recs + recommendations
     
     # Clear and replace all recommendations
-    await db.investment_recommendations.delete_many({})
-    await db.investment_recommendations.insert_many(all_recommendations)
+    await recommendation_repository.replace_all(all_recommendations)
     
     print(f"✅ Created comprehensive database with {len(all_recommendations)} investment recommendations")
     print(f"   • {len([r for r in all_recommendations if r['asset_type'] == 'stock'])} Individual Stocks")
@@ -685,12 +680,14 @@ async def main():
     
     try:
         await create_comprehensive_investment_recommendations()
+        # Tell the API its cached responses are stale
+        await recommendation_repository.mark_changed()
         print("\n🎉 Investment database successfully expanded!")
         
     except Exception as e:
         print(f"❌ Error expanding database: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
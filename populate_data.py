@@ -1,23 +1,21 @@
 import asyncio
 import sys
-import os
 from datetime import datetime, timedelta
+from pathlib import Path
 import random
 
 # Add the backend directory to the path
-sys.path.append('/app/backend')
+sys.path.append(str(Path(__file__).resolve().parent / "backend"))
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 import uuid
 
-# Load environment variables
-load_dotenv('/app/backend/.env')
+from data_versions import bump_data_version
+from database import NewsRepository, RecommendationRepository, close_client, get_database
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Shared pooled MongoDB connection (see backend/database.py)
+db = get_database()
+recommendation_repository = RecommendationRepository(db)
+news_repository = NewsRepository(db)
 
 async def create_sample_investment_recommendations():
     """Create sample investment recommendations"""
@@ -287,12 +285,9 @@ async def create_sample_investment_recommendations():
         }
     ]
     
-    # Clear existing recommendations
-    await db.investment_recommendations.delete_many({})
-    
-    # Insert new recommendations
-    await db.investment_recommendations.insert_many(recommendations)
-    print(f"✅ Created {len(recommendations)} investment recommendations")
+    # Replace existing recommendations
+    created = await recommendation_repository.replace_all(recommendations)
+    print(f"✅ Created {created} investment recommendations")
 
 async def create_sample_news_articles():
     """Create sample news articles"""
@@ -372,12 +367,9 @@ async def create_sample_news_articles():
         }
     ]
     
-    # Clear existing articles
-    await db.news_articles.delete_many({})
-    
-    # Insert new articles
-    await db.news_articles.insert_many(articles)
-    print(f"✅ Created {len(articles)} news articles")
+    # Replace existing articles, linked to the recommendations created above
+    created = await news_repository.replace_all_tagged(articles)
+    print(f"✅ Created {created} news articles")
 
 async def main():
     """Main function to populate database"""
@@ -386,6 +378,8 @@ async def main():
     try:
         await create_sample_investment_recommendations()
         await create_sample_news_articles()
+        # Tell the API its cached responses are stale
+        await bump_data_version(db, "investment_recommendations", "news_articles")
         print("\n🎉 Database successfully populated!")
         print("\n📊 Your enhanced platform now has:")
         print("   • 8 Investment recommendations across stocks, ETFs, and crypto")
@@ -395,7 +389,7 @@ async def main():
     except Exception as e:
         print(f"❌ Error populating database: {e}")
     finally:
-        client.close()
+        close_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file